@@ -5,6 +5,19 @@ from pydantic import BaseModel, Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
+class PoolSettings(BaseModel):
+    """SQLAlchemy connection pool (per worker process)"""
+    size: int = Field(default=10, ge=1)                  # persistent connections
+    max_overflow: int = Field(default=10, ge=0)          # extra temporary connections
+    timeout_seconds: float = Field(default=30, gt=0)     # wait for a free connection
+    recycle_seconds: int = Field(default=1800)           # -1 disables
+    # pre_ping: one extra round trip per checkout to detect dead connections
+    # alternative: pre_ping=false + validate_interval_seconds > 0 pings idle
+    # connections in the background instead
+    pre_ping: bool = Field(default=True)
+    validate_interval_seconds: float = Field(default=0, ge=0)   # 0 disables
+
+
 class DatabaseSettings(BaseModel):
     """PostgreSQL database configuration"""
     host: str = Field(default="localhost")
@@ -12,6 +25,7 @@ class DatabaseSettings(BaseModel):
     user: str = Field(default="app_user")
     password: str = Field(default="postgres")
     db_name: str = Field(default="app_db")
+    pool: PoolSettings = Field(default_factory=PoolSettings)
 
     @property
     def url(self) -> str:
@@ -19,6 +33,124 @@ class DatabaseSettings(BaseModel):
         pwd = quote_plus(self.password)  # process "/" or ":" in pwd
         return f"postgresql+asyncpg://{self.user}:{pwd}@{self.host}:{self.port}/{self.db_name}"
 
+    @property
+    def dsn(self) -> str:
+        """ Plain libpq/asyncpg DSN (for connections outside SQLAlchemy)"""
+        pwd = quote_plus(self.password)
+        return f"postgresql://{self.user}:{pwd}@{self.host}:{self.port}/{self.db_name}"
+
+
+class ReplicaSettings(DatabaseSettings):
+    """Read replica (streaming standby); GET endpoints read from it"""
+    # lag above this -> reads fall back to the primary
+    max_lag_seconds: float = Field(default=5.0, ge=0)
+    lag_check_seconds: float = Field(default=2.0, gt=0)
+
+
+class IngestSettings(BaseModel):
+    """Telemetry ingestion configuration"""
+    # copy:   asyncpg binary COPY into device_telemetry
+    # unnest: one INSERT ... SELECT FROM unnest(...) statement
+    batch_strategy: Literal["copy", "unnest"] = Field(default="copy")
+
+    # Device existence cache (LRU + TTL, invalidated via LISTEN/NOTIFY)
+    device_cache_size: int = Field(default=50_000, ge=0)    # 0 disables
+    device_cache_ttl_seconds: float = Field(default=300, gt=0)
+    device_cache_negative_ttl_seconds: float = Field(default=5, gt=0)
+
+    # Write-behind buffer for POST /telemetry (single points)
+    # ack=flush:   respond 201 once the point's micro-batch has committed
+    # ack=enqueue: respond 202 as soon as the point is queued (lost on crash)
+    write_behind: bool = Field(default=False)
+    write_behind_ack: Literal["flush", "enqueue"] = Field(default="flush")
+    write_behind_flush_ms: int = Field(default=50, gt=0)
+    write_behind_max_batch: int = Field(default=1000, gt=0)
+    write_behind_max_queue: int = Field(default=10_000, gt=0)
+    write_behind_enqueue_timeout_seconds: float = Field(default=1.0, ge=0)
+
+    # Latest-state aggregator: coalesce device_latest / last_seen_at writes
+    # in memory and flush them as one multi-row upsert per interval
+    coalesce_latest: bool = Field(default=False)
+    latest_flush_ms: int = Field(default=1000, gt=0)
+    latest_max_pending: int = Field(default=50_000, gt=0)   # early flush
+    # consecutive transient flush failures before a batch is dropped
+    latest_max_attempts: int = Field(default=5, gt=0)
+
+    # Per-device sampling limit from plan.min_sample_interval_seconds
+    # drop: discard too-frequent single points (202); reject: 429
+    # batches are thinned in both modes
+    rate_limit: Literal["off", "drop", "reject"] = Field(default="off")
+    rate_limit_max_devices: int = Field(default=100_000, gt=0)
+    plan_cache_ttl_seconds: float = Field(default=60, gt=0)
+
+
+class PartitionSettings(BaseModel):
+    """device_telemetry partition manager"""
+    enabled: bool = Field(default=True)
+    interval_seconds: float = Field(default=3600, gt=0)
+    # daily | monthly, or auto: daily once ingest exceeds daily_threshold_rows/day
+    granularity: Literal["auto", "daily", "monthly"] = Field(default="auto")
+    daily_threshold_rows: int = Field(default=2_000_000, gt=0)
+    # future partitions kept pre-created (days or months, per granularity)
+    premake: int = Field(default=3, ge=1)
+    # detach + drop partitions older than the longest plan.retention_days
+    # (destructive: opt-in with PARTITIONS__DROP_EXPIRED=true)
+    drop_expired: bool = Field(default=False)
+
+
+class RetentionSettings(BaseModel):
+    """Per-plan telemetry retention worker (batched, throttled deletes)"""
+    # destructive: opt-in with RETENTION__ENABLED=true
+    enabled: bool = Field(default=False)
+    interval_seconds: float = Field(default=3600, gt=0)
+    batch_size: int = Field(default=5000, gt=0)             # rows per DELETE
+    pause_ms: int = Field(default=200, ge=0)                # between DELETEs
+    max_rows_per_run: int = Field(default=1_000_000, gt=0)
+
+
+class LiveSettings(BaseModel):
+    """Live telemetry push (WebSocket / SSE) over LISTEN/NOTIFY"""
+    # on: every ingest transaction also NOTIFYs its newest point per device
+    enabled: bool = Field(default=False)
+    max_subscribers: int = Field(default=1000, gt=0)        # per worker
+    max_pending: int = Field(default=1000, gt=0)            # devices per subscriber
+    max_device_ids: int = Field(default=500, gt=0)          # per subscription
+    heartbeat_seconds: float = Field(default=15, gt=0)
+    # larger meta is sent as null (NOTIFY payloads are limited to 8000 bytes)
+    meta_max_bytes: int = Field(default=2000, ge=0, le=6000)
+
+
+class FleetSettings(BaseModel):
+    """In-memory device_latest snapshot for GET /devices/nearest"""
+    enabled: bool = Field(default=False)
+    interval_seconds: float = Field(default=2, gt=0)        # incremental refresh
+    full_refresh_seconds: float = Field(default=600, gt=0)  # rebuild (deletes, moves)
+    overlap_seconds: float = Field(default=30, ge=0)        # late points re-read
+    batch_size: int = Field(default=10_000, gt=0)           # rows per query
+    # grid cell edge, in coordinate units; roughly the typical query radius
+    cell_size: float = Field(default=10, gt=0)
+    max_devices: int = Field(default=500_000, gt=0)
+
+
+class ProfilingSettings(BaseModel):
+    """Opt-in per-request SQL profiling (Server-Timing headers, N+1 warnings)"""
+    enabled: bool = Field(default=False)
+    top_n: int = Field(default=5, ge=0)                     # slowest statements reported
+    statement_budget: int = Field(default=20, gt=0)         # warn above this
+    repeat_threshold: int = Field(default=5, gt=1)          # same SQL n times: N+1
+    sql_max_length: int = Field(default=120, gt=0)          # in the header / log
+
+
+class CacheSettings(BaseModel):
+    """Cached reference responses (GET /, /plans), also dropped by NOTIFY"""
+    reference_ttl_seconds: float = Field(default=300, gt=0)
+
+
+class QuotaSettings(BaseModel):
+    """Cached per-account device quota (POST /devices), also dropped by NOTIFY"""
+    cache_size: int = Field(default=10_000, gt=0)           # accounts
+    cache_ttl_seconds: float = Field(default=60, gt=0)
+
 
 class Settings(BaseSettings):
     """Application settings"""
@@ -36,6 +168,33 @@ class Settings(BaseSettings):
     # Database
     database: DatabaseSettings = Field(default_factory=DatabaseSettings)
 
+    # Optional read replica (DATABASE_REPLICA__HOST, ...)
+    database_replica: ReplicaSettings | None = None
+
+    # Telemetry ingestion
+    ingest: IngestSettings = Field(default_factory=IngestSettings)
+
+    # Telemetry partitions
+    partitions: PartitionSettings = Field(default_factory=PartitionSettings)
+
+    # Per-plan telemetry retention
+    retention: RetentionSettings = Field(default_factory=RetentionSettings)
+
+    # Live telemetry push
+    live: LiveSettings = Field(default_factory=LiveSettings)
+
+    # Live fleet snapshot (nearest-device queries)
+    fleet: FleetSettings = Field(default_factory=FleetSettings)
+
+    # Cached reference responses
+    cache: CacheSettings = Field(default_factory=CacheSettings)
+
+    # Device quota (POST /devices)
+    quota: QuotaSettings = Field(default_factory=QuotaSettings)
+
+    # SQL profiling middleware
+    profiling: ProfilingSettings = Field(default_factory=ProfilingSettings)
+
     @property
     def database_url(self) -> str:
         """Database connection URL"""
@@ -1,4 +1,6 @@
 from collections.abc import AsyncGenerator
+
+from fastapi import Request
 from sqlalchemy.ext.asyncio import AsyncEngine
 
 from sqlalchemy.ext.asyncio import (
@@ -7,23 +9,50 @@ from sqlalchemy.ext.asyncio import (
     create_async_engine,
 )
 
-from ..config.setting import settings
+from ..config.setting import DatabaseSettings, settings
+from .pool import InstrumentedPool, PoolValidator, instrument
+from .replica import ReplicaMonitor
+from .stats import track_request_statements
+
+# Per-request override: read from the primary (read-your-writes)
+READ_PRIMARY_HEADER = "X-Read-Primary"
+
+
+def make_engine(db: DatabaseSettings) -> AsyncEngine:
+    """Async engine with an instrumented, configurable pool."""
+    pool = db.pool
+    engine = create_async_engine(
+        db.url,
+        echo=settings.debug,          # SQL logging in debug mode only
+        poolclass=InstrumentedPool,   # checkout wait / timeout stats
+        pool_pre_ping=pool.pre_ping,  # Validate connections before using them
+        pool_size=pool.size,          # Persistent connections in the pool
+        max_overflow=pool.max_overflow,     # Extra temporary connections allowed
+        pool_timeout=pool.timeout_seconds,  # Seconds to wait for a connection from the pool
+        pool_recycle=pool.recycle_seconds,  # Recycle connections (default 30 minutes)
+        connect_args={
+            "timeout": 10,            # Connection attempt timeout (asyncpg)
+            "server_settings": {"jit": "off"},  # Disable PostgreSQL JIT
+            # "ssl": False,
+        },
+    )
+    instrument(engine)
+    track_request_statements(engine)
+    return engine
+
+
+def make_validator(engine: AsyncEngine, db: DatabaseSettings) -> PoolValidator | None:
+    """Background validation when configured (replaces pre-ping)."""
+    if db.pool.validate_interval_seconds <= 0:
+        return None
+    return PoolValidator(engine, db.pool.validate_interval_seconds)
+
 
 # Async SQLAlchemy engine
-engine: AsyncEngine = create_async_engine(
-    settings.database_url,
-    echo=settings.debug,          # SQL logging in debug mode only
-    pool_pre_ping=True,           # Validate connections before using them
-    pool_size=10,                 # Persistent connections in the pool
-    max_overflow=10,              # Extra temporary connections allowed
-    pool_timeout=30,              # Seconds to wait for a connection from the pool
-    pool_recycle=1800,            # Recycle connections every 30 minutes
-    connect_args={
-        "timeout": 10,            # Connection attempt timeout (asyncpg)
-        "server_settings": {"jit": "off"},  # Disable PostgreSQL JIT
-        # "ssl": False,
-    },
-)
+engine: AsyncEngine = make_engine(settings.database)
+pool_validators: list[PoolValidator] = []
+if (validator := make_validator(engine, settings.database)) is not None:
+    pool_validators.append(validator)
 
 # Session factory that creates AsyncSession instances
 async_session_maker = async_sessionmaker(
@@ -34,6 +63,41 @@ async_session_maker = async_sessionmaker(
 )
 
 
+# Optional read replica (settings.database_replica)
+read_engine: AsyncEngine | None = None
+read_session_maker: async_sessionmaker[AsyncSession] | None = None
+replica_monitor: ReplicaMonitor | None = None
+
+if settings.database_replica is not None:
+    read_engine = make_engine(settings.database_replica)
+    if (validator := make_validator(read_engine, settings.database_replica)) is not None:
+        pool_validators.append(validator)
+    read_session_maker = async_sessionmaker(
+        read_engine,
+        expire_on_commit=False,
+        autoflush=False,
+        class_=AsyncSession,
+    )
+    replica_monitor = ReplicaMonitor(
+        read_engine,
+        max_lag_seconds=settings.database_replica.max_lag_seconds,
+        check_interval_seconds=settings.database_replica.lag_check_seconds,
+    )
+
+
+def read_session_maker_for(request: Request) -> async_sessionmaker[AsyncSession]:
+    """
+    Session factory for a read-only request: the replica when configured,
+    within its lag budget and not overridden by the X-Read-Primary header;
+    otherwise the primary.
+    """
+    if read_session_maker is None or not replica_monitor.usable:
+        return async_session_maker
+    if request.headers.get(READ_PRIMARY_HEADER, "").lower() in ("1", "true", "yes"):
+        return async_session_maker
+    return read_session_maker
+
+
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """
     Async database session dependency for FastAPI.
@@ -47,3 +111,18 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
         except Exception:
             await session.rollback()
             raise
+
+
+async def get_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Read-only session dependency (GET endpoints); see read_session_maker_for.
+
+    Yields:
+        AsyncSession: replica or primary session, automatically closed.
+    """
+    async with read_session_maker_for(request)() as session:
+        try:
+            yield session
+        except Exception:
+            await session.rollback()
+            raise
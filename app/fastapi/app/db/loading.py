@@ -0,0 +1,60 @@
+# app/db/loading.py
+"""
+Loader options for hot paths.
+
+All model relationships are lazy="raise" (models/base.py): a query loads
+exactly the relationships it names, and touching any other one raises
+instead of issuing a hidden per-row query. Each endpoint states what its
+response schema needs, e.g.
+
+    select(Device).options(joinedload(Device.latest))       # DeviceWithLatest
+    select(Account).options(*ACCOUNT_SUMMARY)               # AccountSummary
+
+Hot paths that need neither select plain columns (get_device_ref).
+"""
+from typing import NamedTuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only, noload, raiseload
+
+from ..models.account import Account
+from ..models.device import Device
+from ..models.enums import DeviceStatus
+
+# Never fetch relationships; unloaded attributes read as None / []
+HOT_PATH = (noload("*"),)
+
+# Raise on any relationship access (the model default, made explicit)
+STRICT = (raiseload("*"),)
+
+# AccountSummary columns only; reading a deferred column raises
+ACCOUNT_SUMMARY = (
+    load_only(
+        Account.id,
+        Account.name,
+        Account.account_type,
+        Account.is_active,
+        raiseload=True,
+    ),
+)
+
+
+class DeviceRef(NamedTuple):
+    """The device columns the ingest path needs."""
+    id: int
+    account_id: int
+    status: DeviceStatus
+
+
+async def get_device_ref(db: AsyncSession, device_id: int) -> DeviceRef | None:
+    """
+    Lightweight existence check: one primary-key lookup, three columns,
+    no relationship loading.
+    """
+    stmt = select(Device.id, Device.account_id, Device.status).where(
+        Device.id == device_id
+    )
+    result = await db.execute(stmt)
+    row = result.one_or_none()
+    return DeviceRef(*row) if row is not None else None
@@ -0,0 +1,36 @@
+# app/db/locks.py
+"""
+Session-level advisory locks for background jobs.
+
+Every worker process runs the same background jobs; the lock makes sure only
+one of them does a given job at a time. The lock is held on the connection,
+across the job's own commits.
+
+    async with engine.connect() as conn:
+        async with advisory_lock(conn, "job-name") as locked:
+            if locked:
+                ...
+"""
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+
+@asynccontextmanager
+async def advisory_lock(conn: AsyncConnection, name: str) -> AsyncIterator[bool]:
+    """Try to take the lock without waiting; yields whether it was taken."""
+    locked = await conn.scalar(
+        text("SELECT pg_try_advisory_lock(hashtext(:name))"), {"name": name}
+    )
+    await conn.commit()
+    try:
+        yield bool(locked)
+    finally:
+        if locked:
+            await conn.rollback()       # in case the job left a failed transaction
+            await conn.execute(
+                text("SELECT pg_advisory_unlock(hashtext(:name))"), {"name": name}
+            )
+            await conn.commit()
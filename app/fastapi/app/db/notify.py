@@ -0,0 +1,100 @@
+# app/db/notify.py
+"""
+Postgres LISTEN/NOTIFY listener.
+
+One dedicated asyncpg connection per worker (outside the SQLAlchemy pool)
+listens on the registered channels and dispatches payloads to callbacks.
+The connection is re-established with backoff; reconnect hooks run after
+every (re)connect because notifications sent while disconnected are lost.
+"""
+import asyncio
+import logging
+from collections.abc import Callable
+
+import asyncpg
+
+from ..config.setting import settings
+
+logger = logging.getLogger(__name__)
+
+NotifyCallback = Callable[[str], None]
+
+KEEPALIVE_SECONDS = 30
+MAX_BACKOFF_SECONDS = 30
+
+_CONNECTION_ERRORS = (
+    OSError,
+    asyncio.TimeoutError,
+    asyncpg.PostgresError,
+    asyncpg.InterfaceError,
+)
+
+
+class NotificationListener:
+    def __init__(self, dsn: str) -> None:
+        self._dsn = dsn
+        self._callbacks: dict[str, list[NotifyCallback]] = {}
+        self._reconnect_hooks: list[Callable[[], None]] = []
+        self._task: asyncio.Task | None = None
+
+    def subscribe(self, channel: str, callback: NotifyCallback) -> None:
+        """Call `callback(payload)` for every NOTIFY on `channel`."""
+        callbacks = self._callbacks.setdefault(channel, [])
+        if callback not in callbacks:
+            callbacks.append(callback)
+
+    def on_reconnect(self, hook: Callable[[], None]) -> None:
+        """Run `hook()` after every (re)connect, e.g. to drop caches."""
+        if hook not in self._reconnect_hooks:
+            self._reconnect_hooks.append(hook)
+
+    async def start(self) -> None:
+        if self._task is None and self._callbacks:
+            self._task = asyncio.create_task(self._run(), name="pg-listener")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _dispatch(self, conn, pid: int, channel: str, payload: str) -> None:
+        for callback in self._callbacks.get(channel, ()):
+            try:
+                callback(payload)
+            except Exception:
+                logger.exception("NOTIFY callback failed (channel=%s)", channel)
+
+    async def _run(self) -> None:
+        backoff = 1
+        while True:
+            try:
+                conn = await asyncpg.connect(self._dsn, timeout=10)
+            except _CONNECTION_ERRORS as exc:
+                logger.warning("LISTEN connection failed: %s", exc)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, MAX_BACKOFF_SECONDS)
+                continue
+
+            backoff = 1
+            try:
+                for channel in self._callbacks:
+                    await conn.add_listener(channel, self._dispatch)
+                for hook in self._reconnect_hooks:
+                    hook()
+
+                # Keepalive: a dead socket only surfaces on the next query
+                while True:
+                    await asyncio.sleep(KEEPALIVE_SECONDS)
+                    await conn.execute("SELECT 1", timeout=10)
+            except _CONNECTION_ERRORS as exc:
+                logger.warning("LISTEN connection lost: %s", exc)
+            finally:
+                conn.terminate()
+
+
+# Shared listener; channels are registered at startup (see main.lifespan)
+listener = NotificationListener(settings.database.dsn)
@@ -0,0 +1,148 @@
+# app/db/pool.py
+"""
+Connection pool instrumentation and background validation.
+
+InstrumentedPool times every checkout (queue wait, plus connect / pre-ping
+when they happen) into a fixed-bucket histogram and counts timeouts;
+invalidations (failed pre-pings, disconnects) are counted through the pool
+event. Live numbers are served on GET /health/pool.
+
+With `pool.pre_ping` off and `pool.validate_interval_seconds` set,
+PoolValidator pings the idle connections in the background instead, so
+requests do not pay a round trip per checkout. A connection that dies
+between two validations fails its request once and is replaced.
+"""
+import asyncio
+import logging
+import time
+
+from sqlalchemy import event, exc
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+logger = logging.getLogger(__name__)
+
+# checkout wait histogram upper bounds (seconds); last bucket is +Inf
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class PoolStats:
+    def __init__(self) -> None:
+        self.checkouts = 0
+        self.timeouts = 0
+        self.invalidations = 0
+        self.validations = 0
+        self.validation_failures = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.wait_buckets = [0] * (len(WAIT_BUCKETS) + 1)
+
+    def observe_wait(self, seconds: float) -> None:
+        self.checkouts += 1
+        self.wait_seconds_total += seconds
+        self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+        for i, bound in enumerate(WAIT_BUCKETS):
+            if seconds <= bound:
+                self.wait_buckets[i] += 1
+                return
+        self.wait_buckets[-1] += 1
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            self.stats.timeouts += 1
+            raise
+        finally:
+            self.stats.observe_wait(time.perf_counter() - start)
+
+    def recreate(self) -> "InstrumentedPool":
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+
+def instrument(engine: AsyncEngine) -> None:
+    """Count invalidations on the engine's (Instrumented)Pool."""
+    @event.listens_for(engine.sync_engine, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception) -> None:
+        engine.sync_engine.pool.stats.invalidations += 1
+
+
+def pool_status(engine: AsyncEngine) -> dict:
+    pool = engine.sync_engine.pool
+    stats: PoolStats = pool.stats
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": pool.overflow(),
+        "pre_ping": pool._pre_ping,
+        "checkouts": stats.checkouts,
+        "timeouts": stats.timeouts,
+        "invalidations": stats.invalidations,
+        "validations": stats.validations,
+        "validation_failures": stats.validation_failures,
+        "wait_seconds_total": stats.wait_seconds_total,
+        "wait_seconds_max": stats.wait_seconds_max,
+        "wait_histogram": {
+            **{str(bound): count for bound, count in zip(WAIT_BUCKETS, stats.wait_buckets)},
+            "+Inf": stats.wait_buckets[-1],
+        },
+    }
+
+
+class PoolValidator:
+    """Ping the pool's idle connections every `interval_seconds`."""
+
+    def __init__(self, engine: AsyncEngine, interval_seconds: float) -> None:
+        self._engine = engine
+        self.interval_seconds = interval_seconds
+        self._task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run(), name="pool-validator")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            await self.validate()
+
+    async def validate(self) -> None:
+        pool = self._engine.sync_engine.pool
+        stats: PoolStats = pool.stats
+        # One connection at a time, checked back in right after its ping so
+        # requests never wait on the validator. The pool is FIFO: a returned
+        # connection goes to the back, so checkedin() checkouts visit each
+        # idle one once. A failed ping invalidates (replaces) the connection.
+        for _ in range(pool.checkedin()):
+            if pool.checkedin() == 0:           # requests took the rest
+                break
+            try:
+                async with self._engine.connect() as conn:
+                    await conn.exec_driver_sql("SELECT 1")
+                    await conn.rollback()
+            except Exception:
+                stats.validation_failures += 1
+                logger.warning("Pool validation ping failed", exc_info=True)
+            else:
+                stats.validations += 1
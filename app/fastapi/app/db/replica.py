@@ -0,0 +1,87 @@
+# app/db/replica.py
+"""
+Read-replica lag monitor.
+
+Polls the standby every `lag_check_seconds`. Reads are routed to it only
+while it answers and its replay lag is within `max_lag_seconds`; otherwise
+get_read_db falls back to the primary until the next successful check.
+
+Lag is 0 while the standby has replayed everything it received (an idle
+primary does not make the replica look stale).
+"""
+import asyncio
+import logging
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+_LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+
+class ReplicaMonitor:
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        max_lag_seconds: float,
+        check_interval_seconds: float,
+    ) -> None:
+        self._engine = engine
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval_seconds = check_interval_seconds
+
+        self._task: asyncio.Task | None = None
+        self.lag_seconds: float | None = None     # None: unknown / unreachable
+        self.checks = 0
+        self.failed_checks = 0
+
+    @property
+    def usable(self) -> bool:
+        return self.lag_seconds is not None and self.lag_seconds <= self.max_lag_seconds
+
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run(), name="replica-lag-monitor")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self.lag_seconds = None
+
+    async def _run(self) -> None:
+        while True:
+            await self.check()
+            await asyncio.sleep(self.check_interval_seconds)
+
+    async def check(self) -> None:
+        was_usable = self.usable
+        try:
+            async with self._engine.connect() as conn:
+                self.lag_seconds = float(await conn.scalar(_LAG_SQL))
+        except Exception:
+            self.lag_seconds = None
+            self.failed_checks += 1
+            if was_usable:
+                logger.warning("Read replica unreachable; reading from primary", exc_info=True)
+            return
+        self.checks += 1
+        if was_usable and not self.usable:
+            logger.warning(
+                "Read replica lag %.1fs > %.1fs; reading from primary",
+                self.lag_seconds,
+                self.max_lag_seconds,
+            )
@@ -0,0 +1,116 @@
+# app/db/stats.py
+"""
+Statement accounting on top of SQLAlchemy engine events.
+
+- StatementCounter: used by the query-budget regression tests to assert how
+  many statements and result rows a request costs
+- RequestDbStats: per-request statement count and DB time, collected by
+  track_request_statements() listeners into the RequestDbStats bound to
+  `request_db_stats` (set by the metrics middleware); with `profile` on
+  (profiling middleware) it also keeps per-SQL counts and timings
+"""
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+@dataclass(eq=False)
+class StatementCounter:
+    """
+    Count statements executed on an engine and rows they returned.
+
+    Usage:
+        with StatementCounter(engine) as counter:
+            ...
+        counter.statements, counter.rows
+
+    Driver-level calls that bypass the cursor (asyncpg COPY) are not seen.
+    """
+    engine: AsyncEngine
+    statements: int = 0
+    rows: int = 0
+    sql: list[str] = field(default_factory=list)
+
+    def _after_cursor_execute(
+        self, conn, cursor, statement, parameters, context, executemany
+    ) -> None:
+        self.statements += 1
+        self.sql.append(statement)
+        # asyncpg adapter parses rowcount from the status message ("SELECT n")
+        if cursor.description is not None and cursor.rowcount > 0:
+            self.rows += cursor.rowcount
+
+    def __enter__(self) -> "StatementCounter":
+        event.listen(
+            self.engine.sync_engine,
+            "after_cursor_execute",
+            self._after_cursor_execute,
+        )
+        return self
+
+    def __exit__(self, *exc) -> None:
+        event.remove(
+            self.engine.sync_engine,
+            "after_cursor_execute",
+            self._after_cursor_execute,
+        )
+
+
+@dataclass(eq=False)
+class RequestDbStats:
+    statements: int = 0
+    seconds: float = 0.0
+    # profiling only: statement text -> executions / total seconds
+    profile: bool = False
+    counts: Counter[str] = field(default_factory=Counter)
+    timings: dict[str, float] = field(default_factory=dict)
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.statements += 1
+        self.seconds += seconds
+        if self.profile:
+            self.counts[statement] += 1
+            self.timings[statement] = self.timings.get(statement, 0.0) + seconds
+
+    def slowest(self, n: int) -> list[tuple[str, int, float]]:
+        """(statement, executions, total seconds) of the n most expensive statements."""
+        ranked = sorted(self.timings.items(), key=lambda item: item[1], reverse=True)
+        return [(sql, self.counts[sql], seconds) for sql, seconds in ranked[:n]]
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """Statements executed at least `threshold` times (likely N+1 lazy loads)."""
+        return [(sql, count) for sql, count in self.counts.most_common() if count >= threshold]
+
+
+# Bound per request; statements outside a request (background jobs) are not counted
+request_db_stats: ContextVar[RequestDbStats | None] = ContextVar(
+    "request_db_stats", default=None
+)
+
+
+def track_request_statements(engine: AsyncEngine) -> None:
+    """Accumulate statement count / cursor time into request_db_stats."""
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany) -> None:
+        if request_db_stats.get() is not None:
+            conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany) -> None:
+        stats = request_db_stats.get()
+        starts = conn.info.get("query_start")
+        if stats is None or not starts:
+            return
+        stats.record(statement, time.perf_counter() - starts.pop())
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _error(context) -> None:
+        starts = context.connection.info.get("query_start") if context.connection else None
+        if starts:
+            starts.pop()
@@ -1,7 +1,70 @@
 # app/main.py
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
+from fastapi.responses import Response
 from .config.setting import settings
-from .routers import health, accounts, users, plans, subscriptions, api_keys, devices, telemetry
+from .db.database import pool_validators, replica_monitor
+from .db.notify import listener
+from .middleware.metrics import MetricsMiddleware
+from .middleware.profiling import ProfilingMiddleware
+from .routers import health, accounts, users, plans, subscriptions, api_keys, devices, telemetry, metrics
+from .services.device_cache import DEVICE_CHANNEL, device_cache
+from .services.device_quota import QUOTA_CHANNEL, device_quota
+from .services.fleet_snapshot import fleet_snapshot
+from .services.latest_state import latest_aggregator
+from .services.live import LIVE_CHANNEL, live_hub
+from .services.metrics import mark_process_dead
+from .services.partitions import partition_manager
+from .services.response_cache import PLAN_CHANNEL, reference_cache
+from .services.retention import retention_worker
+from .services.write_behind import write_buffer
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # LISTEN/NOTIFY: device cache / device quota / reference cache invalidation
+    listener.subscribe(DEVICE_CHANNEL, device_cache.on_notify)
+    listener.subscribe(QUOTA_CHANNEL, device_quota.on_notify)
+    listener.subscribe(PLAN_CHANNEL, reference_cache.on_notify)
+    if settings.live.enabled:
+        # live telemetry fan-out to this worker's WebSocket / SSE clients
+        listener.subscribe(LIVE_CHANNEL, live_hub.on_notify)
+    listener.on_reconnect(device_cache.clear)
+    listener.on_reconnect(device_quota.clear)
+    listener.on_reconnect(reference_cache.clear)
+    await listener.start()
+
+    for validator in pool_validators:
+        await validator.start()
+    if replica_monitor is not None:
+        await replica_monitor.start()
+    if settings.partitions.enabled:
+        await partition_manager.start()
+    if settings.retention.enabled:
+        await retention_worker.start()
+    if settings.fleet.enabled:
+        await fleet_snapshot.start()
+    if settings.ingest.coalesce_latest:
+        await latest_aggregator.start()
+    if settings.ingest.write_behind:
+        await write_buffer.start()
+
+    yield
+
+    # drain buffered telemetry, then the latest state it produced
+    await write_buffer.stop()
+    await latest_aggregator.stop()
+    await fleet_snapshot.stop()
+    await retention_worker.stop()
+    await partition_manager.stop()
+    await listener.stop()
+    if replica_monitor is not None:
+        await replica_monitor.stop()
+    for validator in pool_validators:
+        await validator.stop()
+    mark_process_dead()
+
 
 app = FastAPI(
     title="Device Management API",
@@ -9,11 +72,33 @@ app = FastAPI(
     description=(
         "API for managing IoT devices.\n"
     ),
+    lifespan=lifespan,
 )
 
+# SQL profiling: Server-Timing headers, statement budget / N+1 warnings.
+# Added first so it runs inside MetricsMiddleware and shares its RequestDbStats
+if settings.profiling.enabled:
+    app.add_middleware(
+        ProfilingMiddleware,
+        top_n=settings.profiling.top_n,
+        statement_budget=settings.profiling.statement_budget,
+        repeat_threshold=settings.profiling.repeat_threshold,
+        sql_max_length=settings.profiling.sql_max_length,
+    )
+
+# Prometheus: per-route latency, in-flight, DB statements / time per request
+app.add_middleware(MetricsMiddleware, skip_paths=frozenset({"/metrics"}))
+
 
 @app.get("/", tags=["root"], summary="Service info")
-async def home():
+async def home(request: Request) -> Response:
+    entry = reference_cache.get("/")
+    if entry is None:
+        entry = reference_cache.put("/", _service_info())
+    return entry.response(request)
+
+
+def _service_info() -> dict:
     db_cfg = settings.database
     return {
         "service": "device-management-api",
@@ -43,3 +128,4 @@ app.include_router(subscriptions.router)
 app.include_router(api_keys.router)
 app.include_router(devices.router)
 app.include_router(telemetry.router)
+app.include_router(metrics.router)
@@ -0,0 +1,56 @@
+# app/middleware/metrics.py
+"""
+Per-request Prometheus instrumentation (pure ASGI middleware).
+
+Labels use the matched route template (`/telemetry/{device_id}`), never the
+raw path, so label cardinality stays bounded; unmatched paths share one
+label. DB statement count / time come from the engine listeners in
+db/stats.py through the request-scoped RequestDbStats.
+"""
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..db.stats import RequestDbStats, request_db_stats
+from ..services import metrics
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp, skip_paths: frozenset[str] = frozenset()) -> None:
+        self.app = app
+        self.skip_paths = skip_paths
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        db_stats = RequestDbStats()
+        token = request_db_stats.set(db_stats)
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress = metrics.http_requests_in_progress.labels(method)
+        in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            in_progress.dec()
+            request_db_stats.reset(token)
+
+            route = scope.get("route")
+            template = getattr(route, "path", None) or UNMATCHED_ROUTE
+            metrics.http_requests.labels(method, template, str(status_code)).inc()
+            metrics.http_request_duration.labels(method, template).observe(elapsed)
+            metrics.db_statements_per_request.labels(template).observe(db_stats.statements)
+            metrics.db_time_per_request.labels(template).observe(db_stats.seconds)
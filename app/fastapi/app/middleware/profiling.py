@@ -0,0 +1,115 @@
+# app/middleware/profiling.py
+"""
+Opt-in SQL profiling (PROFILING__ENABLED=true), pure ASGI middleware.
+
+Every request gets a Server-Timing header, readable in the browser devtools
+or with `curl -i`:
+
+    Server-Timing: app;dur=41.2, db;dur=30.5;desc="12 statements",
+                   sql-1;dur=18.0;desc="10x SELECT plan.code ...", ...
+
+`sql-N` are the top_n most expensive statements (total time over all their
+executions). The header is written when the response starts, so statements
+a streaming body runs afterwards are only in the log.
+
+At the end of the request a warning is logged when the request exceeded
+`statement_budget` statements, and for every statement executed at least
+`repeat_threshold` times: the signature of a lazy / per-row load (N+1).
+
+Timing comes from the engine listeners in db/stats.py; when the metrics
+middleware already bound a RequestDbStats it is reused.
+"""
+import logging
+import re
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..db.stats import RequestDbStats, request_db_stats
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _sql_label(statement: str, max_length: int) -> str:
+    """One line, header-safe, truncated statement text."""
+    label = _WHITESPACE.sub(" ", statement).strip()
+    label = label.replace("\\", "").replace('"', "'")
+    label = label.encode("latin-1", "replace").decode("latin-1")
+    if len(label) > max_length:
+        label = label[: max_length - 3].rstrip() + "..."
+    return label
+
+
+class ProfilingMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        top_n: int = 5,
+        statement_budget: int = 20,
+        repeat_threshold: int = 5,
+        sql_max_length: int = 120,
+    ) -> None:
+        self.app = app
+        self.top_n = top_n
+        self.statement_budget = statement_budget
+        self.repeat_threshold = repeat_threshold
+        self.sql_max_length = sql_max_length
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        db_stats = request_db_stats.get()
+        token = None
+        if db_stats is None:
+            db_stats = RequestDbStats()
+            token = request_db_stats.set(db_stats)
+        db_stats.profile = True
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", self.server_timing(db_stats, start))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if token is not None:
+                request_db_stats.reset(token)
+            self.report(scope, db_stats)
+
+    def server_timing(self, db_stats: RequestDbStats, start: float) -> str:
+        entries = [
+            f"app;dur={(time.perf_counter() - start) * 1000:.1f}",
+            f'db;dur={db_stats.seconds * 1000:.1f};desc="{db_stats.statements} statements"',
+        ]
+        for i, (sql, count, seconds) in enumerate(db_stats.slowest(self.top_n), 1):
+            label = _sql_label(sql, self.sql_max_length)
+            entries.append(f'sql-{i};dur={seconds * 1000:.1f};desc="{count}x {label}"')
+        return ", ".join(entries)
+
+    def report(self, scope: Scope, db_stats: RequestDbStats) -> None:
+        route = scope.get("route")
+        where = f'{scope["method"]} {getattr(route, "path", None) or scope["path"]}'
+
+        if db_stats.statements > self.statement_budget:
+            logger.warning(
+                "%s: %d SQL statements (budget %d), %.1f ms in the database",
+                where,
+                db_stats.statements,
+                self.statement_budget,
+                db_stats.seconds * 1000,
+            )
+        for sql, count in db_stats.repeated(self.repeat_threshold):
+            logger.warning(
+                "%s: statement executed %d times, possible N+1: %s",
+                where,
+                count,
+                _sql_label(sql, self.sql_max_length),
+            )
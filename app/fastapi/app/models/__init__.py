@@ -8,6 +8,7 @@ from .api_key import ApiKey
 from .device import Device
 from .device_telemetry import DeviceTelemetry
 from .device_latest import DeviceLatest
+from .account_device_count import AccountDeviceCount
 
 __all__ = [
     "Base",
@@ -19,4 +20,5 @@ __all__ = [
     "Device",
     "DeviceTelemetry",
     "DeviceLatest",
+    "AccountDeviceCount",
 ]
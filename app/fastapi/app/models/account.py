@@ -44,25 +44,25 @@ class Account(Base):
         "User",
         back_populates="account",
         cascade="all, delete-orphan",
-        lazy="selectin",
+        lazy="raise",
     )
     subscription = relationship(
         "Subscription",
         back_populates="account",
         uselist=False,
-        lazy="selectin",
+        lazy="raise",
     )
     api_keys = relationship(
         "ApiKey",
         back_populates="account",
         cascade="all, delete-orphan",
-        lazy="selectin",
+        lazy="raise",
     )
     devices = relationship(
         "Device",
         back_populates="account",
         cascade="all, delete-orphan",
-        lazy="selectin",
+        lazy="raise",
     )
 
     __table_args__ = (
@@ -0,0 +1,17 @@
+# models/account_device_count.py
+from sqlalchemy import ForeignKey, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class AccountDeviceCount(Base):
+    """Per-account device counter, maintained by trg_device_count_account."""
+    __tablename__ = "account_device_count"
+
+    account_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("db_schema.account.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    device_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
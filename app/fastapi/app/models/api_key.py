@@ -28,7 +28,7 @@ class ApiKey(Base):
     is_active: Mapped[bool] = mapped_column(
         Boolean, nullable=False, default=True)
 
-    account = relationship("Account", back_populates="api_keys", lazy="joined")
+    account = relationship("Account", back_populates="api_keys", lazy="raise")
 
     __table_args__ = (
         UniqueConstraint(
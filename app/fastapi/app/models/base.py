@@ -7,4 +7,9 @@ metadata = MetaData(schema="db_schema")
 
 
 class Base(DeclarativeBase):
+    """
+    Every relationship is declared lazy="raise": nothing is loaded unless the
+    query asks for it (selectinload / joinedload, see db/loading.py), and an
+    unplanned access fails loudly instead of issuing hidden queries.
+    """
     metadata = metadata
@@ -8,6 +8,7 @@ from sqlalchemy import (
     Integer,
     String,
     Index,
+    func,
 )
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import JSONB
@@ -55,23 +56,24 @@ class Device(Base):
     last_seen_at: Mapped[datetime | None] = mapped_column(
         DateTime(timezone=True), nullable=True
     )
+    # DB defaults (now()): omitted from INSERT, read back after flush
     created_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), nullable=False)
+        DateTime(timezone=True), nullable=False, server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), nullable=False)
+        DateTime(timezone=True), nullable=False, server_default=func.now())
 
-    account = relationship("Account", back_populates="devices", lazy="joined")
+    account = relationship("Account", back_populates="devices", lazy="raise")
     telemetry = relationship(
         "DeviceTelemetry",
         back_populates="device",
         cascade="all, delete-orphan",
-        lazy="selectin",
+        lazy="raise",
     )
     latest = relationship(
         "DeviceLatest",
         back_populates="device",
         uselist=False,
-        lazy="joined",
+        lazy="raise",
     )
 
     __table_args__ = (
@@ -80,4 +82,11 @@ class Device(Base):
         # we don't need to re-name if we don't care; but it's fine to match
         Index("idx_device_account_type_name", "account_id", "type", "name"),
         Index("idx_device_account_status", "account_id", "status"),
+        # pg_trgm: substring search on name
+        Index(
+            "idx_device_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
     )
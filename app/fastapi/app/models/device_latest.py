@@ -24,4 +24,4 @@ class DeviceLatest(Base):
     y_coord: Mapped[float] = mapped_column(Float, nullable=False)
     meta: Mapped[dict] = mapped_column(JSONB, nullable=False, default=dict)
 
-    device = relationship("Device", back_populates="latest", lazy="joined")
+    device = relationship("Device", back_populates="latest", lazy="raise")
@@ -34,7 +34,7 @@ class DeviceTelemetry(Base):
     y_coord: Mapped[float] = mapped_column(Float, nullable=False)
     meta: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
 
-    device = relationship("Device", back_populates="telemetry", lazy="joined")
+    device = relationship("Device", back_populates="telemetry", lazy="raise")
 
     __table_args__ = (
         Index(
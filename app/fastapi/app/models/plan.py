@@ -33,5 +33,5 @@ class Plan(Base):
     subscriptions = relationship(
         "Subscription",
         back_populates="plan",
-        lazy="selectin",
+        lazy="raise",
     )
@@ -45,8 +45,8 @@ class Subscription(Base):
         DateTime(timezone=True), nullable=False)
 
     account = relationship(
-        "Account", back_populates="subscription", lazy="joined")
-    plan = relationship("Plan", back_populates="subscriptions", lazy="joined")
+        "Account", back_populates="subscription", lazy="raise")
+    plan = relationship("Plan", back_populates="subscriptions", lazy="raise")
 
     __table_args__ = (
         UniqueConstraint("account_id", name="uq_subscription_account"),
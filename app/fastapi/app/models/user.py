@@ -36,7 +36,7 @@ class User(Base):
     updated_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), nullable=False)
 
-    account = relationship("Account", back_populates="users", lazy="joined")
+    account = relationship("Account", back_populates="users", lazy="raise")
 
     __table_args__ = (
         UniqueConstraint(
@@ -1,11 +1,13 @@
 # app/routers/accounts.py
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..db.database import get_db
+from ..db.database import get_read_db
+from ..db.loading import ACCOUNT_SUMMARY
 from ..models.account import Account
 from ..schemas.account import AccountSummary, AccountDetail
+from .pagination import KeysetPage, set_next_page
 
 router = APIRouter(prefix="/accounts", tags=["accounts"])
 
@@ -16,18 +18,28 @@ router = APIRouter(prefix="/accounts", tags=["accounts"])
     response_model=list[AccountSummary],
 )
 async def list_accounts(
+    request: Request,
+    response: Response,
     limit: int = Query(50, ge=1, le=200, description="Maximum number of accounts"),
     offset: int = Query(0, ge=0, description="Offset for pagination"),
-    db: AsyncSession = Depends(get_db),
+    page: KeysetPage = Depends(),
+    db: AsyncSession = Depends(get_read_db),
 ) -> list[AccountSummary]:
     stmt = (
         select(Account)
+        .options(*ACCOUNT_SUMMARY)
         .order_by(Account.id)
-        .offset(offset)
         .limit(limit)
     )
+    stmt = page.apply(stmt, Account.id, offset)
     result = await db.execute(stmt)
     accounts = result.scalars().all()
+    set_next_page(
+        request,
+        response,
+        accounts[-1].id if accounts else None,
+        page_full=len(accounts) == limit,
+    )
     return [AccountSummary.model_validate(a) for a in accounts]
 
 
@@ -38,7 +50,7 @@ async def list_accounts(
 )
 async def get_account(
     account_id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ) -> AccountDetail:
     stmt = select(Account).where(Account.id == account_id)
     result = await db.execute(stmt)
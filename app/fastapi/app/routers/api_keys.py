@@ -1,11 +1,12 @@
 # app/routers/api_keys.py
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..db.database import get_db
+from ..db.database import get_read_db
 from ..models.api_key import ApiKey
 from ..schemas.api_key import ApiKeyRead
+from .pagination import KeysetPage, set_next_page
 
 router = APIRouter(
     prefix="/api-keys",
@@ -19,6 +20,8 @@ router = APIRouter(
     response_model=list[ApiKeyRead],
 )
 async def list_api_keys(
+    request: Request,
+    response: Response,
     account_id: int | None = Query(
         default=None,
         description="Optional filter: only API keys for this account_id",
@@ -38,7 +41,8 @@ async def list_api_keys(
         ge=0,
         description="Offset for pagination",
     ),
-    db: AsyncSession = Depends(get_db),
+    page: KeysetPage = Depends(),
+    db: AsyncSession = Depends(get_read_db),
 ) -> list[ApiKeyRead]:
     """
     Return a paginated list of API keys.
@@ -46,13 +50,14 @@ async def list_api_keys(
     Read-only:
     - `key_hash` is never exposed.
     - Optional filters by `account_id` and `is_active`.
+    - Keyset pagination via `after_id` / `cursor` (next page in `Link`).
     """
     stmt = (
         select(ApiKey)
         .order_by(ApiKey.id)
-        .offset(offset)
         .limit(limit)
     )
+    stmt = page.apply(stmt, ApiKey.id, offset)
 
     if account_id is not None:
         stmt = stmt.where(ApiKey.account_id == account_id)
@@ -62,6 +67,12 @@ async def list_api_keys(
 
     result = await db.execute(stmt)
     keys = result.scalars().all()
+    set_next_page(
+        request,
+        response,
+        keys[-1].id if keys else None,
+        page_full=len(keys) == limit,
+    )
 
     return [ApiKeyRead.model_validate(k) for k in keys]
 
@@ -73,7 +84,7 @@ async def list_api_keys(
 )
 async def get_api_key(
     api_key_id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ) -> ApiKeyRead:
     """
     Get a single API key by its ID.
@@ -1,14 +1,31 @@
 # app/routers/devices.py
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import select
+import time
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi import status as http_status
+from pydantic_core import to_json
+from sqlalchemy import BigInteger, ColumnElement, any_, bindparam, func, select
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import joinedload, noload
 
-from ..db.database import get_db
+from ..db.database import get_db, get_read_db
 from ..models.device import Device
 from ..models.device_latest import DeviceLatest
-from ..schemas.device import DeviceRead, DeviceWithLatest
+from ..schemas.device import (
+    MAX_BATCH_IDS,
+    DeviceBatch,
+    DeviceBatchRequest,
+    DeviceCreate,
+    DeviceRead,
+    DeviceWithLatest,
+)
+from ..schemas.device_latest import DeviceLatestRead, NearestDevice
 from ..schemas.enums import DeviceStatus
+from ..services.device_quota import device_quota
+from ..services.fleet_snapshot import fleet_snapshot
+from .pagination import KeysetPage, set_next_page
 
 router = APIRouter(
     prefix="/devices",
@@ -22,6 +39,8 @@ router = APIRouter(
     response_model=list[DeviceRead],
 )
 async def list_devices(
+    request: Request,
+    response: Response,
     account_id: int | None = Query(
         default=None,
         description="Optional filter: only devices for this account_id",
@@ -49,7 +68,8 @@ async def list_devices(
         ge=0,
         description="Offset for pagination",
     ),
-    db: AsyncSession = Depends(get_db),
+    page: KeysetPage = Depends(),
+    db: AsyncSession = Depends(get_read_db),
 ) -> list[DeviceRead]:
     """
     Return a paginated list of devices.
@@ -59,13 +79,16 @@ async def list_devices(
     - status
     - type
     - simple name substring search
+
+    Keyset pagination: pass `after_id` or `cursor`; the next page is
+    advertised in the `Link` / `X-Next-Cursor` headers.
     """
     stmt = (
         select(Device)
         .order_by(Device.id)
-        .offset(offset)
         .limit(limit)
     )
+    stmt = page.apply(stmt, Device.id, offset)
 
     if account_id is not None:
         stmt = stmt.where(Device.account_id == account_id)
@@ -78,15 +101,291 @@ async def list_devices(
         stmt = stmt.where(Device.type == type)
 
     if name_search is not None:
-        # simple ILIKE search; not indexed but good enough for dev
-        stmt = stmt.where(Device.name.ilike(f"%{name_search}%"))
+        # ILIKE '%...%' is served by idx_device_name_trgm (3+ characters)
+        stmt = stmt.where(_name_contains(name_search))
 
     result = await db.execute(stmt)
     devices = result.scalars().all()
+    set_next_page(
+        request,
+        response,
+        devices[-1].id if devices else None,
+        page_full=len(devices) == limit,
+    )
 
     return [DeviceRead.model_validate(d) for d in devices]
 
 
+# Same expression as idx_device_latest_point (GiST, 13_device_latest.sql)
+LATEST_POINT = func.point(DeviceLatest.x_coord, DeviceLatest.y_coord)
+
+
+@router.get(
+    "/latest/within",
+    summary="Devices whose latest position is inside a box or circle",
+    response_model=list[DeviceLatestRead],
+)
+async def list_latest_within(
+    min_x: float | None = Query(default=None, description="Box: lower-left x"),
+    min_y: float | None = Query(default=None, description="Box: lower-left y"),
+    max_x: float | None = Query(default=None, description="Box: upper-right x"),
+    max_y: float | None = Query(default=None, description="Box: upper-right y"),
+    x: float | None = Query(default=None, description="Circle: center x"),
+    y: float | None = Query(default=None, description="Circle: center y"),
+    radius: float | None = Query(default=None, gt=0, description="Circle: radius"),
+    account_id: int | None = Query(
+        default=None,
+        description="Optional filter: only devices for this account_id",
+    ),
+    limit: int = Query(1000, ge=1, le=50_000, description="Maximum number of devices"),
+    db: AsyncSession = Depends(get_read_db),
+) -> Response:
+    """
+    Latest positions inside a bounding box (min_x, min_y, max_x, max_y) or a
+    circle (x, y, radius); give exactly one of the two.
+
+    Both are answered from the GiST index on point(x_coord, y_coord) of
+    device_latest, not by scanning the fleet. Box results are ordered by
+    device_id, circle results nearest first.
+    """
+    box = (min_x, min_y, max_x, max_y)
+    circle = (x, y, radius)
+
+    stmt = select(
+        DeviceLatest.device_id,
+        DeviceLatest.recorded_at,
+        DeviceLatest.x_coord,
+        DeviceLatest.y_coord,
+        DeviceLatest.meta,
+    ).limit(limit)
+
+    if None not in box and circle == (None, None, None):
+        if min_x > max_x or min_y > max_y:
+            raise HTTPException(status_code=422, detail="min_x/min_y must not exceed max_x/max_y")
+        area = func.box(func.point(min_x, min_y), func.point(max_x, max_y))
+        stmt = stmt.where(LATEST_POINT.op("<@")(area)).order_by(DeviceLatest.device_id)
+    elif None not in circle and box == (None, None, None, None):
+        center = func.point(x, y)
+        stmt = stmt.where(LATEST_POINT.op("<@")(func.circle(center, radius))).order_by(
+            LATEST_POINT.op("<->")(center)
+        )
+    else:
+        raise HTTPException(
+            status_code=422,
+            detail="Give either min_x, min_y, max_x, max_y or x, y, radius",
+        )
+
+    if account_id is not None:
+        stmt = stmt.join(Device, Device.id == DeviceLatest.device_id).where(
+            Device.account_id == account_id
+        )
+
+    result = await db.execute(stmt)
+    # plain rows straight to JSON, as the telemetry read endpoints do
+    return Response(
+        content=to_json([row._asdict() for row in result]),
+        media_type="application/json",
+    )
+
+
+def _name_contains(term: str) -> ColumnElement[bool]:
+    """Case-insensitive substring match on name, LIKE wildcards escaped."""
+    escaped = term.replace("/", "//").replace("%", "/%").replace("_", "/_")
+    return Device.name.ilike(f"%{escaped}%", escape="/")
+
+
+# /search, /info, /batch and /nearest are declared before /{device_id},
+# which would otherwise capture them
+@router.get(
+    "/search",
+    summary="Search devices by name (trigram index, most relevant first)",
+    response_model=list[DeviceRead],
+)
+async def search_devices(
+    q: str = Query(
+        ...,
+        min_length=3,
+        max_length=100,
+        description="Substring of the device name (case-insensitive, 3+ characters)",
+    ),
+    account_id: int | None = Query(
+        default=None,
+        description="Optional filter: only devices for this account_id",
+    ),
+    limit: int = Query(20, ge=1, le=200, description="Maximum number of devices"),
+    db: AsyncSession = Depends(get_read_db),
+) -> list[DeviceRead]:
+    """
+    Devices whose name contains `q`, best match first.
+
+    The substring filter is answered from idx_device_name_trgm (pg_trgm GIN)
+    instead of a sequential scan; matches are ranked by
+    word_similarity(q, name), then by id.
+    """
+    stmt = (
+        select(Device)
+        .where(_name_contains(q))
+        .order_by(func.word_similarity(q, Device.name).desc(), Device.id)
+        .limit(limit)
+    )
+    if account_id is not None:
+        stmt = stmt.where(Device.account_id == account_id)
+
+    result = await db.execute(stmt)
+    return [DeviceRead.model_validate(d) for d in result.scalars()]
+
+
+@router.get(
+    "/info",
+    summary="Get a device by account, name and type",
+    response_model=DeviceRead,
+)
+async def get_device_info(
+    account_id: int = Query(..., description="Owning account"),
+    name: str = Query(..., min_length=1, max_length=255, description="Exact device name"),
+    type: str = Query(..., min_length=1, max_length=100, description="Exact device type"),
+    db: AsyncSession = Depends(get_read_db),
+) -> DeviceRead:
+    """
+    Exact lookup: one probe of idx_device_account_type_name
+    (account_id, type, name). Names are unique per account, so there is at
+    most one match.
+    """
+    stmt = select(Device).where(
+        Device.account_id == account_id,
+        Device.type == type,
+        Device.name == name,
+    )
+    result = await db.execute(stmt)
+    device = result.scalar_one_or_none()
+
+    if device is None:
+        raise HTTPException(status_code=404, detail="Device not found")
+
+    return DeviceRead.model_validate(device)
+
+
+@router.get(
+    "/batch",
+    summary="Get many devices (with latest location) by ID",
+    response_model=DeviceBatch,
+)
+async def get_device_batch(
+    ids: str = Query(
+        ...,
+        description=f"Comma-separated device IDs (at most {MAX_BATCH_IDS})",
+        examples=["1,2,3"],
+    ),
+    db: AsyncSession = Depends(get_read_db),
+) -> DeviceBatch:
+    """
+    Replace N calls to GET /devices/{device_id} with one query.
+
+    Items follow the order of `ids` (duplicates once); IDs that do not
+    exist are listed in `missing`. Use POST /devices/batch for long lists.
+    """
+    try:
+        device_ids = [int(part) for part in ids.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(status_code=422, detail="ids must be comma-separated integers")
+    if not 1 <= len(device_ids) <= MAX_BATCH_IDS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Give between 1 and {MAX_BATCH_IDS} ids",
+        )
+    return await _device_batch(db, device_ids)
+
+
+@router.post(
+    "/batch",
+    summary="Get many devices (with latest location) by ID, IDs in the body",
+    response_model=DeviceBatch,
+)
+async def post_device_batch(
+    payload: DeviceBatchRequest,
+    db: AsyncSession = Depends(get_read_db),
+) -> DeviceBatch:
+    """Same as GET /devices/batch, for ID lists too long for a URL."""
+    return await _device_batch(db, payload.ids)
+
+
+async def _device_batch(db: AsyncSession, device_ids: list[int]) -> DeviceBatch:
+    requested = list(dict.fromkeys(device_ids))     # dedupe, keep order
+
+    # one round trip: id = ANY($1) with device_latest joined in
+    stmt = (
+        select(Device)
+        .options(joinedload(Device.latest))
+        .where(
+            Device.id == any_(
+                bindparam("device_ids", requested, type_=ARRAY(BigInteger))
+            )
+        )
+    )
+    result = await db.execute(stmt)
+    found = {device.id: device for device in result.scalars()}
+
+    return DeviceBatch(
+        items=[
+            DeviceWithLatest.model_validate(found[device_id])
+            for device_id in requested
+            if device_id in found
+        ],
+        missing=[device_id for device_id in requested if device_id not in found],
+    )
+
+
+@router.get(
+    "/nearest",
+    summary="Nearest devices to a point, from the in-memory fleet snapshot",
+    response_model=list[NearestDevice],
+    responses={503: {"description": "Fleet snapshot disabled or not loaded yet"}},
+)
+async def list_nearest(
+    x: float = Query(..., description="Query point x"),
+    y: float = Query(..., description="Query point y"),
+    k: int = Query(10, ge=1, le=1000, description="Maximum number of devices"),
+    radius: float | None = Query(
+        default=None,
+        gt=0,
+        description="Optional: only devices within this distance",
+    ),
+    account_id: int | None = Query(
+        default=None,
+        description="Optional filter: only devices for this account_id",
+    ),
+    max_age_seconds: float | None = Query(
+        default=None,
+        gt=0,
+        description="Optional: only positions recorded in the last N seconds",
+    ),
+) -> Response:
+    """
+    k nearest devices (by latest position) to (x, y), nearest first.
+
+    Answered from this worker's grid-indexed snapshot of device_latest
+    (FLEET__ENABLED), no database round trip; positions are at most
+    FLEET__INTERVAL_SECONDS behind. With `radius` this is a radius query
+    capped at k results.
+    """
+    index = fleet_snapshot.index
+    if index is None:
+        raise HTTPException(status_code=503, detail="Fleet snapshot not available")
+
+    hits = index.nearest(
+        x,
+        y,
+        k,
+        radius=radius,
+        account_id=account_id,
+        min_recorded_at=time.time() - max_age_seconds if max_age_seconds else None,
+    )
+    return Response(
+        content=to_json([{**index.row(slot), "distance": distance} for distance, slot in hits]),
+        media_type="application/json",
+    )
+
+
 @router.get(
     "/{device_id}",
     summary="Get device by ID (optionally with latest location)",
@@ -98,17 +397,20 @@ async def get_device(
         default=True,
         description="If true, include latest location from device_latest table",
     ),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ) -> DeviceWithLatest:
     """
     Get a single device by ID.
 
     By default, also includes the latest location (if present) from `device_latest`.
     """
+    # DeviceWithLatest only needs `latest` (one-to-one: same query)
     stmt = select(Device).where(Device.id == device_id)
 
     if include_latest:
-        stmt = stmt.options(selectinload(Device.latest))
+        stmt = stmt.options(joinedload(Device.latest))
+    else:
+        stmt = stmt.options(noload(Device.latest))
 
     result = await db.execute(stmt)
     device = result.scalar_one_or_none()
@@ -116,6 +418,76 @@ async def get_device(
     if device is None:
         raise HTTPException(status_code=404, detail="Device not found")
 
-    # If include_latest=False, Device.latest may not be loaded,
-    # but DeviceWithLatest.latest is allowed to be None.
+    # If include_latest=False, Device.latest is not loaded (noload -> None),
+    # and DeviceWithLatest.latest is allowed to be None.
     return DeviceWithLatest.model_validate(device)
+
+
+@router.post(
+    "",
+    summary="Provision a device (enforces the plan's max_devices)",
+    response_model=DeviceRead,
+    status_code=http_status.HTTP_201_CREATED,
+    responses={
+        403: {"description": "Account is at its plan's device quota"},
+        404: {"description": "Account not found"},
+        409: {"description": "Device name already used in this account"},
+    },
+)
+async def create_device(
+    payload: DeviceCreate,
+    db: AsyncSession = Depends(get_db),
+) -> DeviceRead:
+    """
+    Create a device.
+
+    The quota check reads the cached account_device_count / plan.max_devices
+    (no count(*)); the device trigger re-checks it inside the transaction,
+    so concurrent requests cannot overshoot the quota.
+    """
+    quota = await device_quota.get(db, payload.account_id)
+    if quota is not None and quota.exhausted:
+        raise _quota_exceeded(payload.account_id, quota.max_devices)
+
+    device = Device(**payload.model_dump())
+    db.add(device)
+    try:
+        await db.flush()
+    except IntegrityError as exc:
+        await db.rollback()
+        device_quota.invalidate(payload.account_id)
+        sqlstate, constraint = _integrity_error(exc)
+        if sqlstate == "23514" and constraint == "account_device_quota":
+            raise _quota_exceeded(payload.account_id, quota.max_devices if quota else None)
+        if sqlstate == "23503":     # foreign_key_violation: account
+            raise HTTPException(status_code=404, detail="Account not found")
+        if sqlstate == "23505" and constraint == "uq_device_name_per_account":
+            raise HTTPException(status_code=409, detail="Device name already exists")
+        raise
+
+    # created_at / updated_at (server defaults) came back with the INSERT's RETURNING
+    await db.commit()
+    device_quota.invalidate(payload.account_id)
+
+    return DeviceRead.model_validate(device)
+
+
+def _integrity_error(exc: IntegrityError) -> tuple[str | None, str | None]:
+    """(sqlstate, constraint name) of the driver error behind `exc`."""
+    # asyncpg's own exception (with constraint_name) is the adapted error's cause
+    driver_error = exc.orig.__cause__ if exc.orig is not None else None
+    return (
+        getattr(exc.orig, "sqlstate", None),
+        getattr(driver_error, "constraint_name", None),
+    )
+
+
+def _quota_exceeded(account_id: int, max_devices: int | None) -> HTTPException:
+    return HTTPException(
+        status_code=403,
+        detail={
+            "message": "Device quota exceeded",
+            "account_id": account_id,
+            "max_devices": max_devices,
+        },
+    )
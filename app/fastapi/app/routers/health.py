@@ -6,7 +6,13 @@ from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..config.setting import settings
+from ..db import database
 from ..db.database import get_db
+from ..db.pool import pool_status
+from ..services.fleet_snapshot import fleet_snapshot
+from ..services.live import live_hub
+from ..services.partitions import partition_manager
+from ..services.retention import retention_worker
 
 router = APIRouter(prefix="/health", tags=["health"])
 
@@ -38,3 +44,50 @@ async def health_db(
                 "detail": detail,
             },
         )
+
+
+@router.get("/retention", summary="Telemetry retention worker progress")
+async def health_retention() -> dict:
+    return retention_worker.stats()
+
+
+@router.get("/partitions", summary="Telemetry partition maintenance status")
+async def health_partitions() -> dict:
+    return partition_manager.stats()
+
+
+@router.get("/fleet", summary="Fleet snapshot size, memory and refresh cost (this worker)")
+async def health_fleet() -> dict:
+    return fleet_snapshot.stats()
+
+
+@router.get("/live", summary="Live telemetry subscribers (this worker)")
+async def health_live() -> dict:
+    return {"enabled": settings.live.enabled, **live_hub.stats()}
+
+
+@router.get("/replica", summary="Read replica routing status")
+async def health_replica() -> dict:
+    monitor = database.replica_monitor
+    if monitor is None:
+        return {"configured": False, "reads_from": "primary"}
+    return {
+        "configured": True,
+        "reads_from": "replica" if monitor.usable else "primary",
+        "lag_seconds": monitor.lag_seconds,
+        "max_lag_seconds": monitor.max_lag_seconds,
+        "checks": monitor.checks,
+        "failed_checks": monitor.failed_checks,
+    }
+
+
+@router.get("/pool", summary="Connection pool status (this worker)")
+async def health_pool() -> dict:
+    return {
+        "primary": pool_status(database.engine),
+        "replica": (
+            pool_status(database.read_engine)
+            if database.read_engine is not None
+            else None
+        ),
+    }
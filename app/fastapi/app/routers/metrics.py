@@ -0,0 +1,12 @@
+# app/routers/metrics.py
+from fastapi import APIRouter, Response
+
+from ..services.metrics import render
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", summary="Prometheus metrics", include_in_schema=False)
+async def prometheus_metrics() -> Response:
+    body, content_type = render()
+    return Response(content=body, media_type=content_type)
@@ -0,0 +1,105 @@
+# app/routers/pagination.py
+"""
+Keyset (cursor) pagination shared by the list endpoints.
+
+`ORDER BY id OFFSET x` reads and discards every prior row, so deep pages
+get slower with depth. Keyset pages continue from the last primary key
+(`WHERE id > :after_id ORDER BY id LIMIT n`), an index range scan at any
+depth. Offset pagination keeps working for existing clients.
+
+Clients either pass `after_id` or the opaque `cursor` returned in the
+`X-Next-Cursor` / `Link: <...>; rel="next"` response headers.
+"""
+import base64
+import binascii
+import json
+
+from fastapi import HTTPException, Query, Request, Response
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(values: dict) -> str:
+    """Opaque, URL-safe cursor for a keyset position."""
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> dict:
+    """Inverse of encode_cursor; 400 on anything malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded))
+    except (binascii.Error, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(values, dict):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+class KeysetPage:
+    """
+    Dependency resolving `after_id` / `cursor` into one `after_id`.
+
+    Usage:
+        page: KeysetPage = Depends()
+        stmt = page.apply(stmt, Model.id, offset)
+    """
+
+    def __init__(
+        self,
+        after_id: int | None = Query(
+            default=None,
+            ge=0,
+            description="Keyset pagination: return rows with id > after_id",
+        ),
+        cursor: str | None = Query(
+            default=None,
+            description="Opaque cursor from a previous X-Next-Cursor / Link header",
+        ),
+    ) -> None:
+        if after_id is not None and cursor is not None:
+            raise HTTPException(
+                status_code=400,
+                detail="Use either after_id or cursor, not both",
+            )
+        if cursor is not None:
+            after_id = decode_cursor(cursor).get("id")
+            if not isinstance(after_id, int):
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+        self.after_id = after_id
+
+    def apply(self, stmt, id_column, offset: int):
+        """Add the keyset predicate, or the offset when no cursor is given."""
+        if self.after_id is None:
+            return stmt.offset(offset)
+        if offset:
+            raise HTTPException(
+                status_code=400,
+                detail="offset cannot be combined with after_id / cursor",
+            )
+        return stmt.where(id_column > self.after_id)
+
+
+def set_next_page(
+    request: Request,
+    response: Response,
+    last_id: int | None,
+    page_full: bool,
+) -> None:
+    """
+    Advertise the next page when this one is full.
+
+    Sets X-Next-Cursor and an RFC 8288 Link header pointing at the same
+    URL with `cursor` replacing `after_id` / `offset`.
+    """
+    if not page_full or last_id is None:
+        return
+
+    cursor = encode_cursor({"id": last_id})
+    next_url = request.url.remove_query_params(
+        ["after_id", "offset", "cursor"]
+    ).include_query_params(cursor=cursor)
+
+    response.headers[NEXT_CURSOR_HEADER] = cursor
+    response.headers["Link"] = f'<{next_url}>; rel="next"'
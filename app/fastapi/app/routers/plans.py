@@ -1,5 +1,6 @@
 # app/routers/plans.py
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import Response
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -7,6 +8,7 @@ from ..db.database import get_db
 from ..models.plan import Plan
 from ..schemas.plan import PlanRead
 from ..schemas.enums import PlanCode
+from ..services.response_cache import reference_cache
 
 router = APIRouter(
     prefix="/plans",
@@ -20,17 +22,25 @@ router = APIRouter(
     response_model=list[PlanRead],
 )
 async def list_plans(
+    request: Request,
     db: AsyncSession = Depends(get_db),
-) -> list[PlanRead]:
+) -> Response:
     """
     Return all available subscription plans.
 
-    Read-only: plans are managed at the database/config level.
+    Read-only: plans are managed at the database/config level. Served from
+    the reference cache (ETag / If-None-Match supported), which is filled
+    from the primary: the NOTIFY that drops it comes from the primary, and
+    a lagging replica could put the stale rows back for the whole TTL.
     """
-    stmt = select(Plan).order_by(Plan.code)
-    result = await db.execute(stmt)
-    plans = result.scalars().all()
-    return [PlanRead.model_validate(p) for p in plans]
+    entry = reference_cache.get("plans")
+    if entry is None:
+        generation = reference_cache.generation
+        stmt = select(Plan).order_by(Plan.code)
+        result = await db.execute(stmt)
+        plans = [PlanRead.model_validate(p) for p in result.scalars()]
+        entry = reference_cache.put("plans", plans, generation)
+    return entry.response(request)
 
 
 @router.get(
@@ -40,16 +50,22 @@ async def list_plans(
 )
 async def get_plan(
     plan_code: PlanCode,
+    request: Request,
     db: AsyncSession = Depends(get_db),
-) -> PlanRead:
+) -> Response:
     """
     Get a single plan by its code (starter, pro, business, ...).
     """
-    stmt = select(Plan).where(Plan.code == plan_code)
-    result = await db.execute(stmt)
-    plan = result.scalar_one_or_none()
+    key = f"plans/{plan_code.value}"
+    entry = reference_cache.get(key)
+    if entry is None:
+        generation = reference_cache.generation
+        stmt = select(Plan).where(Plan.code == plan_code)
+        result = await db.execute(stmt)
+        plan = result.scalar_one_or_none()
 
-    if plan is None:
-        raise HTTPException(status_code=404, detail="Plan not found")
+        if plan is None:
+            raise HTTPException(status_code=404, detail="Plan not found")
 
-    return PlanRead.model_validate(plan)
+        entry = reference_cache.put(key, PlanRead.model_validate(plan), generation)
+    return entry.response(request)
@@ -1,12 +1,13 @@
 # app/routers/subscriptions.py
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import joinedload
 
-from ..db.database import get_db
+from ..db.database import get_read_db
 from ..models.subscription import Subscription
 from ..schemas.subscription import SubscriptionWithPlan
+from .pagination import KeysetPage, set_next_page
 
 router = APIRouter(
     prefix="/subscriptions",
@@ -20,6 +21,8 @@ router = APIRouter(
     response_model=list[SubscriptionWithPlan],
 )
 async def list_subscriptions(
+    request: Request,
+    response: Response,
     account_id: int | None = Query(
         default=None,
         description="Optional filter: only subscriptions for this account_id",
@@ -35,7 +38,8 @@ async def list_subscriptions(
         ge=0,
         description="Offset for pagination",
     ),
-    db: AsyncSession = Depends(get_db),
+    page: KeysetPage = Depends(),
+    db: AsyncSession = Depends(get_read_db),
 ) -> list[SubscriptionWithPlan]:
     """
     Return a paginated list of subscriptions.
@@ -43,20 +47,27 @@ async def list_subscriptions(
     - Read-only
     - Can be filtered by `account_id`
     - Includes plan details via `plan` relationship
+    - Keyset pagination via `after_id` / `cursor` (next page in `Link`)
     """
     stmt = (
         select(Subscription)
-        .options(selectinload(Subscription.plan))
+        .options(joinedload(Subscription.plan, innerjoin=True))
         .order_by(Subscription.id)
-        .offset(offset)
         .limit(limit)
     )
+    stmt = page.apply(stmt, Subscription.id, offset)
 
     if account_id is not None:
         stmt = stmt.where(Subscription.account_id == account_id)
 
     result = await db.execute(stmt)
     subs = result.scalars().all()
+    set_next_page(
+        request,
+        response,
+        subs[-1].id if subs else None,
+        page_full=len(subs) == limit,
+    )
 
     return [SubscriptionWithPlan.model_validate(s) for s in subs]
 
@@ -68,7 +79,7 @@ async def list_subscriptions(
 )
 async def get_subscription(
     subscription_id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ) -> SubscriptionWithPlan:
     """
     Get a single subscription by its ID.
@@ -77,7 +88,7 @@ async def get_subscription(
     """
     stmt = (
         select(Subscription)
-        .options(selectinload(Subscription.plan))
+        .options(joinedload(Subscription.plan, innerjoin=True))
         .where(Subscription.id == subscription_id)
     )
     result = await db.execute(stmt)
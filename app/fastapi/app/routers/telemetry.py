@@ -1,21 +1,52 @@
 # app/routers/telemetry.py
+import asyncio
+import math
+from collections.abc import AsyncIterator, Mapping, Sequence
 from datetime import datetime, timedelta, timezone
-
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import select, update
-from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Literal
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    WebSocket,
+    WebSocketDisconnect,
+    status,
+)
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic_core import to_json
+from sqlalchemy import Row, Select, insert, select, tuple_
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlalchemy.sql import func
-from sqlalchemy.dialects.postgresql import insert as pg_insert
 
-from ..db.database import get_db
-from ..models.device import Device
+from ..db.database import get_db, get_read_db, read_session_maker_for
+from ..db.loading import DeviceRef
+from ..config.setting import settings
 from ..models.device_telemetry import DeviceTelemetry
-from ..models.device_latest import DeviceLatest
 from ..schemas.device_telemetry import (
     TelemetryRead,
     TelemetryCreate,
     TelemetryBatchCreate,
+    TelemetryBulkCreate,
+    TelemetryAccepted,
+    TelemetryBucket,
+)
+from ..services.device_cache import device_cache
+from ..services.downsample import lttb
+from ..services.live import Subscription, TooManySubscribers, live_hub
+from ..services.metrics import observe_ingest
+from ..services.rate_limit import DROPPED_HEADER, plan_intervals, rate_limiter
+from ..services.telemetry_ingest import (
+    TelemetryRow,
+    apply_latest,
+    build_rows,
+    ingest_rows,
 )
+from ..services.write_behind import BufferFull, write_buffer
+from .pagination import decode_cursor, encode_cursor
 
 router = APIRouter(
     prefix="/telemetry",
@@ -25,6 +56,38 @@ router = APIRouter(
 DEFAULT_LATEST_SECONDS = 1800         # 30 minutes
 MAX_LATEST_SECONDS = 24 * 3600        # safety: 24 hours
 
+DEFAULT_EXPORT_ROWS = 100_000
+MAX_EXPORT_ROWS = 1_000_000
+EXPORT_FETCH_ROWS = 2000              # server-side cursor fetch size
+
+MAX_DOWNSAMPLE_SOURCE_ROWS = 100_000  # newest rows fed to LTTB
+BUCKET_ORIGIN = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# TelemetryRead fields, selected as plain columns (no ORM objects)
+TELEMETRY_READ_COLUMNS = (
+    DeviceTelemetry.id,
+    DeviceTelemetry.device_id,
+    DeviceTelemetry.recorded_at,
+    DeviceTelemetry.x_coord,
+    DeviceTelemetry.y_coord,
+    DeviceTelemetry.meta,
+)
+
+
+def telemetry_json(rows: Sequence[Row]) -> bytes:
+    """
+    Encode TELEMETRY_READ_COLUMNS rows as a JSON array in one pass.
+
+    Skips ORM entities, TelemetryRead.model_validate and response_model
+    re-validation; pydantic-core serializes the raw tuples' values directly.
+    """
+    return to_json([row._asdict() for row in rows])
+
+
+def telemetry_json_response(rows: Sequence[Row]) -> Response:
+    """Pre-rendered list[TelemetryRead] response."""
+    return Response(content=telemetry_json(rows), media_type="application/json")
+
 
 # ============================================================
 # READ: list telemetry
@@ -54,12 +117,12 @@ async def list_telemetry(
         le=10000,
         description="Maximum number of telemetry rows to return",
     ),
-    db: AsyncSession = Depends(get_db),
-) -> list[TelemetryRead]:
+    db: AsyncSession = Depends(get_read_db),
+) -> Response:
     cutoff_expr = func.now() - timedelta(seconds=latest)
 
     stmt = (
-        select(DeviceTelemetry)
+        select(*TELEMETRY_READ_COLUMNS)
         .where(DeviceTelemetry.recorded_at >= cutoff_expr)
         .order_by(DeviceTelemetry.recorded_at.desc())
         .limit(limit)
@@ -69,9 +132,262 @@ async def list_telemetry(
         stmt = stmt.where(DeviceTelemetry.device_id == device_id)
 
     result = await db.execute(stmt)
-    rows = result.scalars().all()
+    return telemetry_json_response(result.all())
+
+
+# ============================================================
+# READ: stream telemetry (exports / backfills)
+# ============================================================
+@router.get(
+    "/export",
+    summary="Stream telemetry for a time window (NDJSON or JSON)",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "content": {"application/x-ndjson": {}, "application/json": {}},
+            "description": (
+                "ndjson: one TelemetryRead per line, then a final "
+                '{"next_cursor": ...} line. json: {"items": [...], "next_cursor": ...}'
+            ),
+        },
+    },
+)
+async def export_telemetry(
+    request: Request,
+    device_id: int | None = Query(
+        default=None,
+        description="Optional filter: only telemetry for this device_id",
+    ),
+    since: datetime | None = Query(
+        default=None,
+        description="Window start (inclusive). Defaults to 24 hours ago.",
+    ),
+    until: datetime | None = Query(
+        default=None,
+        description="Window end (exclusive). Defaults to now.",
+    ),
+    cursor: str | None = Query(
+        default=None,
+        description="Continuation token (next_cursor) from a previous export",
+    ),
+    limit: int = Query(
+        DEFAULT_EXPORT_ROWS,
+        ge=1,
+        le=MAX_EXPORT_ROWS,
+        description="Maximum number of rows in this response",
+    ),
+    format: Literal["ndjson", "json"] = Query(
+        default="ndjson",
+        description="ndjson (one row per line) or a chunked JSON document",
+    ),
+) -> StreamingResponse:
+    """
+    Stream telemetry in (recorded_at, id) order through a server-side cursor.
+
+    Rows are fetched and encoded in chunks, so memory per request stays
+    constant regardless of the window size. When `limit` rows were sent,
+    `next_cursor` resumes right after the last one (keyset continuation);
+    pass it back with the same filters to fetch the next part.
+    """
+    now = datetime.now(timezone.utc)
+    since = since or now - timedelta(seconds=MAX_LATEST_SECONDS)
+    until = until or now
+
+    stmt = (
+        select(*TELEMETRY_READ_COLUMNS)
+        .where(DeviceTelemetry.recorded_at >= since)
+        .where(DeviceTelemetry.recorded_at < until)
+        .order_by(DeviceTelemetry.recorded_at, DeviceTelemetry.id)
+        .limit(limit)
+    )
+
+    if device_id is not None:
+        stmt = stmt.where(DeviceTelemetry.device_id == device_id)
 
-    return [TelemetryRead.model_validate(r) for r in rows]
+    if cursor is not None:
+        after_ts, after_id = _decode_export_cursor(cursor)
+        stmt = stmt.where(
+            tuple_(DeviceTelemetry.recorded_at, DeviceTelemetry.id)
+            > tuple_(after_ts, after_id)
+        )
+
+    media_type = "application/x-ndjson" if format == "ndjson" else "application/json"
+    return StreamingResponse(
+        _stream_telemetry(read_session_maker_for(request), stmt, limit, format),
+        media_type=media_type,
+    )
+
+
+def _decode_export_cursor(cursor: str) -> tuple[datetime, int]:
+    values = decode_cursor(cursor)
+    try:
+        return datetime.fromisoformat(values["t"]), int(values["id"])
+    except (KeyError, TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+async def _stream_telemetry(
+    session_maker: async_sessionmaker[AsyncSession],
+    stmt: Select,
+    limit: int,
+    format: str,
+) -> AsyncIterator[bytes]:
+    # Own session: lives exactly as long as the response body
+    sent = 0
+    last = None
+    async with session_maker() as db:
+        result = await db.stream(
+            stmt.execution_options(yield_per=EXPORT_FETCH_ROWS)
+        )
+
+        if format == "json":
+            yield b'{"items":['
+
+        async for chunk in result.partitions():
+            if format == "ndjson":
+                yield b"\n".join(to_json(row._asdict()) for row in chunk) + b"\n"
+            else:
+                body = telemetry_json(chunk)[1:-1]     # strip [ ]
+                yield (b"," if sent else b"") + body
+            sent += len(chunk)
+            last = chunk[-1]
+
+    next_cursor = None
+    if sent == limit and last is not None:
+        next_cursor = encode_cursor(
+            {"t": last.recorded_at.isoformat(), "id": last.id}
+        )
+
+    if format == "ndjson":
+        yield to_json({"next_cursor": next_cursor}) + b"\n"
+    else:
+        yield b'],"next_cursor":' + to_json(next_cursor) + b"}"
+
+
+# ============================================================
+# LIVE: push new points (WebSocket / SSE)
+# ============================================================
+def _live_check(device_ids: list[int] | None, account_id: int | None) -> None:
+    """Validate a live subscription request without registering it."""
+    if not settings.live.enabled:
+        raise HTTPException(status_code=503, detail="Live telemetry is disabled")
+    if not device_ids and account_id is None:
+        raise HTTPException(status_code=422, detail="Give device_id (repeatable) or account_id")
+    if device_ids and len(device_ids) > settings.live.max_device_ids:
+        raise HTTPException(
+            status_code=422,
+            detail=f"At most {settings.live.max_device_ids} device_id per subscription",
+        )
+    if len(live_hub) >= live_hub.max_subscribers:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Live subscriber limit reached ({live_hub.max_subscribers})",
+        )
+
+
+def _live_subscribe(device_ids: list[int] | None, account_id: int | None) -> Subscription:
+    """Validate a live subscription request and register it."""
+    _live_check(device_ids, account_id)
+    try:
+        return live_hub.subscribe(device_ids or (), account_id)
+    except TooManySubscribers as exc:
+        raise HTTPException(status_code=503, detail=str(exc))
+
+
+def _live_batch(batch: list[str]) -> str:
+    # payloads are JSON objects already; join instead of re-encoding
+    return "[" + ",".join(batch) + "]"
+
+
+@router.websocket("/live/ws")
+async def live_telemetry_ws(
+    websocket: WebSocket,
+    device_id: list[int] | None = Query(default=None),
+    account_id: int | None = Query(default=None),
+) -> None:
+    """
+    Push new points for the given devices (repeat `device_id`) or a whole
+    account. Each message is a JSON array of points, newest per device;
+    a client that reads slowly gets conflated points, not a backlog.
+    """
+    try:
+        sub = _live_subscribe(device_id, account_id)
+    except HTTPException as exc:
+        await websocket.close(code=1008 if exc.status_code == 422 else 1013, reason=str(exc.detail))
+        return
+
+    await websocket.accept()
+
+    async def push() -> None:
+        while True:
+            batch = await sub.next_batch()
+            await websocket.send_text(_live_batch(batch))
+
+    sender = asyncio.create_task(push())
+    try:
+        # client messages are ignored; this returns when the client leaves
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        sender.cancel()
+        live_hub.unsubscribe(sub)
+
+
+@router.get(
+    "/live/sse",
+    summary="Server-sent events stream of new points",
+    response_class=StreamingResponse,
+    responses={
+        200: {"content": {"text/event-stream": {}}},
+        503: {"description": "Live telemetry disabled or subscriber limit reached"},
+    },
+)
+async def live_telemetry_sse(
+    device_id: list[int] | None = Query(
+        default=None,
+        description="Device to follow (repeatable)",
+    ),
+    account_id: int | None = Query(
+        default=None,
+        description="Follow every device of this account",
+    ),
+) -> StreamingResponse:
+    """
+    Same stream as the WebSocket endpoint as text/event-stream: one
+    `data:` event (JSON array of points) per wake-up, and a comment line
+    every LIVE__HEARTBEAT_SECONDS to keep proxies from closing the stream.
+    """
+    _live_check(device_id, account_id)
+    return StreamingResponse(
+        _live_events(device_id or [], account_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _live_events(device_ids: list[int], account_id: int | None) -> AsyncIterator[str]:
+    # Subscribed on the first iteration, so a client gone before the body
+    # starts never holds a slot; cancelled by Starlette on disconnect
+    try:
+        sub = live_hub.subscribe(device_ids, account_id)
+    except TooManySubscribers as exc:
+        # filled up since _live_check: end the stream, the client reconnects
+        yield f"event: error\ndata: {exc}\n\n"
+        return
+    try:
+        while True:
+            try:
+                batch = await asyncio.wait_for(
+                    sub.next_batch(), timeout=settings.live.heartbeat_seconds
+                )
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            yield f"data: {_live_batch(batch)}\n\n"
+    finally:
+        live_hub.unsubscribe(sub)
 
 
 @router.get(
@@ -96,12 +412,12 @@ async def list_device_telemetry(
         le=10000,
         description="Maximum number of telemetry rows to return",
     ),
-    db: AsyncSession = Depends(get_db),
-) -> list[TelemetryRead]:
+    db: AsyncSession = Depends(get_read_db),
+) -> Response:
     cutoff_expr = func.now() - timedelta(seconds=latest)
 
     stmt = (
-        select(DeviceTelemetry)
+        select(*TELEMETRY_READ_COLUMNS)
         .where(DeviceTelemetry.device_id == device_id)
         .where(DeviceTelemetry.recorded_at >= cutoff_expr)
         .order_by(DeviceTelemetry.recorded_at.desc())
@@ -109,9 +425,110 @@ async def list_device_telemetry(
     )
 
     result = await db.execute(stmt)
-    rows = result.scalars().all()
+    return telemetry_json_response(result.all())
 
-    return [TelemetryRead.model_validate(r) for r in rows]
+
+# ============================================================
+# READ: downsampled tracks (dashboards)
+# ============================================================
+@router.get(
+    "/{device_id}/aggregate",
+    summary="Per-bucket min/max/avg/last of a device's telemetry",
+    response_model=list[TelemetryBucket],
+)
+async def aggregate_device_telemetry(
+    device_id: int,
+    latest: int = Query(
+        DEFAULT_LATEST_SECONDS,
+        ge=1,
+        le=MAX_LATEST_SECONDS,
+        description="Time window in seconds. Defaults to 1800. Max 86400.",
+    ),
+    bucket: int = Query(
+        60,
+        ge=1,
+        le=MAX_LATEST_SECONDS,
+        description="Bucket width in seconds (buckets are aligned to the epoch)",
+    ),
+    db: AsyncSession = Depends(get_read_db),
+) -> Response:
+    cutoff_expr = func.now() - timedelta(seconds=latest)
+
+    bucket_start = func.date_bin(
+        timedelta(seconds=bucket),
+        DeviceTelemetry.recorded_at,
+        BUCKET_ORIGIN,
+    ).label("bucket_start")
+
+    def last(column):
+        return func.array_agg(
+            aggregate_order_by(column, DeviceTelemetry.recorded_at.desc())
+        )[1]
+
+    stmt = (
+        select(
+            bucket_start,
+            func.count().label("count"),
+            func.min(DeviceTelemetry.x_coord).label("x_min"),
+            func.max(DeviceTelemetry.x_coord).label("x_max"),
+            func.avg(DeviceTelemetry.x_coord).label("x_avg"),
+            last(DeviceTelemetry.x_coord).label("x_last"),
+            func.min(DeviceTelemetry.y_coord).label("y_min"),
+            func.max(DeviceTelemetry.y_coord).label("y_max"),
+            func.avg(DeviceTelemetry.y_coord).label("y_avg"),
+            last(DeviceTelemetry.y_coord).label("y_last"),
+            func.max(DeviceTelemetry.recorded_at).label("last_recorded_at"),
+        )
+        .where(DeviceTelemetry.device_id == device_id)
+        .where(DeviceTelemetry.recorded_at >= cutoff_expr)
+        .group_by(bucket_start)
+        .order_by(bucket_start)
+    )
+
+    result = await db.execute(stmt)
+    return Response(
+        content=to_json([row._asdict() for row in result]),
+        media_type="application/json",
+    )
+
+
+@router.get(
+    "/{device_id}/downsample",
+    summary="LTTB-reduced track of a device's telemetry",
+    response_model=list[TelemetryRead],
+)
+async def downsample_device_telemetry(
+    device_id: int,
+    latest: int = Query(
+        DEFAULT_LATEST_SECONDS,
+        ge=1,
+        le=MAX_LATEST_SECONDS,
+        description="Time window in seconds. Defaults to 1800. Max 86400.",
+    ),
+    points: int = Query(
+        500,
+        ge=3,
+        le=10000,
+        description="Maximum number of points to return",
+    ),
+    db: AsyncSession = Depends(get_read_db),
+) -> Response:
+    cutoff_expr = func.now() - timedelta(seconds=latest)
+
+    stmt = (
+        select(*TELEMETRY_READ_COLUMNS)
+        .where(DeviceTelemetry.device_id == device_id)
+        .where(DeviceTelemetry.recorded_at >= cutoff_expr)
+        .order_by(DeviceTelemetry.recorded_at.desc())
+        .limit(MAX_DOWNSAMPLE_SOURCE_ROWS)
+    )
+
+    result = await db.execute(stmt)
+    rows = result.all()
+    rows.reverse()                    # oldest first: drawing order
+
+    kept = lttb([r.x_coord for r in rows], [r.y_coord for r in rows], points)
+    return telemetry_json_response([rows[i] for i in kept])
 
 
 # ============================================================
@@ -122,65 +539,122 @@ async def list_device_telemetry(
     summary="Ingest a single telemetry point",
     response_model=TelemetryRead,
     status_code=status.HTTP_201_CREATED,
+    responses={
+        202: {
+            "model": TelemetryAccepted,
+            "description": "Queued by the write-behind buffer (ack=enqueue)",
+        },
+        429: {"description": "Faster than the plan's sample interval (rate_limit=reject)"},
+        503: {"description": "Write-behind buffer full; retry later"},
+    },
 )
 async def create_telemetry(
     payload: TelemetryCreate,
     db: AsyncSession = Depends(get_db),
-) -> TelemetryRead:
+) -> TelemetryRead | JSONResponse:
     """
     Insert a single telemetry row and update:
     - device_telemetry
     - device_latest (upsert)
     - device.last_seen_at
+
+    With write-behind enabled (INGEST__WRITE_BEHIND), the point is queued and
+    written in a micro-batch; the response is a TelemetryAccepted body with
+    201 (ack=flush) or 202 (ack=enqueue).
+
+    With INGEST__RATE_LIMIT, points less than the plan's
+    min_sample_interval_seconds after the device's newest accepted point are
+    dropped (202, status "dropped") or rejected (429) before any write.
     """
-    # Optional: ensure device exists
-    device = await db.get(Device, payload.device_id)
-    if device is None:
+    # Cached existence check (lean lookup on miss)
+    ref = await device_cache.get(db, payload.device_id)
+    if ref is None:
         raise HTTPException(status_code=404, detail="Device not found")
 
     recorded_at = payload.recorded_at or datetime.now(timezone.utc)
 
-    telemetry = DeviceTelemetry(
-        device_id=payload.device_id,
-        recorded_at=recorded_at,
-        x_coord=payload.x_coord,
-        y_coord=payload.y_coord,
-        meta=payload.meta,
+    row = TelemetryRow(
+        payload.device_id,
+        recorded_at,
+        payload.x_coord,
+        payload.y_coord,
+        payload.meta,
     )
-    db.add(telemetry)
 
-    # Upsert into device_latest:
-    #   - Insert new row if none exists
-    #   - Update only if this telemetry is newer than existing recorded_at
-    stmt_latest = pg_insert(DeviceLatest).values(
-        device_id=payload.device_id,
-        recorded_at=recorded_at,
-        x_coord=payload.x_coord,
-        y_coord=payload.y_coord,
-        meta=payload.meta or {},
-    ).on_conflict_do_update(
-        index_elements=[DeviceLatest.device_id],
-        set_={
-            "recorded_at": recorded_at,
-            "x_coord": payload.x_coord,
-            "y_coord": payload.y_coord,
-            "meta": payload.meta or {},
-        },
-        where=DeviceLatest.recorded_at < recorded_at,
+    if settings.ingest.rate_limit != "off":
+        intervals = await plan_intervals.intervals(db)
+        interval = intervals.get(ref.account_id, 0)
+        if not rate_limiter.allow(row.device_id, row.recorded_at, interval):
+            if settings.ingest.rate_limit == "reject":
+                observe_ingest("single", accepted=0, dropped=1)
+                raise HTTPException(
+                    status_code=429,
+                    detail="Sample interval of the plan exceeded",
+                    headers={"Retry-After": str(math.ceil(interval))},
+                )
+            dropped = TelemetryAccepted(
+                device_id=row.device_id,
+                recorded_at=row.recorded_at,
+                status="dropped",
+            )
+            observe_ingest("single", accepted=0, dropped=1)
+            return JSONResponse(
+                status_code=status.HTTP_202_ACCEPTED,
+                content=dropped.model_dump(mode="json"),
+            )
+
+    if write_buffer.running:
+        accepted = await _submit_write_behind(db, row)
+        _record_accepted([row])
+        observe_ingest("single", accepted=1)
+        return accepted
+
+    # Core insert: RETURNING id, no ORM object or refresh round trip
+    result = await db.execute(
+        insert(DeviceTelemetry)
+        .values(row._asdict())
+        .returning(DeviceTelemetry.id)
     )
-    await db.execute(stmt_latest)
+    telemetry_id = result.scalar_one()
 
-    # Update device.last_seen_at
-    await db.execute(
-        update(Device)
-        .where(Device.id == payload.device_id)
-        .values(last_seen_at=recorded_at)
-    )
+    await apply_latest(db, [row])
 
     await db.commit()
-    await db.refresh(telemetry)
+    _record_accepted([row])
+    observe_ingest("single", accepted=1)
 
-    return TelemetryRead.model_validate(telemetry)
+    return TelemetryRead(id=telemetry_id, **row._asdict())
+
+
+async def _submit_write_behind(db: AsyncSession, row: TelemetryRow) -> JSONResponse:
+    # Release the pooled connection (device lookup) before waiting on a flush
+    await db.close()
+
+    wait_for_flush = settings.ingest.write_behind_ack == "flush"
+    try:
+        await write_buffer.submit(row, wait_for_flush=wait_for_flush)
+    except BufferFull as exc:
+        raise HTTPException(
+            status_code=503,
+            detail=str(exc),
+            headers={"Retry-After": "1"},
+        )
+    except Exception:
+        # ack=flush: the micro-batch carrying this point failed
+        raise HTTPException(status_code=503, detail="Telemetry write failed")
+
+    accepted = TelemetryAccepted(
+        device_id=row.device_id,
+        recorded_at=row.recorded_at,
+        status="committed" if wait_for_flush else "queued",
+    )
+    return JSONResponse(
+        status_code=(
+            status.HTTP_201_CREATED if wait_for_flush
+            else status.HTTP_202_ACCEPTED
+        ),
+        content=accepted.model_dump(mode="json"),
+    )
 
 
 # ============================================================
@@ -192,74 +666,117 @@ async def create_telemetry(
     status_code=status.HTTP_204_NO_CONTENT,
 )
 async def create_telemetry_batch(
+    response: Response,
     payload: TelemetryBatchCreate,
     db: AsyncSession = Depends(get_db),
 ) -> None:
     """
     Efficient batch insert for a single device.
 
-    - Inserts multiple rows into device_telemetry
+    - Streams rows into device_telemetry (COPY / unnest, no ORM objects)
     - Updates device_latest using the newest recorded_at in the batch
     - Updates device.last_seen_at
+    - With INGEST__RATE_LIMIT, drops points faster than the plan allows
+      (count in X-Telemetry-Dropped)
     """
-    # Ensure device exists
-    device = await db.get(Device, payload.device_id)
-    if device is None:
+    # Ensure device exists (cached, lean lookup on miss)
+    ref = await device_cache.get(db, payload.device_id)
+    if ref is None:
         raise HTTPException(status_code=404, detail="Device not found")
 
-    now_utc = datetime.now(timezone.utc)
-    telemetry_rows: list[DeviceTelemetry] = []
-    latest_ts: datetime | None = None
-    latest_point: TelemetryCreate | None = None
+    if not payload.points:
+        # No points submitted; nothing to do
+        return
 
-    for p in payload.points:
-        recorded_at = p.recorded_at or now_utc
+    rows = build_rows(
+        payload.points,
+        datetime.now(timezone.utc),
+        device_id=payload.device_id,
+    )
+    points = len(rows)
+    rows = await _rate_limit(db, response, rows, {payload.device_id: ref})
 
-        row = DeviceTelemetry(
-            device_id=payload.device_id,
-            recorded_at=recorded_at,
-            x_coord=p.x_coord,
-            y_coord=p.y_coord,
-            meta=p.meta,
-        )
-        telemetry_rows.append(row)
+    if rows:
+        # device_latest / last_seen_at are updated once, for the newest point
+        await ingest_rows(db, rows)
+        await db.commit()
+        _record_accepted(rows)
+
+    observe_ingest("batch", accepted=len(rows), dropped=points - len(rows))
+    # 204: no body
 
-        if latest_ts is None or recorded_at > latest_ts:
-            latest_ts = recorded_at
-            latest_point = p
 
-    if not telemetry_rows:
+# ============================================================
+# WRITE: bulk telemetry across many devices
+# ============================================================
+@router.post(
+    "/bulk",
+    summary="Ingest telemetry points for many devices in one request",
+    status_code=status.HTTP_204_NO_CONTENT,
+)
+async def create_telemetry_bulk(
+    response: Response,
+    payload: TelemetryBulkCreate,
+    db: AsyncSession = Depends(get_db),
+) -> None:
+    """
+    Set-based ingest for gateways aggregating many devices.
+
+    - Validates every device_id via the device cache; misses are fetched
+      in one query (404 lists the missing IDs)
+    - Inserts all rows into device_telemetry in one COPY / unnest statement
+    - Folds points to the newest per device, then applies device_latest
+      upserts and device.last_seen_at updates as single multi-row statements
+    - With INGEST__RATE_LIMIT, drops points faster than each device's plan
+      allows (count in X-Telemetry-Dropped)
+    """
+    if not payload.points:
         # No points submitted; nothing to do
         return
 
-    db.add_all(telemetry_rows)
-
-    # Upsert latest only once (for the newest point)
-    if latest_ts is not None and latest_point is not None:
-        stmt_latest = pg_insert(DeviceLatest).values(
-            device_id=payload.device_id,
-            recorded_at=latest_ts,
-            x_coord=latest_point.x_coord,
-            y_coord=latest_point.y_coord,
-            meta=latest_point.meta or {},
-        ).on_conflict_do_update(
-            index_elements=[DeviceLatest.device_id],
-            set_={
-                "recorded_at": latest_ts,
-                "x_coord": latest_point.x_coord,
-                "y_coord": latest_point.y_coord,
-                "meta": latest_point.meta or {},
-            },
-            where=DeviceLatest.recorded_at < latest_ts,
+    refs = await device_cache.get_many(
+        db, {p.device_id for p in payload.points}
+    )
+    missing = sorted(device_id for device_id, ref in refs.items() if ref is None)
+    if missing:
+        raise HTTPException(
+            status_code=404,
+            detail={"message": "Device not found", "device_ids": missing},
         )
-        await db.execute(stmt_latest)
 
-        # Update device.last_seen_at
-        await db.execute(
-            update(Device)
-            .where(Device.id == payload.device_id)
-            .values(last_seen_at=latest_ts)
-        )
+    rows = build_rows(payload.points, datetime.now(timezone.utc))
+    points = len(rows)
+    rows = await _rate_limit(db, response, rows, refs)
 
-    await db.commit()
+    if rows:
+        await ingest_rows(db, rows)
+        await db.commit()
+        _record_accepted(rows)
+
+    observe_ingest("bulk", accepted=len(rows), dropped=points - len(rows))
     # 204: no body
+
+
+async def _rate_limit(
+    db: AsyncSession,
+    response: Response,
+    rows: list[TelemetryRow],
+    refs: Mapping[int, DeviceRef],
+) -> list[TelemetryRow]:
+    """Thin a batch to the plans' sample intervals; reports the dropped count."""
+    if settings.ingest.rate_limit == "off":
+        return rows
+
+    intervals = await plan_intervals.intervals(db)
+    kept = rate_limiter.thin(
+        rows,
+        {device_id: intervals.get(ref.account_id, 0) for device_id, ref in refs.items()},
+    )
+    response.headers[DROPPED_HEADER] = str(len(rows) - len(kept))
+    return kept
+
+
+def _record_accepted(rows: list[TelemetryRow]) -> None:
+    """Count stored rows against the sample interval (not before the write)."""
+    if settings.ingest.rate_limit != "off":
+        rate_limiter.record(rows)
@@ -1,11 +1,12 @@
 # app/routers/users.py
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..db.database import get_db
+from ..db.database import get_read_db
 from ..models.user import User
 from ..schemas.user import UserRead
+from .pagination import KeysetPage, set_next_page
 
 router = APIRouter(
     prefix="/users",
@@ -19,6 +20,8 @@ router = APIRouter(
     response_model=list[UserRead],
 )
 async def list_users(
+    request: Request,
+    response: Response,
     account_id: int | None = Query(
         default=None,
         description="Optional filter: only users for this account_id",
@@ -34,21 +37,30 @@ async def list_users(
         ge=0,
         description="Offset for pagination",
     ),
-    db: AsyncSession = Depends(get_db),
+    page: KeysetPage = Depends(),
+    db: AsyncSession = Depends(get_read_db),
 ) -> list[UserRead]:
     """
     Return a paginated list of users.
 
     - Read-only
     - Can be filtered by `account_id`
+    - Keyset pagination via `after_id` / `cursor` (next page in `Link`)
     """
-    stmt = select(User).order_by(User.id).offset(offset).limit(limit)
+    stmt = select(User).order_by(User.id).limit(limit)
+    stmt = page.apply(stmt, User.id, offset)
 
     if account_id is not None:
         stmt = stmt.where(User.account_id == account_id)
 
     result = await db.execute(stmt)
     users = result.scalars().all()
+    set_next_page(
+        request,
+        response,
+        users[-1].id if users else None,
+        page_full=len(users) == limit,
+    )
 
     return [UserRead.model_validate(u) for u in users]
 
@@ -60,7 +72,7 @@ async def list_users(
 )
 async def get_user(
     user_id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ) -> UserRead:
     """
     Get a single user by its ID.
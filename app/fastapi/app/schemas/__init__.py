@@ -4,13 +4,16 @@ from .user import UserRead
 from .plan import PlanRead
 from .subscription import SubscriptionRead, SubscriptionWithPlan
 from .api_key import ApiKeyRead
-from .device import DeviceRead, DeviceWithLatest
+from .device import DeviceRead, DeviceWithLatest, DeviceCreate
 from .device_latest import DeviceLatestRead
 from .device_telemetry import (
     TelemetryBase,
     TelemetryCreate,
     TelemetryBatchCreate,
+    TelemetryBulkCreate,
     TelemetryRead,
+    TelemetryAccepted,
+    TelemetryBucket,
 )
 
 __all__ = [
@@ -23,9 +26,13 @@ __all__ = [
     "ApiKeyRead",
     "DeviceRead",
     "DeviceWithLatest",
+    "DeviceCreate",
     "DeviceLatestRead",
     "TelemetryBase",
     "TelemetryCreate",
     "TelemetryBatchCreate",
+    "TelemetryBulkCreate",
     "TelemetryRead",
+    "TelemetryAccepted",
+    "TelemetryBucket",
 ]
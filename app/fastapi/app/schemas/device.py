@@ -1,10 +1,14 @@
 # schemas/device.py
 from datetime import datetime
 
+from pydantic import BaseModel, Field
+
 from .base import ORMModel
 from .enums import DeviceStatus
 from .device_latest import DeviceLatestRead
 
+MAX_BATCH_IDS = 500
+
 
 class DeviceRead(ORMModel):
     id: int
@@ -22,3 +26,27 @@ class DeviceRead(ORMModel):
 
 class DeviceWithLatest(DeviceRead):
     latest: DeviceLatestRead | None
+
+
+class DeviceBatchRequest(BaseModel):
+    ids: list[int] = Field(
+        ...,
+        min_length=1,
+        max_length=MAX_BATCH_IDS,
+        description="Device IDs; the response keeps this order",
+    )
+
+
+class DeviceBatch(BaseModel):
+    items: list[DeviceWithLatest]
+    missing: list[int] = Field(..., description="Requested IDs that do not exist")
+
+
+class DeviceCreate(BaseModel):
+    account_id: int
+    name: str = Field(..., min_length=1, max_length=255)
+    type: str = Field(..., min_length=1, max_length=100)
+    model: str | None = Field(default=None, max_length=100)
+    status: DeviceStatus = DeviceStatus.PROVISIONED
+    firmware_version: str | None = None
+    tags: dict | None = None
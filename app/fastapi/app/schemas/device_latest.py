@@ -1,6 +1,8 @@
 # schemas/device_latest.py
 from datetime import datetime
 
+from pydantic import BaseModel
+
 from .base import ORMModel
 
 
@@ -10,3 +12,12 @@ class DeviceLatestRead(ORMModel):
     x_coord: float
     y_coord: float
     meta: dict
+
+
+class NearestDevice(BaseModel):
+    device_id: int
+    account_id: int
+    x_coord: float
+    y_coord: float
+    recorded_at: datetime
+    distance: float
@@ -1,6 +1,8 @@
 # schemas/device_telemetry.py
-from datetime import datetime
-from pydantic import BaseModel, Field
+from datetime import datetime, timezone
+from typing import Literal
+
+from pydantic import BaseModel, Field, field_validator
 
 from .base import ORMModel
 
@@ -17,6 +19,14 @@ class TelemetryBase(BaseModel):
         description="Optional metadata JSON (battery, temp, etc.)",
     )
 
+    @field_validator("recorded_at")
+    @classmethod
+    def _assume_utc(cls, value: datetime | None) -> datetime | None:
+        # naive timestamps are UTC: keeps every recorded_at comparable
+        if value is not None and value.tzinfo is None:
+            return value.replace(tzinfo=timezone.utc)
+        return value
+
 
 class TelemetryCreate(TelemetryBase):
     device_id: int = Field(..., description="Target device ID")
@@ -27,6 +37,13 @@ class TelemetryBatchCreate(BaseModel):
     points: list[TelemetryBase]
 
 
+class TelemetryBulkCreate(BaseModel):
+    points: list[TelemetryCreate] = Field(
+        ...,
+        description="Points for any number of devices; each carries its device_id",
+    )
+
+
 class TelemetryRead(ORMModel):
     id: int
     device_id: int
@@ -34,3 +51,31 @@ class TelemetryRead(ORMModel):
     x_coord: float
     y_coord: float
     meta: dict | None
+
+
+class TelemetryAccepted(BaseModel):
+    """Acknowledgement without a row id (write-behind or rate-limited)."""
+    device_id: int
+    recorded_at: datetime
+    status: Literal["committed", "queued", "dropped"] = Field(
+        ...,
+        description=(
+            "committed: batch flushed (201); queued: buffered only (202); "
+            "dropped: faster than the plan's sample interval (202)"
+        ),
+    )
+
+
+class TelemetryBucket(BaseModel):
+    """Per-bucket aggregate of a device's telemetry (date_bin)."""
+    bucket_start: datetime
+    count: int
+    x_min: float
+    x_max: float
+    x_avg: float
+    x_last: float
+    y_min: float
+    y_max: float
+    y_avg: float
+    y_last: float
+    last_recorded_at: datetime
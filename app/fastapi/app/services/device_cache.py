@@ -0,0 +1,130 @@
+# app/services/device_cache.py
+"""
+In-process device existence / ownership cache for the ingest path.
+
+Bounded LRU of DeviceRef (id, account_id, status) with a TTL:
+- positive entries live `device_cache_ttl_seconds`
+- unknown IDs are cached as None for `device_cache_negative_ttl_seconds`
+
+Entries are invalidated by NOTIFY on DEVICE_CHANNEL, sent by the
+trg_device_notify_changed trigger (11_tb_device.sql) on INSERT, DELETE and
+changes to account_id / status. The TTL bounds staleness if a notification
+is missed; the whole cache is dropped whenever the listener reconnects.
+"""
+import time
+from collections import OrderedDict
+
+from sqlalchemy import BigInteger, any_, bindparam, select
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config.setting import settings
+from ..db.loading import DeviceRef, get_device_ref
+from ..models.device import Device
+
+DEVICE_CHANNEL = "device_changed"
+
+
+class DeviceCache:
+    def __init__(
+        self,
+        max_size: int,
+        ttl_seconds: float,
+        negative_ttl_seconds: float,
+    ) -> None:
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        # device_id -> (expires_at, DeviceRef | None)
+        self._entries: OrderedDict[int, tuple[float, DeviceRef | None]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _lookup(self, device_id: int) -> tuple[bool, DeviceRef | None]:
+        """Return (found, ref); found=False on miss or expiry."""
+        entry = self._entries.get(device_id)
+        if entry is None:
+            return False, None
+        expires_at, ref = entry
+        if expires_at < time.monotonic():
+            del self._entries[device_id]
+            return False, None
+        self._entries.move_to_end(device_id)
+        return True, ref
+
+    def _store(self, device_id: int, ref: DeviceRef | None) -> None:
+        if self.max_size <= 0:
+            return
+        ttl = self.ttl_seconds if ref is not None else self.negative_ttl_seconds
+        self._entries[device_id] = (time.monotonic() + ttl, ref)
+        self._entries.move_to_end(device_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    async def get(self, db: AsyncSession, device_id: int) -> DeviceRef | None:
+        """Return the device's DeviceRef, or None if it does not exist."""
+        found, ref = self._lookup(device_id)
+        if found:
+            self.hits += 1
+            return ref
+
+        self.misses += 1
+        ref = await get_device_ref(db, device_id)
+        self._store(device_id, ref)
+        return ref
+
+    async def get_many(
+        self,
+        db: AsyncSession,
+        device_ids: set[int],
+    ) -> dict[int, DeviceRef | None]:
+        """Resolve many IDs; cache misses are fetched in one query."""
+        refs: dict[int, DeviceRef | None] = {}
+        misses: list[int] = []
+        for device_id in device_ids:
+            found, ref = self._lookup(device_id)
+            if found:
+                refs[device_id] = ref
+            else:
+                misses.append(device_id)
+
+        self.hits += len(refs)
+        self.misses += len(misses)
+
+        if misses:
+            stmt = select(Device.id, Device.account_id, Device.status).where(
+                Device.id == any_(
+                    bindparam("device_ids", misses, type_=ARRAY(BigInteger))
+                )
+            )
+            result = await db.execute(stmt)
+            fetched = {row.id: DeviceRef(*row) for row in result}
+            for device_id in misses:
+                ref = fetched.get(device_id)
+                self._store(device_id, ref)
+                refs[device_id] = ref
+
+        return refs
+
+    def invalidate(self, device_id: int) -> None:
+        self._entries.pop(device_id, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def on_notify(self, payload: str) -> None:
+        """NOTIFY callback: payload is the changed device id."""
+        try:
+            self.invalidate(int(payload))
+        except ValueError:
+            self.clear()
+
+
+device_cache = DeviceCache(
+    max_size=settings.ingest.device_cache_size,
+    ttl_seconds=settings.ingest.device_cache_ttl_seconds,
+    negative_ttl_seconds=settings.ingest.device_cache_negative_ttl_seconds,
+)
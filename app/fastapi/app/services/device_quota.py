@@ -0,0 +1,97 @@
+# app/services/device_quota.py
+"""
+Plan device quota (plan.max_devices) without count(*).
+
+account_device_count is maintained by trg_device_count_account
+(11_tb_device.sql), which also rejects an insert that would take an account
+past its plan. This cache lets the API turn over-quota requests away before
+touching the database:
+
+- account_id -> AccountQuota(device_count, max_devices), one primary-key
+  join on a miss; accounts without a subscription cache as None (no limit)
+- invalidated by NOTIFY on QUOTA_CHANNEL whenever an account's counter
+  changes; the TTL bounds staleness (e.g. plan changes, missed notifications)
+"""
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config.setting import settings
+from ..models.account_device_count import AccountDeviceCount
+from ..models.plan import Plan
+from ..models.subscription import Subscription
+
+QUOTA_CHANNEL = "account_device_count"
+
+
+class AccountQuota(NamedTuple):
+    device_count: int
+    max_devices: int
+
+    @property
+    def exhausted(self) -> bool:
+        return self.device_count >= self.max_devices
+
+
+class DeviceQuotaCache:
+    def __init__(self, max_size: int, ttl_seconds: float) -> None:
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        # account_id -> (expires_at, AccountQuota | None)
+        self._entries: OrderedDict[int, tuple[float, AccountQuota | None]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, db: AsyncSession, account_id: int) -> AccountQuota | None:
+        """The account's quota, or None when its devices are not limited."""
+        entry = self._entries.get(account_id)
+        if entry is not None and entry[0] >= time.monotonic():
+            self._entries.move_to_end(account_id)
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        stmt = (
+            select(
+                func.coalesce(AccountDeviceCount.device_count, 0),
+                Plan.max_devices,
+            )
+            .select_from(Subscription)
+            .join(Plan, Plan.code == Subscription.plan_code)
+            .outerjoin(
+                AccountDeviceCount,
+                AccountDeviceCount.account_id == Subscription.account_id,
+            )
+            .where(Subscription.account_id == account_id)
+        )
+        result = await db.execute(stmt)
+        row = result.one_or_none()
+        quota = AccountQuota(*row) if row is not None else None
+
+        self._entries[account_id] = (time.monotonic() + self.ttl_seconds, quota)
+        self._entries.move_to_end(account_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        return quota
+
+    def invalidate(self, account_id: int) -> None:
+        self._entries.pop(account_id, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def on_notify(self, payload: str) -> None:
+        """NOTIFY callback: payload is the account id."""
+        try:
+            self.invalidate(int(payload))
+        except ValueError:
+            self.clear()
+
+
+device_quota = DeviceQuotaCache(
+    max_size=settings.quota.cache_size,
+    ttl_seconds=settings.quota.cache_ttl_seconds,
+)
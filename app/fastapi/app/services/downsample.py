@@ -0,0 +1,58 @@
+# app/services/downsample.py
+"""
+Largest-Triangle-Three-Buckets (LTTB) point reduction.
+
+Keeps the first and last points, splits the rest into `threshold - 2`
+buckets and from each bucket keeps the point forming the largest triangle
+with the previously kept point and the average of the next bucket. Peaks,
+turns and stops survive; runs of near-collinear points collapse.
+
+Pure function over coordinates; callers map the returned indices back to
+their rows (see GET /telemetry/{device_id}/downsample).
+"""
+from collections.abc import Sequence
+
+
+def lttb(xs: Sequence[float], ys: Sequence[float], threshold: int) -> list[int]:
+    """
+    Return the indices (ascending) of the points to keep.
+
+    `xs` / `ys` are the point coordinates in drawing order. When there are
+    no more than `threshold` points (or threshold < 3) every index is kept.
+    """
+    n = len(xs)
+    if len(ys) != n:
+        raise ValueError("xs and ys must have the same length")
+    if threshold >= n or threshold < 3:
+        return list(range(n))
+
+    every = (n - 2) / (threshold - 2)
+    kept = [0]
+    a = 0
+
+    for i in range(threshold - 2):
+        # current bucket [start, end), next bucket [end, next_end)
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+
+        if end >= next_end:         # last bucket: next "bucket" is the end point
+            avg_x, avg_y = xs[n - 1], ys[n - 1]
+        else:
+            count = next_end - end
+            avg_x = sum(xs[end:next_end]) / count
+            avg_y = sum(ys[end:next_end]) / count
+
+        ax, ay = xs[a], ys[a]
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            # twice the triangle area; the factor does not change the argmax
+            area = abs((ax - avg_x) * (ys[j] - ay) - (ax - xs[j]) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+
+        kept.append(best)
+        a = best
+
+    kept.append(n - 1)
+    return kept
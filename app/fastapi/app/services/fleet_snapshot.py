@@ -0,0 +1,359 @@
+# app/services/fleet_snapshot.py
+"""
+In-memory snapshot of the live fleet (device_latest) for nearest-device
+queries, one per worker.
+
+FleetIndex keeps one slot per device in parallel typed arrays (device_id,
+account_id, x, y, recorded_at as epoch seconds: 40 bytes per device) and
+buckets the slots in a uniform grid of `cell_size` squares. kNN searches
+the grid in rings around the query cell and stops as soon as no unvisited
+cell can hold a closer device; radius queries only visit the cells the
+circle overlaps.
+
+FleetSnapshot keeps the index current:
+- full reload at start and every `full_refresh_seconds` (deleted devices,
+  account moves), read in device_id keyset chunks and swapped in at once
+- in between, every `interval_seconds`, an incremental refresh reads only
+  rows whose recorded_at passed the watermark (idx_device_latest_recorded_at),
+  re-reading `overlap_seconds` before it for late, out-of-order points
+
+The index holds at most `max_devices` devices (the rest are counted as
+`overflow`); size, memory and refresh cost are on GET /health/fleet.
+"""
+import asyncio
+import heapq
+import logging
+import math
+import sys
+import time
+from array import array
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import Select, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from ..config.setting import settings
+from ..db.database import engine
+from ..models.device import Device
+from ..models.device_latest import DeviceLatest
+
+logger = logging.getLogger(__name__)
+
+_FLEET_ROWS = select(
+    DeviceLatest.device_id,
+    Device.account_id,
+    DeviceLatest.x_coord,
+    DeviceLatest.y_coord,
+    DeviceLatest.recorded_at,
+).join(Device, Device.id == DeviceLatest.device_id)
+
+
+class FleetIndex:
+    def __init__(self, cell_size: float, max_devices: int) -> None:
+        self.cell_size = cell_size
+        self.max_devices = max_devices
+
+        # slot -> columns
+        self._ids = array("q")
+        self._accounts = array("q")
+        self._xs = array("d")
+        self._ys = array("d")
+        self._ts = array("d")
+
+        self._slots: dict[int, int] = {}                    # device_id -> slot
+        self._cells: dict[tuple[int, int], list[int]] = {}  # cell -> slots
+        # occupied cell range: (min_cx, min_cy, max_cx, max_cy)
+        self._bounds: tuple[int, int, int, int] | None = None
+
+        self.overflow = 0
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _cell(self, x: float, y: float) -> tuple[int, int]:
+        return math.floor(x / self.cell_size), math.floor(y / self.cell_size)
+
+    def upsert(
+        self,
+        device_id: int,
+        account_id: int,
+        x: float,
+        y: float,
+        recorded_at: float,
+    ) -> bool:
+        """Add or move a device; False when the index is full."""
+        cell = self._cell(x, y)
+        slot = self._slots.get(device_id)
+
+        if slot is None:
+            if len(self._ids) >= self.max_devices:
+                self.overflow += 1
+                return False
+            slot = len(self._ids)
+            self._slots[device_id] = slot
+            self._ids.append(device_id)
+            self._accounts.append(account_id)
+            self._xs.append(x)
+            self._ys.append(y)
+            self._ts.append(recorded_at)
+        else:
+            if recorded_at < self._ts[slot]:
+                return True                 # re-read of an older position
+            old_cell = self._cell(self._xs[slot], self._ys[slot])
+            self._accounts[slot] = account_id
+            self._xs[slot] = x
+            self._ys[slot] = y
+            self._ts[slot] = recorded_at
+            if old_cell == cell:
+                return True
+            members = self._cells[old_cell]
+            members.remove(slot)
+            if not members:
+                del self._cells[old_cell]
+
+        self._cells.setdefault(cell, []).append(slot)
+        cx, cy = cell
+        if self._bounds is None:
+            self._bounds = (cx, cy, cx, cy)
+        else:
+            min_cx, min_cy, max_cx, max_cy = self._bounds
+            self._bounds = (min(min_cx, cx), min(min_cy, cy), max(max_cx, cx), max(max_cy, cy))
+        return True
+
+    def nearest(
+        self,
+        x: float,
+        y: float,
+        k: int,
+        radius: float | None = None,
+        account_id: int | None = None,
+        min_recorded_at: float | None = None,
+    ) -> list[tuple[float, int]]:
+        """Up to k (distance, slot) pairs, nearest first, optionally within `radius`."""
+        if self._bounds is None or k <= 0:
+            return []
+        cx, cy = self._cell(x, y)
+        min_cx, min_cy, max_cx, max_cy = self._bounds
+
+        # rings (max(|dx|, |dy|) == r) that intersect the occupied range
+        first_ring = max(0, min_cx - cx, cx - max_cx, min_cy - cy, cy - max_cy)
+        last_ring = max(cx - min_cx, max_cx - cx, cy - min_cy, max_cy - cy)
+        if radius is not None:
+            last_ring = min(last_ring, int(radius // self.cell_size) + 1)
+
+        best: list[tuple[float, int]] = []      # max-heap of (-distance, slot)
+        for r in range(first_ring, last_ring + 1):
+            # devices in ring r or beyond are at least (r - 1) cells away
+            if len(best) == k and -best[0][0] <= (r - 1) * self.cell_size:
+                break
+            for cell in self._ring(cx, cy, r):
+                for slot in self._cells.get(cell, ()):
+                    if account_id is not None and self._accounts[slot] != account_id:
+                        continue
+                    if min_recorded_at is not None and self._ts[slot] < min_recorded_at:
+                        continue
+                    distance = math.hypot(self._xs[slot] - x, self._ys[slot] - y)
+                    if radius is not None and distance > radius:
+                        continue
+                    if len(best) < k:
+                        heapq.heappush(best, (-distance, slot))
+                    elif distance < -best[0][0]:
+                        heapq.heapreplace(best, (-distance, slot))
+
+        return sorted((-neg, slot) for neg, slot in best)
+
+    def _ring(self, cx: int, cy: int, r: int):
+        """Occupied-range cells at Chebyshev distance r from (cx, cy)."""
+        min_cx, min_cy, max_cx, max_cy = self._bounds
+        if r == 0:
+            yield cx, cy
+            return
+        xs = range(max(cx - r, min_cx), min(cx + r, max_cx) + 1)
+        for dy in (-r, r):
+            if min_cy <= cy + dy <= max_cy:
+                for x in xs:
+                    yield x, cy + dy
+        ys = range(max(cy - r + 1, min_cy), min(cy + r - 1, max_cy) + 1)
+        for dx in (-r, r):
+            if min_cx <= cx + dx <= max_cx:
+                for y in ys:
+                    yield cx + dx, y
+
+    def row(self, slot: int) -> dict:
+        return {
+            "device_id": self._ids[slot],
+            "account_id": self._accounts[slot],
+            "x_coord": self._xs[slot],
+            "y_coord": self._ys[slot],
+            "recorded_at": datetime.fromtimestamp(self._ts[slot], timezone.utc),
+        }
+
+    def memory_bytes(self) -> int:
+        """Approximate footprint: arrays, slot map and grid buckets."""
+        columns = (self._ids, self._accounts, self._xs, self._ys, self._ts)
+        size = sum(sys.getsizeof(column) for column in columns)
+        size += sys.getsizeof(self._slots) + sys.getsizeof(self._cells)
+        size += sum(sys.getsizeof(members) for members in self._cells.values())
+        return size
+
+    def cell_count(self) -> int:
+        return len(self._cells)
+
+
+class FleetSnapshot:
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        interval_seconds: float,
+        full_refresh_seconds: float,
+        overlap_seconds: float,
+        batch_size: int,
+        cell_size: float,
+        max_devices: int,
+    ) -> None:
+        self._engine = engine
+        self.interval_seconds = interval_seconds
+        self.full_refresh_seconds = full_refresh_seconds
+        self.overlap = timedelta(seconds=overlap_seconds)
+        self.batch_size = batch_size
+        self.cell_size = cell_size
+        self.max_devices = max_devices
+
+        self._task: asyncio.Task | None = None
+        self.index: FleetIndex | None = None    # None until the first full load
+        self.watermark: datetime | None = None  # newest recorded_at seen
+        self._next_full_reload = 0.0
+
+        # counters
+        self.refreshes = 0
+        self.full_reloads = 0
+        self.failed_refreshes = 0
+        self.last_refresh_seconds: float | None = None
+        self.last_refresh_rows = 0
+
+    def stats(self) -> dict:
+        index = self.index
+        return {
+            "running": self._task is not None,
+            "ready": index is not None,
+            "devices": len(index) if index is not None else 0,
+            "max_devices": self.max_devices,
+            "overflow": index.overflow if index is not None else 0,
+            "cells": index.cell_count() if index is not None else 0,
+            "cell_size": self.cell_size,
+            "memory_bytes": index.memory_bytes() if index is not None else 0,
+            "watermark": self.watermark,
+            "refreshes": self.refreshes,
+            "full_reloads": self.full_reloads,
+            "failed_refreshes": self.failed_refreshes,
+            "last_refresh_seconds": self.last_refresh_seconds,
+            "last_refresh_rows": self.last_refresh_rows,
+        }
+
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run(), name="fleet-snapshot")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("Fleet snapshot refresh failed")
+                self.failed_refreshes += 1
+            await asyncio.sleep(self.interval_seconds)
+
+    async def refresh(self) -> None:
+        started = time.perf_counter()
+        if self.index is None or time.monotonic() >= self._next_full_reload:
+            rows = await self._full_reload()
+        else:
+            rows = await self._incremental()
+        self.refreshes += 1
+        self.last_refresh_rows = rows
+        self.last_refresh_seconds = time.perf_counter() - started
+
+    async def _full_reload(self) -> int:
+        index = FleetIndex(self.cell_size, self.max_devices)
+        watermark = None
+        rows = 0
+        after_id = 0
+        while True:
+            stmt = (
+                _FLEET_ROWS.where(DeviceLatest.device_id > after_id)
+                .order_by(DeviceLatest.device_id)
+                .limit(self.batch_size)
+            )
+            chunk = await self._fetch(stmt)
+            for device_id, account_id, x, y, recorded_at in chunk:
+                index.upsert(device_id, account_id, x, y, recorded_at.timestamp())
+                if watermark is None or recorded_at > watermark:
+                    watermark = recorded_at
+            rows += len(chunk)
+            if len(chunk) < self.batch_size:
+                break
+            after_id = chunk[-1][0]
+
+        self.index = index
+        self.watermark = watermark
+        self.full_reloads += 1
+        self._next_full_reload = time.monotonic() + self.full_refresh_seconds
+        if index.overflow:
+            logger.warning(
+                "Fleet snapshot full: %d devices not indexed (max_devices=%d)",
+                index.overflow,
+                self.max_devices,
+            )
+        return rows
+
+    async def _incremental(self) -> int:
+        if self.watermark is None:
+            return 0
+        # keyset on (recorded_at, device_id): ties across chunks are not lost
+        after = (self.watermark - self.overlap, 0)
+        rows = 0
+        while True:
+            stmt = (
+                _FLEET_ROWS.where(
+                    tuple_(DeviceLatest.recorded_at, DeviceLatest.device_id) > after
+                )
+                .order_by(DeviceLatest.recorded_at, DeviceLatest.device_id)
+                .limit(self.batch_size)
+            )
+            chunk = await self._fetch(stmt)
+            # applied without awaiting: queries never see a half-applied chunk
+            for device_id, account_id, x, y, recorded_at in chunk:
+                self.index.upsert(device_id, account_id, x, y, recorded_at.timestamp())
+            rows += len(chunk)
+            if chunk:
+                after = (chunk[-1].recorded_at, chunk[-1].device_id)
+                self.watermark = max(self.watermark, chunk[-1].recorded_at)
+            if len(chunk) < self.batch_size:
+                return rows
+
+    async def _fetch(self, stmt: Select) -> list:
+        async with self._engine.connect() as conn:
+            result = await conn.execute(stmt)
+            return result.all()
+
+
+fleet_snapshot = FleetSnapshot(
+    engine,
+    interval_seconds=settings.fleet.interval_seconds,
+    full_refresh_seconds=settings.fleet.full_refresh_seconds,
+    overlap_seconds=settings.fleet.overlap_seconds,
+    batch_size=settings.fleet.batch_size,
+    cell_size=settings.fleet.cell_size,
+    max_devices=settings.fleet.max_devices,
+)
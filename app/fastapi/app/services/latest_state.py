@@ -0,0 +1,182 @@
+# app/services/latest_state.py
+"""
+Latest-state aggregator.
+
+Every ingest otherwise updates the same device_latest and device rows,
+so chatty devices serialize on those row locks and leave a dead tuple per
+point on both tables. With INGEST__COALESCE_LATEST the ingest path hands the
+newest point per device to this aggregator instead, once the ingest
+transaction has committed (see telemetry_ingest.set_latest_sink); it keeps only the newest point per
+device in memory and flushes every `latest_flush_ms` as:
+
+- one multi-row device_latest upsert (guard: recorded_at < excluded)
+- one multi-row device.last_seen_at update (guard: never moves backwards)
+
+Trade-off: device_latest / last_seen_at lag ingest by up to one interval,
+and pending state is lost if the worker crashes (telemetry rows are not).
+
+A batch that fails on a transient error (connection loss, deadlock,
+serialization failure) is merged back and retried, at most
+`latest_max_attempts` flushes in a row; any other error drops it at once.
+Dropped rows are counted; the next point of each device repairs its state.
+"""
+import asyncio
+import logging
+
+from sqlalchemy.exc import DBAPIError, IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from ..config.setting import settings
+from ..db.database import async_session_maker
+from .telemetry_ingest import (
+    TelemetryRow,
+    existing_device_ids,
+    set_latest_sink,
+    touch_last_seen,
+    upsert_device_latest,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class LatestStateAggregator:
+    def __init__(
+        self,
+        session_maker: async_sessionmaker[AsyncSession],
+        flush_interval_seconds: float,
+        max_pending: int,
+        max_attempts: int,
+    ) -> None:
+        self._session_maker = session_maker
+        self.flush_interval_seconds = flush_interval_seconds
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+
+        self._pending: dict[int, TelemetryRow] = {}
+        self._wakeup: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+        self._stopping = False
+        self._attempts = 0          # consecutive failed flushes
+
+        # counters
+        self.offered = 0
+        self.flushed = 0
+        self.flushes = 0
+        self.failed_flushes = 0
+        self.dropped = 0
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def offer(self, rows: list[TelemetryRow]) -> None:
+        """Keep the newest row per device (LatestSink)."""
+        self.offered += len(rows)
+        self._merge(rows)
+        if len(self._pending) >= self.max_pending and self._wakeup is not None:
+            self._wakeup.set()
+
+    def _merge(self, rows: list[TelemetryRow]) -> None:
+        for row in rows:
+            current = self._pending.get(row.device_id)
+            if current is None or row.recorded_at > current.recorded_at:
+                self._pending[row.device_id] = row
+
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._task = asyncio.create_task(self._run(), name="latest-state-flush")
+        set_latest_sink(self.offer)
+
+    async def stop(self) -> None:
+        """Stop accepting points and flush what is pending."""
+        if self._task is None:
+            return
+        set_latest_sink(None)
+        self._stopping = True
+        self._wakeup.set()
+        await self._task
+        self._task = None
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(
+                    self._wakeup.wait(), self.flush_interval_seconds
+                )
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self) -> None:
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, {}
+        # device_id order: consistent lock order across workers
+        rows = [batch[device_id] for device_id in sorted(batch)]
+        try:
+            async with self._session_maker() as db:
+                try:
+                    await self._write(db, rows)
+                except IntegrityError:
+                    # A device was deleted after its points were accepted
+                    await db.rollback()
+                    existing = await existing_device_ids(db, rows)
+                    rows = [row for row in rows if row.device_id in existing]
+                    await self._write(db, rows)
+        except Exception as exc:
+            logger.exception("device_latest flush of %d devices failed", len(rows))
+            self.failed_flushes += 1
+            self._attempts += 1
+            if _is_transient(exc) and self._attempts < self.max_attempts:
+                # Put the batch back unless a newer point arrived meanwhile
+                self._merge(rows)
+            else:
+                logger.error(
+                    "Dropped device_latest batch of %d devices after %d attempt(s)",
+                    len(rows),
+                    self._attempts,
+                )
+                self.dropped += len(rows)
+                self._attempts = 0
+            return
+
+        self._attempts = 0
+        self.flushed += len(rows)
+        self.flushes += 1
+
+    @staticmethod
+    async def _write(db: AsyncSession, rows: list[TelemetryRow]) -> None:
+        if rows:
+            await upsert_device_latest(db, rows)
+            await touch_last_seen(db, rows, only_newer=True)
+        await db.commit()
+
+
+# SQLSTATE classes worth a retry: connection exception, transaction
+# rollback (serialization failure, deadlock), insufficient resources,
+# operator intervention (admin shutdown)
+_TRANSIENT_SQLSTATE_CLASSES = ("08", "40", "53", "57")
+
+
+def _is_transient(exc: Exception) -> bool:
+    if isinstance(exc, (OSError, asyncio.TimeoutError)):
+        return True
+    if not isinstance(exc, DBAPIError):
+        return False
+    if exc.connection_invalidated:
+        return True
+    sqlstate = getattr(exc.orig, "sqlstate", None) or ""
+    return sqlstate[:2] in _TRANSIENT_SQLSTATE_CLASSES
+
+
+latest_aggregator = LatestStateAggregator(
+    async_session_maker,
+    flush_interval_seconds=settings.ingest.latest_flush_ms / 1000,
+    max_pending=settings.ingest.latest_max_pending,
+    max_attempts=settings.ingest.latest_max_attempts,
+)
@@ -0,0 +1,161 @@
+# app/services/live.py
+"""
+Live telemetry fan-out (WebSocket / SSE subscribers).
+
+With LIVE__ENABLED the ingest transaction NOTIFYs LIVE_CHANNEL with the
+newest point per device it wrote (telemetry_ingest.notify_live), so the
+notification is only delivered once the points are committed, whichever
+worker or write-behind task wrote them. Every worker LISTENs and hands each
+payload to its local subscribers (by device_id or account_id).
+
+Each point is encoded once, on the ingest side, in the REST response shape
+(telemetry_ingest.live_point); workers forward payloads as received (JSON
+text), never re-encoded.
+
+Slow consumers never buffer without limit: a Subscription keeps only the
+newest pending payload per device (a newer point replaces the unsent one,
+counted as `conflated`) and at most `max_pending` devices; points for
+further devices are dropped until the client catches up.
+"""
+import asyncio
+import json
+import logging
+from collections import OrderedDict
+from collections.abc import Iterable
+
+from ..config.setting import settings
+
+logger = logging.getLogger(__name__)
+
+LIVE_CHANNEL = "telemetry_live"
+
+
+class TooManySubscribers(Exception):
+    pass
+
+
+class Subscription:
+    def __init__(
+        self,
+        device_ids: frozenset[int],
+        account_id: int | None,
+        max_pending: int,
+    ) -> None:
+        self.device_ids = device_ids
+        self.account_id = account_id
+        self.max_pending = max_pending
+        # device_id -> newest unsent payload
+        self._pending: OrderedDict[int, str] = OrderedDict()
+        self._ready = asyncio.Event()
+
+        # counters
+        self.delivered = 0
+        self.conflated = 0
+        self.dropped = 0
+
+    def offer(self, device_id: int, payload: str) -> None:
+        if device_id in self._pending:
+            self._pending[device_id] = payload
+            self.conflated += 1
+        elif len(self._pending) >= self.max_pending:
+            self.dropped += 1
+            return
+        else:
+            self._pending[device_id] = payload
+        self._ready.set()
+
+    async def next_batch(self) -> list[str]:
+        """Wait for, then take, every pending payload (oldest device first)."""
+        await self._ready.wait()
+        self._ready.clear()
+        batch = list(self._pending.values())
+        self._pending.clear()
+        self.delivered += len(batch)
+        return batch
+
+
+class LiveHub:
+    def __init__(self, max_subscribers: int, max_pending: int) -> None:
+        self.max_subscribers = max_subscribers
+        self.max_pending = max_pending
+        self._by_device: dict[int, set[Subscription]] = {}
+        self._by_account: dict[int, set[Subscription]] = {}
+        self._subscriptions: set[Subscription] = set()
+
+        # counters
+        self.received = 0
+        self.malformed = 0
+
+    def __len__(self) -> int:
+        return len(self._subscriptions)
+
+    def subscribe(
+        self,
+        device_ids: Iterable[int] = (),
+        account_id: int | None = None,
+    ) -> Subscription:
+        if len(self._subscriptions) >= self.max_subscribers:
+            raise TooManySubscribers(
+                f"Live subscriber limit reached ({self.max_subscribers})"
+            )
+        sub = Subscription(frozenset(device_ids), account_id, self.max_pending)
+        self._subscriptions.add(sub)
+        for device_id in sub.device_ids:
+            self._by_device.setdefault(device_id, set()).add(sub)
+        if account_id is not None:
+            self._by_account.setdefault(account_id, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        self._subscriptions.discard(sub)
+        for device_id in sub.device_ids:
+            _discard(self._by_device, device_id, sub)
+        if sub.account_id is not None:
+            _discard(self._by_account, sub.account_id, sub)
+
+    def publish(self, device_id: int, account_id: int | None, payload: str) -> None:
+        targets = self._by_device.get(device_id, set())
+        if account_id is not None:
+            targets = targets | self._by_account.get(account_id, set())
+        for sub in targets:
+            sub.offer(device_id, payload)
+
+    def on_notify(self, payload: str) -> None:
+        """NOTIFY callback: payload is one point as JSON (see notify_live)."""
+        self.received += 1
+        if not self._subscriptions:
+            return
+        try:
+            point = json.loads(payload)
+            device_id = int(point["device_id"])
+            account_id = point.get("account_id")
+        except (ValueError, KeyError, TypeError):
+            self.malformed += 1
+            logger.warning("Malformed live telemetry payload: %.200s", payload)
+            return
+        self.publish(device_id, account_id, payload)
+
+    def stats(self) -> dict:
+        subs = self._subscriptions
+        return {
+            "subscribers": len(subs),
+            "received": self.received,
+            "malformed": self.malformed,
+            "delivered": sum(s.delivered for s in subs),
+            "conflated": sum(s.conflated for s in subs),
+            "dropped": sum(s.dropped for s in subs),
+        }
+
+
+def _discard(index: dict[int, set[Subscription]], key: int, sub: Subscription) -> None:
+    subs = index.get(key)
+    if subs is not None:
+        subs.discard(sub)
+        if not subs:
+            del index[key]
+
+
+live_hub = LiveHub(
+    max_subscribers=settings.live.max_subscribers,
+    max_pending=settings.live.max_pending,
+)
@@ -0,0 +1,146 @@
+# app/services/metrics.py
+"""
+Prometheus metrics.
+
+Served on GET /metrics (routers/metrics.py). Under uvicorn --workers N set
+PROMETHEUS_MULTIPROC_DIR to an empty, writable directory (wiped before the
+server starts): every worker then writes its samples there and /metrics
+aggregates all workers, whichever one answers the scrape.
+
+HTTP / DB metrics are recorded by middleware.metrics.MetricsMiddleware,
+ingest metrics by the telemetry router through observe_ingest(), retention
+metrics by services.retention.RetentionWorker, partition metrics by
+services.partitions.PartitionManager.
+"""
+import os
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+MULTIPROCESS = "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 4, 5, 8, 13, 21, 34, 55, 100)
+BATCH_BUCKETS = (1, 5, 10, 50, 100, 500, 1000, 5000, 10_000, 50_000)
+
+# ---- HTTP ----
+http_requests = Counter(
+    "http_requests_total",
+    "HTTP requests by route template and status code",
+    ["method", "route", "status"],
+)
+http_request_duration = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency (until the response body is sent)",
+    ["method", "route"],
+    buckets=LATENCY_BUCKETS,
+)
+http_requests_in_progress = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests being served",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+
+# ---- DB per request ----
+db_statements_per_request = Histogram(
+    "db_statements_per_request",
+    "SQL statements executed per HTTP request",
+    ["route"],
+    buckets=STATEMENT_BUCKETS,
+)
+db_time_per_request = Histogram(
+    "db_time_per_request_seconds",
+    "Time spent executing SQL per HTTP request",
+    ["route"],
+    buckets=LATENCY_BUCKETS,
+)
+
+# ---- ingest ----
+telemetry_points_ingested = Counter(
+    "telemetry_points_ingested_total",
+    "Telemetry points accepted for storage (rate() gives points/sec)",
+    ["endpoint"],
+)
+telemetry_points_dropped = Counter(
+    "telemetry_points_dropped_total",
+    "Telemetry points dropped by the plan rate limit",
+    ["endpoint"],
+)
+telemetry_batch_size = Histogram(
+    "telemetry_batch_size",
+    "Points per ingest request",
+    ["endpoint"],
+    buckets=BATCH_BUCKETS,
+)
+
+# ---- retention ----
+retention_rows_purged = Counter(
+    "telemetry_retention_rows_purged_total",
+    "Telemetry rows deleted by the per-plan retention worker",
+)
+retention_runs = Counter(
+    "telemetry_retention_runs_total",
+    "Retention runs (complete: every account processed within max_rows_per_run)",
+    ["complete"],
+)
+retention_failed_runs = Counter(
+    "telemetry_retention_failed_runs_total",
+    "Retention runs that raised",
+)
+retention_last_run_seconds = Gauge(
+    "telemetry_retention_last_run_seconds",
+    "Duration of the latest retention run",
+    multiprocess_mode="mostrecent",
+)
+retention_last_run_timestamp = Gauge(
+    "telemetry_retention_last_run_timestamp_seconds",
+    "Unix time the latest retention run finished",
+    multiprocess_mode="mostrecent",
+)
+
+# ---- partitions ----
+partition_rows_moved = Counter(
+    "telemetry_partition_rows_moved_total",
+    "Telemetry rows moved out of the default partition into a new partition",
+)
+partition_ddl_failures = Counter(
+    "telemetry_partition_ddl_failures_total",
+    "Partition create / drop statements that failed",
+)
+partition_default_rows = Gauge(
+    "telemetry_partition_default_rows",
+    "Estimated rows in the default partition (latest maintenance run)",
+    multiprocess_mode="mostrecent",
+)
+
+
+def observe_ingest(endpoint: str, accepted: int, dropped: int = 0) -> None:
+    telemetry_points_ingested.labels(endpoint).inc(accepted)
+    telemetry_batch_size.labels(endpoint).observe(accepted + dropped)
+    if dropped:
+        telemetry_points_dropped.labels(endpoint).inc(dropped)
+
+
+def render() -> tuple[bytes, str]:
+    """Exposition body and content type, aggregated over workers if multiprocess."""
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead() -> None:
+    """Drop this worker's live gauges (multiprocess mode) on shutdown."""
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(os.getpid())
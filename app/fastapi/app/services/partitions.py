@@ -0,0 +1,356 @@
+# app/services/partitions.py
+"""
+device_telemetry partition manager.
+
+Runs at startup and then every `partitions.interval_seconds`:
+
+- pre-creates partitions `premake` periods ahead of today, daily or monthly
+  (auto: daily once the newest complete partition averaged more than
+  `daily_threshold_rows` rows per day)
+- creates partitions for past days the default partition holds rows for
+  (e.g. after a gap in maintenance), so those rows are pruned and expire
+  again; create_telemetry_partition moves the rows out of the default
+- with `drop_expired` (off by default), detaches and drops partitions that
+  ended before today - max(plan.retention_days)
+
+Partitions are named device_telemetry_YYYY_MM (monthly) or
+device_telemetry_YYYY_MM_DD (daily) and their range is derived from the
+name. DDL goes through the SECURITY DEFINER functions in 12_tb_telemetry.sql.
+Rows outside every range land in device_telemetry_default, which is read
+in full once per run and so is expected to stay small.
+
+One worker at a time: the run holds a session advisory lock, and each DDL
+statement commits on its own so ingest is blocked for one statement at most.
+"""
+import asyncio
+import logging
+import re
+from datetime import date, timedelta
+from typing import Any, Literal, NamedTuple
+
+from sqlalchemy import func, select, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from ..config.setting import settings
+from ..db.database import engine
+from ..db.locks import advisory_lock
+from ..models.plan import Plan
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+Granularity = Literal["daily", "monthly"]
+
+PARTITION_PREFIX = "device_telemetry_"
+DEFAULT_PARTITION = "device_telemetry_default"
+PARTITION_TIMEZONE = "America/Toronto"       # app_db timezone
+LOCK_TIMEOUT = "5s"                          # per DDL statement
+LOCK_NAME = "device_telemetry_partitions"
+
+_NAME_RE = re.compile(r"^device_telemetry_(\d{4})_(\d{2})(?:_(\d{2}))?$")
+
+_LIST_PARTITIONS = text("""
+    SELECT c.relname AS name, c.reltuples AS rows
+    FROM pg_inherits i
+    JOIN pg_class c ON c.oid = i.inhrelid
+    WHERE i.inhparent = 'db_schema.device_telemetry'::regclass
+""")
+
+# Local days with rows in the default partition
+_DEFAULT_DAYS = text(f"""
+    SELECT DISTINCT (recorded_at AT TIME ZONE :tz)::date AS day
+    FROM db_schema.{DEFAULT_PARTITION}
+""")
+
+
+class Partition(NamedTuple):
+    name: str
+    start: date
+    end: date                   # exclusive
+    rows: float = 0             # planner estimate (pg_class.reltuples)
+
+
+def _add_months(day: date, months: int) -> date:
+    month = day.month - 1 + months
+    return date(day.year + month // 12, month % 12 + 1, 1)
+
+
+def partition_for(start: date, granularity: Granularity) -> Partition:
+    """The partition starting at `start` (monthly only on the 1st)."""
+    if granularity == "monthly" and start.day == 1:
+        return Partition(f"{PARTITION_PREFIX}{start:%Y_%m}", start, _add_months(start, 1))
+    return Partition(f"{PARTITION_PREFIX}{start:%Y_%m_%d}", start, start + timedelta(days=1))
+
+
+def parse_partition(name: str, rows: float = 0) -> Partition | None:
+    """Range of a managed partition from its name; None for anything else."""
+    match = _NAME_RE.match(name)
+    if match is None:
+        return None
+    year, month, day = match.groups()
+    try:
+        if day is None:
+            start = date(int(year), int(month), 1)
+            return Partition(name, start, _add_months(start, 1), rows)
+        start = date(int(year), int(month), int(day))
+    except ValueError:
+        return None
+    return Partition(name, start, start + timedelta(days=1), rows)
+
+
+def estimate_rows_per_day(partitions: list[Partition], today: date) -> float:
+    """
+    Ingest volume from the newest complete partition, else from the one
+    covering today (rows so far / days elapsed).
+    """
+    complete = [p for p in partitions if p.end <= today]
+    if complete:
+        newest = max(complete, key=lambda p: p.end)
+        return max(newest.rows, 0) / (newest.end - newest.start).days
+
+    for p in partitions:
+        if p.start <= today < p.end:
+            return max(p.rows, 0) / ((today - p.start).days + 1)
+    return 0.0
+
+
+def choose_granularity(
+    mode: Literal["auto", "daily", "monthly"],
+    rows_per_day: float,
+    daily_threshold_rows: int,
+) -> Granularity:
+    if mode != "auto":
+        return mode
+    return "daily" if rows_per_day > daily_threshold_rows else "monthly"
+
+
+def plan_partitions(
+    existing: list[Partition],
+    today: date,
+    granularity: Granularity,
+    premake: int,
+) -> list[Partition]:
+    """
+    Partitions to create so today and the next `premake` periods are covered.
+
+    Continues from the end of the newest existing partition (filling days up
+    to the next month boundary when switching daily -> monthly). Past gaps
+    are left to the default partition.
+    """
+    if granularity == "monthly":
+        period_start = today.replace(day=1)
+        horizon = _add_months(period_start, premake + 1)
+    else:
+        period_start = today
+        horizon = today + timedelta(days=premake + 1)
+
+    cursor = max((p.end for p in existing), default=period_start)
+    cursor = max(cursor, period_start)
+
+    planned: list[Partition] = []
+    while cursor < horizon:
+        partition = partition_for(cursor, granularity)
+        planned.append(partition)
+        cursor = partition.end
+    return planned
+
+
+def plan_backfill(
+    existing: list[Partition],
+    default_days: list[date],
+    before: date,
+    granularity: Granularity,
+) -> list[Partition]:
+    """
+    Partitions for the days before `before` that the default partition
+    holds rows for: one per month (monthly) unless that month overlaps an
+    existing partition, else one per day.
+    """
+    def free(candidate: Partition) -> bool:
+        return not any(p.start < candidate.end and candidate.start < p.end for p in existing)
+
+    planned: dict[str, Partition] = {}
+    for day in sorted(default_days):
+        if day >= before or not all(day < p.start or day >= p.end for p in existing):
+            continue
+        partition = partition_for(day.replace(day=1), "monthly")
+        if granularity == "daily" or not free(partition):
+            partition = partition_for(day, "daily")
+        planned[partition.name] = partition
+    return list(planned.values())
+
+
+def expired_partitions(
+    existing: list[Partition],
+    today: date,
+    retention_days: int,
+) -> list[Partition]:
+    """Partitions whose newest possible row is older than the retention."""
+    cutoff = today - timedelta(days=retention_days)
+    return [p for p in existing if p.end <= cutoff]
+
+
+class PartitionManager:
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        interval_seconds: float,
+        granularity: Literal["auto", "daily", "monthly"],
+        daily_threshold_rows: int,
+        premake: int,
+        drop_expired: bool,
+    ) -> None:
+        self._engine = engine
+        self.interval_seconds = interval_seconds
+        self.granularity = granularity
+        self.daily_threshold_rows = daily_threshold_rows
+        self.premake = premake
+        self.drop_expired = drop_expired
+
+        self._task: asyncio.Task | None = None
+
+        # counters / last run
+        self.runs = 0
+        self.failed_runs = 0
+        self.created = 0
+        self.dropped = 0
+        self.ddl_failures = 0
+        self.moved_rows = 0             # out of the default partition
+        self.default_rows = 0.0         # planner estimate, last run
+        self.last_granularity: Granularity | None = None
+
+    def stats(self) -> dict:
+        return {
+            "running": self._task is not None,
+            "runs": self.runs,
+            "failed_runs": self.failed_runs,
+            "created": self.created,
+            "dropped": self.dropped,
+            "ddl_failures": self.ddl_failures,
+            "moved_rows": self.moved_rows,
+            "default_rows": self.default_rows,
+            "granularity": self.last_granularity,
+            "drop_expired": self.drop_expired,
+        }
+
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run(), name="telemetry-partitions")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception:
+                logger.exception("Telemetry partition maintenance failed")
+                self.failed_runs += 1
+            await asyncio.sleep(self.interval_seconds)
+
+    async def run_once(self) -> None:
+        async with self._engine.connect() as conn:
+            async with advisory_lock(conn, LOCK_NAME) as locked:
+                if not locked:
+                    return          # another worker is on it
+                await self._maintain(conn)
+        self.runs += 1
+
+    async def _maintain(self, conn: AsyncConnection) -> None:
+        today = await conn.scalar(
+            text("SELECT (now() AT TIME ZONE :tz)::date"), {"tz": PARTITION_TIMEZONE}
+        )
+        listed = (await conn.execute(_LIST_PARTITIONS)).all()
+        existing = [
+            p for p in (parse_partition(row.name, row.rows) for row in listed)
+            if p is not None
+        ]
+        # reltuples is -1 until the first ANALYZE
+        self.default_rows = max(
+            [row.rows for row in listed if row.name == DEFAULT_PARTITION] + [0]
+        )
+        metrics.partition_default_rows.set(self.default_rows)
+        result = await conn.execute(_DEFAULT_DAYS, {"tz": PARTITION_TIMEZONE})
+        default_days = list(result.scalars())
+        max_retention = await conn.scalar(select(func.max(Plan.retention_days)))
+        await conn.commit()
+
+        granularity = choose_granularity(
+            self.granularity,
+            estimate_rows_per_day(existing, today),
+            self.daily_threshold_rows,
+        )
+        self.last_granularity = granularity
+
+        planned = plan_partitions(existing, today, granularity, self.premake)
+        backfill = plan_backfill(
+            existing + planned,
+            default_days,
+            min((p.start for p in planned), default=today),
+            granularity,
+        )
+        for partition in backfill + planned:
+            ok, moved = await self._ddl(
+                conn,
+                "SELECT db_schema.create_telemetry_partition(:name, :start, :end)",
+                {"name": partition.name, "start": partition.start, "end": partition.end},
+            )
+            if not ok:
+                continue
+            self.created += 1
+            if moved:
+                self.moved_rows += moved
+                metrics.partition_rows_moved.inc(moved)
+                logger.info(
+                    "Created telemetry partition %s, moved %d rows from the default partition",
+                    partition.name,
+                    moved,
+                )
+            else:
+                logger.info("Created telemetry partition %s", partition.name)
+
+        if not self.drop_expired or max_retention is None:
+            return
+        for partition in expired_partitions(existing, today, max_retention):
+            ok, _ = await self._ddl(
+                conn,
+                "SELECT db_schema.drop_telemetry_partition(:name)",
+                {"name": partition.name},
+            )
+            if ok:
+                self.dropped += 1
+                logger.info("Dropped expired telemetry partition %s", partition.name)
+
+    async def _ddl(self, conn: AsyncConnection, sql: str, params: dict) -> tuple[bool, Any]:
+        """One DDL statement in its own short transaction: (ok, its scalar result)."""
+        try:
+            await conn.execute(text(f"SET LOCAL lock_timeout = '{LOCK_TIMEOUT}'"))
+            value = await conn.scalar(text(sql), params)
+            await conn.commit()
+        except DBAPIError:
+            await conn.rollback()
+            self.ddl_failures += 1
+            metrics.partition_ddl_failures.inc()
+            logger.warning("Partition DDL failed: %s %s", sql, params, exc_info=True)
+            return False, None
+        return True, value
+
+
+partition_manager = PartitionManager(
+    engine,
+    interval_seconds=settings.partitions.interval_seconds,
+    granularity=settings.partitions.granularity,
+    daily_threshold_rows=settings.partitions.daily_threshold_rows,
+    premake=settings.partitions.premake,
+    drop_expired=settings.partitions.drop_expired,
+)
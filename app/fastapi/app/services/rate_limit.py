@@ -0,0 +1,138 @@
+# app/services/rate_limit.py
+"""
+Plan-aware ingest rate limiting (plan.min_sample_interval_seconds).
+
+A device may store one point per `min_sample_interval_seconds` of its
+account's plan. The check runs in memory, after the (cached) device lookup
+and before any telemetry write:
+
+- PlanIntervalCache: account_id -> interval, loaded for all accounts in one
+  query and reloaded every `plan_cache_ttl_seconds`
+- SampleRateLimiter: bounded LRU of the last accepted recorded_at per device
+
+Spacing is measured on recorded_at against the device's newest accepted
+point: a point must be at least one interval after it, so a backfill of
+correctly spaced points uploaded oldest first is accepted however fast,
+while backdated points are not. A point counts as accepted only once it is
+stored (record(), after the commit). The state is per worker process; with
+N workers, or concurrent requests for one device, a device can get a few
+more points per interval.
+
+INGEST__RATE_LIMIT: off | drop (discard, 202) | reject (429). Batches are
+always thinned; the number of dropped points is reported in the
+X-Telemetry-Dropped header.
+"""
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config.setting import settings
+from ..models.plan import Plan
+from ..models.subscription import Subscription
+from .telemetry_ingest import TelemetryRow
+
+DROPPED_HEADER = "X-Telemetry-Dropped"
+
+_ACCOUNT_INTERVALS = select(
+    Subscription.account_id, Plan.min_sample_interval_seconds
+).join(Plan, Plan.code == Subscription.plan_code)
+
+
+class PlanIntervalCache:
+    def __init__(self, ttl_seconds: float) -> None:
+        self.ttl_seconds = ttl_seconds
+        self._intervals: dict[int, float] = {}
+        self._expires_at = 0.0
+        self.loads = 0
+
+    async def intervals(self, db: AsyncSession) -> Mapping[int, float]:
+        """account_id -> min interval (seconds); accounts without a plan are absent."""
+        if time.monotonic() >= self._expires_at:
+            await self.reload(db)
+        return self._intervals
+
+    async def reload(self, db: AsyncSession) -> None:
+        # Concurrent requests keep using the current map while one reloads
+        self._expires_at = time.monotonic() + self.ttl_seconds
+        try:
+            result = await db.execute(_ACCOUNT_INTERVALS)
+        except Exception:
+            self._expires_at = 0.0
+            raise
+        self._intervals = {account_id: interval for account_id, interval in result}
+        self.loads += 1
+
+    def clear(self) -> None:
+        self._expires_at = 0.0
+
+
+class SampleRateLimiter:
+    def __init__(self, max_devices: int) -> None:
+        self.max_devices = max_devices
+        # device_id -> newest accepted recorded_at
+        self._last: OrderedDict[int, datetime] = OrderedDict()
+
+        # counters
+        self.accepted = 0
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return len(self._last)
+
+    def allow(self, device_id: int, recorded_at: datetime, interval: float) -> bool:
+        """
+        Whether the point is at least `interval` after the device's newest
+        accepted point. Nothing is recorded: call record() once it is stored.
+        """
+        if interval > 0 and not self._spaced(self._last.get(device_id), recorded_at, interval):
+            self.dropped += 1
+            return False
+        return True
+
+    def thin(
+        self,
+        rows: list[TelemetryRow],
+        device_intervals: Mapping[int, float],
+    ) -> list[TelemetryRow]:
+        """
+        Keep the rows each device's interval (device_id -> seconds) allows,
+        oldest first; pass the kept rows to record() once they are stored.
+        """
+        newest: dict[int, datetime] = {}     # kept in this batch
+        kept = []
+        for row in sorted(rows, key=lambda r: r.recorded_at):
+            interval = device_intervals.get(row.device_id, 0)
+            if interval > 0:
+                last = newest.get(row.device_id) or self._last.get(row.device_id)
+                if not self._spaced(last, row.recorded_at, interval):
+                    self.dropped += 1
+                    continue
+                newest[row.device_id] = row.recorded_at
+            kept.append(row)
+        return kept
+
+    def record(self, rows: list[TelemetryRow]) -> None:
+        """Record stored rows as accepted (newest recorded_at per device)."""
+        for row in rows:
+            last = self._last.get(row.device_id)
+            if last is None or row.recorded_at > last:
+                self._last[row.device_id] = row.recorded_at
+            self._last.move_to_end(row.device_id)
+        while len(self._last) > self.max_devices:
+            self._last.popitem(last=False)
+        self.accepted += len(rows)
+
+    @staticmethod
+    def _spaced(last: datetime | None, recorded_at: datetime, interval: float) -> bool:
+        return last is None or recorded_at >= last + timedelta(seconds=interval)
+
+    def forget(self, device_id: int) -> None:
+        self._last.pop(device_id, None)
+
+
+plan_intervals = PlanIntervalCache(ttl_seconds=settings.ingest.plan_cache_ttl_seconds)
+rate_limiter = SampleRateLimiter(max_devices=settings.ingest.rate_limit_max_devices)
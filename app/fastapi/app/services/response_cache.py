@@ -0,0 +1,92 @@
+# app/services/response_cache.py
+"""
+Pre-serialized responses for rarely changing reference data.
+
+Entries hold the JSON body as bytes plus a strong ETag, so a hit costs no
+DB round trip and no serialization; a request whose If-None-Match matches
+gets an empty 304. Responses carry `Cache-Control: no-cache`: clients may
+keep the body but revalidate every time, so they see changes as soon as the
+cache does.
+
+Entries expire after `ttl_seconds` and the whole cache is dropped by NOTIFY
+on PLAN_CHANNEL (trg_plan_notify_changed, 08_tb_plan.sql) and whenever the
+listener reconnects. A build that started before an invalidation is not
+stored (generation check), so a concurrent NOTIFY cannot be overwritten by
+the stale rows it invalidated.
+"""
+import hashlib
+import time
+from typing import Any, NamedTuple
+
+from fastapi import Request
+from fastapi.responses import Response
+from pydantic_core import to_json
+
+from ..config.setting import settings
+
+PLAN_CHANNEL = "plan_changed"
+
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    etag: str
+    expires_at: float
+
+    def response(self, request: Request) -> Response:
+        headers = {"ETag": self.etag, "Cache-Control": "no-cache"}
+        if _etag_matches(request.headers.get("if-none-match"), self.etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=self.body, media_type="application/json", headers=headers)
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+
+class ResponseCache:
+    def __init__(self, ttl_seconds: float) -> None:
+        self.ttl_seconds = ttl_seconds
+        self._entries: dict[str, CachedResponse] = {}
+        # bumped by every invalidation; see put()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> CachedResponse | None:
+        entry = self._entries.get(key)
+        if entry is None or entry.expires_at < time.monotonic():
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry
+
+    def put(self, key: str, content: Any, generation: int | None = None) -> CachedResponse:
+        """
+        Serialize `content` (models, dicts, lists) and cache it under `key`.
+
+        Pass the `generation` read before loading the data: if the cache was
+        invalidated meanwhile, the entry is returned but not stored.
+        """
+        body = to_json(content)
+        entry = CachedResponse(
+            body=body,
+            etag=f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"',
+            expires_at=time.monotonic() + self.ttl_seconds,
+        )
+        if generation is None or generation == self.generation:
+            self._entries[key] = entry
+        return entry
+
+    def clear(self) -> None:
+        self.generation += 1
+        self._entries.clear()
+
+    def on_notify(self, payload: str) -> None:
+        """NOTIFY callback: any change to the reference tables drops everything."""
+        self.clear()
+
+
+reference_cache = ResponseCache(ttl_seconds=settings.cache.reference_ttl_seconds)
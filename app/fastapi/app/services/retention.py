@@ -0,0 +1,200 @@
+# app/services/retention.py
+"""
+Per-plan telemetry retention.
+
+Partitions are shared by every account, so dropping a partition (see
+services.partitions) only enforces the longest plan.retention_days. This
+worker enforces each account's own plan: every `retention.interval_seconds`
+it resolves account -> subscription -> plan.retention_days and deletes that
+account's telemetry older than now() - retention_days.
+
+Deletes are bounded and throttled so the purge never competes with ingest:
+- each statement deletes at most `batch_size` rows, found through
+  idx_device_telemetry_device_time, and commits on its own
+- `pause_ms` sleep between statements
+- at most `max_rows_per_run` rows per run; the rest waits for the next run
+
+One worker at a time (advisory lock). Off unless RETENTION__ENABLED=true.
+Progress is exposed on GET /health/retention and as
+telemetry_retention_* metrics on GET /metrics.
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import bindparam, delete, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from ..config.setting import settings
+from ..db.database import engine
+from ..db.locks import advisory_lock
+from ..models.device import Device
+from ..models.device_telemetry import DeviceTelemetry
+from ..models.plan import Plan
+from ..models.subscription import Subscription
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+LOCK_NAME = "device_telemetry_retention"
+
+# Oldest rows of one account, LIMIT :batch_size, deleted by primary key
+_expired = (
+    select(DeviceTelemetry.id, DeviceTelemetry.recorded_at)
+    .join(Device, Device.id == DeviceTelemetry.device_id)
+    .where(Device.account_id == bindparam("account_id"))
+    .where(DeviceTelemetry.recorded_at < bindparam("cutoff"))
+    .limit(bindparam("batch_size"))
+)
+_PURGE_BATCH = delete(DeviceTelemetry).where(
+    tuple_(DeviceTelemetry.id, DeviceTelemetry.recorded_at).in_(_expired)
+)
+
+_ACCOUNT_RETENTION = (
+    select(Subscription.account_id, Plan.retention_days)
+    .join(Plan, Plan.code == Subscription.plan_code)
+    .order_by(Subscription.account_id)
+)
+
+
+class RetentionWorker:
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        interval_seconds: float,
+        batch_size: int,
+        pause_seconds: float,
+        max_rows_per_run: int,
+    ) -> None:
+        self._engine = engine
+        self.interval_seconds = interval_seconds
+        self.batch_size = batch_size
+        self.pause_seconds = pause_seconds
+        self.max_rows_per_run = max_rows_per_run
+
+        self._task: asyncio.Task | None = None
+
+        # counters / progress
+        self.runs = 0
+        self.failed_runs = 0
+        self.rows_purged = 0
+        self.statements = 0
+        self.current_account_id: int | None = None
+        self.last_run_started_at: datetime | None = None
+        self.last_run_seconds: float | None = None
+        self.last_run_rows = 0
+        self.last_run_complete: bool | None = None   # False: hit max_rows_per_run
+
+    def stats(self) -> dict:
+        return {
+            "running": self._task is not None,
+            "runs": self.runs,
+            "failed_runs": self.failed_runs,
+            "rows_purged": self.rows_purged,
+            "statements": self.statements,
+            "current_account_id": self.current_account_id,
+            "last_run_started_at": self.last_run_started_at,
+            "last_run_seconds": self.last_run_seconds,
+            "last_run_rows": self.last_run_rows,
+            "last_run_complete": self.last_run_complete,
+        }
+
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run(), name="telemetry-retention")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self.current_account_id = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception:
+                logger.exception("Telemetry retention run failed")
+                self.failed_runs += 1
+                metrics.retention_failed_runs.inc()
+            await asyncio.sleep(self.interval_seconds)
+
+    async def run_once(self) -> None:
+        async with self._engine.connect() as conn:
+            async with advisory_lock(conn, LOCK_NAME) as locked:
+                if not locked:
+                    return          # another worker is on it
+                await self._purge(conn)
+
+    async def _purge(self, conn: AsyncConnection) -> None:
+        started = time.perf_counter()
+        self.last_run_started_at = datetime.now(timezone.utc)
+        self.last_run_rows = 0
+        self.last_run_complete = False
+
+        result = await conn.execute(_ACCOUNT_RETENTION)
+        policies = result.all()
+        await conn.commit()
+
+        budget = self.max_rows_per_run
+        try:
+            for account_id, retention_days in policies:
+                self.current_account_id = account_id
+                cutoff = datetime.now(timezone.utc) - timedelta(days=retention_days)
+                while budget > 0:
+                    deleted = await self._purge_batch(
+                        conn, account_id, cutoff, min(self.batch_size, budget)
+                    )
+                    budget -= deleted
+                    if deleted < self.batch_size:
+                        break
+                    await asyncio.sleep(self.pause_seconds)
+                if budget <= 0:
+                    logger.info(
+                        "Retention run stopped at max_rows_per_run=%d (account %d)",
+                        self.max_rows_per_run,
+                        account_id,
+                    )
+                    return
+            self.last_run_complete = True
+        finally:
+            self.current_account_id = None
+            self.runs += 1
+            self.last_run_seconds = time.perf_counter() - started
+            metrics.retention_runs.labels(str(self.last_run_complete).lower()).inc()
+            metrics.retention_last_run_seconds.set(self.last_run_seconds)
+            metrics.retention_last_run_timestamp.set_to_current_time()
+
+    async def _purge_batch(
+        self,
+        conn: AsyncConnection,
+        account_id: int,
+        cutoff: datetime,
+        limit: int,
+    ) -> int:
+        result = await conn.execute(
+            _PURGE_BATCH,
+            {"account_id": account_id, "cutoff": cutoff, "batch_size": limit},
+        )
+        await conn.commit()
+        self.statements += 1
+        self.rows_purged += result.rowcount
+        self.last_run_rows += result.rowcount
+        metrics.retention_rows_purged.inc(result.rowcount)
+        return result.rowcount
+
+
+retention_worker = RetentionWorker(
+    engine,
+    interval_seconds=settings.retention.interval_seconds,
+    batch_size=settings.retention.batch_size,
+    pause_seconds=settings.retention.pause_ms / 1000,
+    max_rows_per_run=settings.retention.max_rows_per_run,
+)
@@ -0,0 +1,370 @@
+# app/services/telemetry_ingest.py
+"""
+Set-based telemetry ingestion.
+
+Rows are written straight into db_schema.device_telemetry without building
+DeviceTelemetry ORM objects, using one of two strategies
+(settings.ingest.batch_strategy):
+
+- copy:   asyncpg binary COPY (copy_records_to_table)
+- unnest: a single INSERT ... SELECT FROM unnest(...) statement
+
+With LIVE__ENABLED, the newest point per device is also NOTIFYed to live
+subscribers (services.live) inside the same transaction.
+"""
+import json
+from collections.abc import Callable
+from datetime import datetime, timezone
+from typing import NamedTuple
+
+from pydantic_core import to_json
+from sqlalchemy import (
+    BigInteger,
+    DateTime,
+    Float,
+    Text,
+    any_,
+    bindparam,
+    column,
+    event,
+    or_,
+    select,
+    text,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from ..config.setting import settings
+from ..models.device import Device
+from ..models.device_latest import DeviceLatest
+from ..models.device_telemetry import DeviceTelemetry
+from ..schemas.device_telemetry import TelemetryBase, TelemetryCreate
+from .live import LIVE_CHANNEL
+
+TELEMETRY_TABLE = DeviceTelemetry.__table__
+TELEMETRY_COLUMNS = ("device_id", "recorded_at", "x_coord", "y_coord", "meta")
+
+_UNNEST_INSERT = text(
+    f"""
+    INSERT INTO {TELEMETRY_TABLE.schema}.{TELEMETRY_TABLE.name}
+        ({", ".join(TELEMETRY_COLUMNS)})
+    SELECT * FROM unnest(:device_id, :recorded_at, :x_coord, :y_coord, :meta)
+    """
+).bindparams(
+    # typed binds: the asyncpg dialect renders $n::TYPE[] casts
+    bindparam("device_id", type_=ARRAY(BigInteger)),
+    bindparam("recorded_at", type_=ARRAY(DateTime(timezone=True))),
+    bindparam("x_coord", type_=ARRAY(Float)),
+    bindparam("y_coord", type_=ARRAY(Float)),
+    bindparam("meta", type_=ARRAY(JSONB)),
+)
+
+
+# One NOTIFY per device: the point is encoded in Python (same JSON as the
+# REST responses) and account_id is spliced in front for account subscriptions
+_LIVE_NOTIFY = text(
+    f"""
+    SELECT pg_notify(:channel, '{{"account_id":' || d.account_id || ',' || substr(p.point, 2))
+    FROM unnest(:device_id, :point) AS p(device_id, point)
+    JOIN {Device.__table__.schema}.{Device.__table__.name} AS d ON d.id = p.device_id
+    """
+).bindparams(
+    bindparam("device_id", type_=ARRAY(BigInteger)),
+    bindparam("point", type_=ARRAY(Text)),
+)
+
+
+class TelemetryRow(NamedTuple):
+    """One telemetry point, in device_telemetry column order."""
+    device_id: int
+    recorded_at: datetime
+    x_coord: float
+    y_coord: float
+    meta: dict | None
+
+
+# Optional in-memory sink for the newest point per device. When set (see
+# services.latest_state), device_latest / last_seen_at writes are handed to
+# it instead of being issued in the ingest transaction, once that
+# transaction has committed (rows of a rolled back one are never offered).
+LatestSink = Callable[[list[TelemetryRow]], None]
+_latest_sink: LatestSink | None = None
+
+# session.info key: rows waiting for the session's commit
+_PENDING_LATEST = "pending_latest"
+
+
+def set_latest_sink(sink: LatestSink | None) -> None:
+    global _latest_sink
+    _latest_sink = sink
+
+
+@event.listens_for(Session, "after_commit")
+def _offer_committed_latest(session: Session) -> None:
+    latest = session.info.pop(_PENDING_LATEST, None)
+    if latest and _latest_sink is not None:
+        _latest_sink(latest)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _drop_pending_latest(session: Session, previous_transaction) -> None:
+    session.info.pop(_PENDING_LATEST, None)
+
+
+def build_rows(
+    points: list[TelemetryBase] | list[TelemetryCreate],
+    now: datetime,
+    device_id: int | None = None,
+) -> list[TelemetryRow]:
+    """
+    Turn validated points into insert rows.
+
+    - `device_id` set: every point belongs to that device (single-device batch)
+    - `device_id` None: each point carries its own `device_id` (bulk)
+
+    Points without `recorded_at` are stamped with `now`.
+    """
+    return [
+        TelemetryRow(
+            device_id if device_id is not None else p.device_id,
+            p.recorded_at or now,
+            p.x_coord,
+            p.y_coord,
+            p.meta,
+        )
+        for p in points
+    ]
+
+
+def fold_latest(rows: list[TelemetryRow]) -> list[TelemetryRow]:
+    """
+    Fold rows down to the newest row per device (first one wins on ties).
+
+    Returned in device_id order so concurrent multi-row upserts lock
+    device_latest / device rows in a consistent order.
+    """
+    newest: dict[int, TelemetryRow] = {}
+    for row in rows:
+        current = newest.get(row.device_id)
+        if current is None or row.recorded_at > current.recorded_at:
+            newest[row.device_id] = row
+    return [newest[device_id] for device_id in sorted(newest)]
+
+
+async def ingest_rows(db: AsyncSession, rows: list[TelemetryRow]) -> None:
+    """
+    Write a set of telemetry rows (any number of devices):
+
+    - one multi-row device_latest upsert for the newest point per device
+    - one multi-row device.last_seen_at update
+    - one COPY / unnest insert into device_telemetry
+
+    The caller validates device IDs and commits.
+    """
+    if not rows:
+        return
+
+    await apply_latest(db, fold_latest(rows))
+    await write_telemetry_rows(db, rows)
+
+
+async def apply_latest(db: AsyncSession, latest: list[TelemetryRow]) -> None:
+    """
+    Record the newest point per device (`latest` holds one row per device):
+    hand it to the latest-state sink after `db` commits if a sink is set,
+    otherwise upsert device_latest and update device.last_seen_at in this
+    transaction.
+    """
+    if settings.live.enabled:
+        await notify_live(db, latest)
+
+    if _latest_sink is not None:
+        db.info.setdefault(_PENDING_LATEST, []).extend(latest)
+        return
+
+    await upsert_device_latest(db, latest)
+    await touch_last_seen(db, latest)
+
+
+async def notify_live(db: AsyncSession, latest: list[TelemetryRow]) -> None:
+    """
+    NOTIFY LIVE_CHANNEL with each row (one per device); Postgres delivers
+    the notifications when, and only if, the transaction commits.
+    """
+    if not latest:
+        return
+    await db.execute(
+        _LIVE_NOTIFY,
+        {
+            "channel": LIVE_CHANNEL,
+            "device_id": [row.device_id for row in latest],
+            "point": [live_point(row) for row in latest],
+        },
+    )
+
+
+def live_point(row: TelemetryRow) -> str:
+    """
+    One point as a JSON object shaped like the REST responses: recorded_at
+    in UTC with a Z, coordinates as floats. Larger meta than
+    LIVE__META_MAX_BYTES is sent as null (NOTIFY payloads max 8000 bytes).
+    """
+    recorded_at = row.recorded_at
+    if recorded_at.tzinfo is None:
+        recorded_at = recorded_at.replace(tzinfo=timezone.utc)
+    meta = row.meta
+    if meta is not None and len(to_json(meta)) > settings.live.meta_max_bytes:
+        meta = None
+    return to_json(
+        {
+            "device_id": row.device_id,
+            "recorded_at": recorded_at.astimezone(timezone.utc),
+            "x_coord": float(row.x_coord),
+            "y_coord": float(row.y_coord),
+            "meta": meta,
+        }
+    ).decode()
+
+
+async def write_telemetry_rows(
+    db: AsyncSession,
+    rows: list[TelemetryRow],
+) -> None:
+    """
+    Insert rows into device_telemetry inside the session's transaction.
+
+    Nothing is flushed through the ORM unit of work; the caller commits.
+    """
+    if not rows:
+        return
+
+    if settings.ingest.batch_strategy == "copy":
+        await _copy_rows(db, rows)
+    else:
+        await _unnest_rows(db, rows)
+
+
+async def _copy_rows(db: AsyncSession, rows: list[TelemetryRow]) -> None:
+    conn = await db.connection()
+    raw = await conn.get_raw_connection()
+    driver = raw.driver_connection
+
+    if not driver.is_in_transaction():
+        # The asyncpg adapter opens its transaction lazily on the first
+        # statement; start it so COPY joins the session's transaction.
+        await conn.execute(text("SELECT 1"))
+
+    # SQLAlchemy registers a jsonb codec that expects serialized JSON text
+    records = [
+        (
+            r.device_id,
+            r.recorded_at,
+            r.x_coord,
+            r.y_coord,
+            json.dumps(r.meta) if r.meta is not None else None,
+        )
+        for r in rows
+    ]
+    await driver.copy_records_to_table(
+        TELEMETRY_TABLE.name,
+        schema_name=TELEMETRY_TABLE.schema,
+        columns=TELEMETRY_COLUMNS,
+        records=records,
+    )
+
+
+async def _unnest_rows(db: AsyncSession, rows: list[TelemetryRow]) -> None:
+    device_ids, recorded_ats, xs, ys, metas = zip(*rows)
+    await db.execute(
+        _UNNEST_INSERT,
+        {
+            "device_id": list(device_ids),
+            "recorded_at": list(recorded_ats),
+            "x_coord": list(xs),
+            "y_coord": list(ys),
+            "meta": list(metas),
+        },
+    )
+
+
+async def upsert_device_latest(
+    db: AsyncSession,
+    rows: list[TelemetryRow],
+) -> None:
+    """
+    Multi-row upsert into device_latest (one row per device):
+    - Insert new row if none exists
+    - Update only if this telemetry is newer than existing recorded_at
+    """
+    stmt = pg_insert(DeviceLatest).values(
+        [
+            {
+                "device_id": r.device_id,
+                "recorded_at": r.recorded_at,
+                "x_coord": r.x_coord,
+                "y_coord": r.y_coord,
+                "meta": r.meta or {},
+            }
+            for r in rows
+        ]
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DeviceLatest.device_id],
+        set_={
+            "recorded_at": stmt.excluded.recorded_at,
+            "x_coord": stmt.excluded.x_coord,
+            "y_coord": stmt.excluded.y_coord,
+            "meta": stmt.excluded.meta,
+        },
+        where=DeviceLatest.recorded_at < stmt.excluded.recorded_at,
+    )
+    await db.execute(stmt)
+
+
+async def touch_last_seen(
+    db: AsyncSession,
+    rows: list[TelemetryRow],
+    only_newer: bool = False,
+) -> None:
+    """
+    Update device.last_seen_at for every row's device in one statement.
+
+    With `only_newer`, never move last_seen_at backwards (same guard as the
+    device_latest upsert).
+    """
+    seen = values(
+        column("device_id", BigInteger),
+        column("seen_at", DateTime(timezone=True)),
+        name="seen",
+    ).data([(r.device_id, r.recorded_at) for r in rows])
+
+    # no session sync: the ORM would otherwise add RETURNING device.id
+    stmt = (
+        update(Device)
+        .where(Device.id == seen.c.device_id)
+        .values(last_seen_at=seen.c.seen_at)
+        .execution_options(synchronize_session=False)
+    )
+    if only_newer:
+        stmt = stmt.where(
+            or_(
+                Device.last_seen_at.is_(None),
+                Device.last_seen_at < seen.c.seen_at,
+            )
+        )
+    await db.execute(stmt)
+
+
+async def existing_device_ids(db: AsyncSession, rows: list[TelemetryRow]) -> set[int]:
+    """Ids of the rows' devices that still exist (they may be deleted after validation)."""
+    ids = list({row.device_id for row in rows})
+    result = await db.execute(
+        select(Device.id).where(
+            Device.id == any_(bindparam("ids", ids, type_=ARRAY(BigInteger)))
+        )
+    )
+    return set(result.scalars().all())
@@ -0,0 +1,234 @@
+# app/services/write_behind.py
+"""
+Write-behind buffer for single-point telemetry.
+
+POST /telemetry validates the device, then queues the point here instead of
+committing its own transaction. A background task flushes the queue every
+`write_behind_flush_ms` or as soon as `write_behind_max_batch` points are
+waiting, as one set-based transaction (services.telemetry_ingest.ingest_rows).
+
+Durability (settings.ingest.write_behind_ack):
+- flush:   submit() returns after the point's batch has committed;
+           a failed flush is raised to the waiting request
+- enqueue: submit() returns once the point is queued; points still in the
+           queue are lost if the worker crashes (at-most-once)
+
+Backpressure: the queue holds at most `write_behind_max_queue` points;
+submit() waits up to `write_behind_enqueue_timeout_seconds` for space and
+then raises BufferFull. stop() rejects new points and drains the queue.
+
+A point whose device was deleted after validation fails only its own
+request: the batch is retried without the rows of missing devices.
+"""
+import asyncio
+import logging
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from ..config.setting import settings
+from ..db.database import async_session_maker
+from .telemetry_ingest import TelemetryRow, existing_device_ids, ingest_rows
+
+logger = logging.getLogger(__name__)
+
+# queue item: (row, future resolved on commit or None for ack-on-enqueue)
+_Item = tuple[TelemetryRow, asyncio.Future | None]
+_STOP = object()
+
+
+class BufferFull(Exception):
+    """The buffer is full (or shutting down); the client should retry."""
+
+
+class TelemetryWriteBuffer:
+    def __init__(
+        self,
+        session_maker: async_sessionmaker[AsyncSession],
+        flush_interval_seconds: float,
+        max_batch: int,
+        max_queue: int,
+        enqueue_timeout_seconds: float,
+    ) -> None:
+        self._session_maker = session_maker
+        self.flush_interval_seconds = flush_interval_seconds
+        self.max_batch = max_batch
+        self.max_queue = max_queue
+        self.enqueue_timeout_seconds = enqueue_timeout_seconds
+
+        self._queue: asyncio.Queue | None = None
+        self._batch_ready: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+        self._closing = False
+
+        # counters
+        self.enqueued = 0
+        self.flushed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.batches = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._closing
+
+    def qsize(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._batch_ready = asyncio.Event()
+        self._closing = False
+        self._task = asyncio.create_task(self._run(), name="telemetry-write-behind")
+
+    async def stop(self) -> None:
+        """Reject new points, flush everything queued, stop the task."""
+        if self._task is None:
+            return
+        self._closing = True
+        await self._queue.put(_STOP)
+        self._batch_ready.set()
+        await self._task
+        self._task = None
+        self._reject_queued()
+
+    async def submit(self, row: TelemetryRow, wait_for_flush: bool) -> None:
+        """
+        Queue one row.
+
+        Raises BufferFull when no space frees up within the enqueue timeout;
+        with `wait_for_flush`, re-raises the flush error if the batch fails.
+        """
+        if not self.running:
+            self.rejected += 1
+            raise BufferFull("telemetry buffer is not accepting points")
+
+        future = asyncio.get_running_loop().create_future() if wait_for_flush else None
+        try:
+            await asyncio.wait_for(
+                self._queue.put((row, future)),
+                timeout=self.enqueue_timeout_seconds or None,
+            )
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise BufferFull("telemetry buffer is full") from None
+
+        self.enqueued += 1
+        if self._task is None:
+            # stop() finished while this put was waiting: nothing will flush it
+            self._reject_queued()
+            if future is None:
+                raise BufferFull("telemetry buffer is not accepting points")
+        elif self._queue.qsize() >= self.max_batch:
+            self._batch_ready.set()
+
+        if future is not None:
+            await future
+
+    async def _run(self) -> None:
+        while True:
+            first = await self._queue.get()
+            if first is _STOP:
+                await self._drain()
+                return
+
+            # Wait for the interval, or less if a full batch is waiting
+            try:
+                await asyncio.wait_for(
+                    self._batch_ready.wait(), self.flush_interval_seconds
+                )
+            except asyncio.TimeoutError:
+                pass
+            self._batch_ready.clear()
+
+            batch: list[_Item] = [first]
+            stop = False
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+
+            await self._flush(batch)
+            if stop:
+                await self._drain()
+                return
+
+    async def _drain(self) -> None:
+        batch: list[_Item] = []
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is _STOP:
+                continue
+            batch.append(item)
+            if len(batch) >= self.max_batch:
+                await self._flush(batch)
+                batch = []
+        if batch:
+            await self._flush(batch)
+
+    def _reject_queued(self) -> None:
+        """Fail the points left in the queue once the task has stopped."""
+        rejected: list[_Item] = []
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is not _STOP:
+                rejected.append(item)
+        self._fail(rejected, BufferFull("telemetry buffer stopped"))
+
+    async def _flush(self, batch: list[_Item]) -> None:
+        try:
+            async with self._session_maker() as db:
+                try:
+                    await self._write(db, batch)
+                except IntegrityError as exc:
+                    # A device was deleted after its points were accepted:
+                    # fail those points only and retry the rest
+                    await db.rollback()
+                    existing = await existing_device_ids(db, [row for row, _ in batch])
+                    missing = [item for item in batch if item[0].device_id not in existing]
+                    if not missing:
+                        raise
+                    logger.warning(
+                        "Write-behind dropped %d points of deleted devices", len(missing)
+                    )
+                    self._fail(missing, exc)
+                    batch = [item for item in batch if item[0].device_id in existing]
+                    await self._write(db, batch)
+        except Exception as exc:
+            logger.exception("Write-behind flush of %d points failed", len(batch))
+            self._fail(batch, exc)
+            return
+
+        self.flushed += len(batch)
+        self.batches += 1
+        for _, future in batch:
+            if future is not None and not future.done():
+                future.set_result(None)
+
+    @staticmethod
+    async def _write(db: AsyncSession, batch: list[_Item]) -> None:
+        if batch:
+            await ingest_rows(db, [row for row, _ in batch])
+        await db.commit()
+
+    def _fail(self, items: list[_Item], exc: Exception) -> None:
+        self.failed += len(items)
+        for _, future in items:
+            if future is not None and not future.done():
+                future.set_exception(exc)
+
+
+write_buffer = TelemetryWriteBuffer(
+    async_session_maker,
+    flush_interval_seconds=settings.ingest.write_behind_flush_ms / 1000,
+    max_batch=settings.ingest.write_behind_max_batch,
+    max_queue=settings.ingest.write_behind_max_queue,
+    enqueue_timeout_seconds=settings.ingest.write_behind_enqueue_timeout_seconds,
+)
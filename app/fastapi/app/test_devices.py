@@ -0,0 +1,84 @@
+# app/test_devices.py
+"""
+POST /devices against a live database (settings.database); skipped when the
+database is not reachable.
+"""
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import delete, select
+
+from .main import app
+from .db.database import engine
+from .models.device import Device
+from .models.plan import Plan
+from .models.subscription import Subscription
+
+
+@pytest.fixture(scope="module")
+def client():
+    """TestClient fixture (one event loop for the whole module)"""
+    with TestClient(app) as c:
+        if c.get("/health/db").status_code != 200:
+            pytest.skip("database not reachable")
+        yield c
+
+
+def _run(client, fn, *args):
+    """Run an async DB helper on the TestClient's event loop."""
+    return client.portal.call(fn, *args)
+
+
+async def _smallest_quota_account() -> tuple[int, int] | None:
+    stmt = (
+        select(Subscription.account_id, Plan.max_devices)
+        .join(Plan, Plan.code == Subscription.plan_code)
+        .order_by(Plan.max_devices)
+        .limit(1)
+    )
+    async with engine.connect() as conn:
+        row = (await conn.execute(stmt)).first()
+    return tuple(row) if row is not None else None
+
+
+async def _delete_devices(ids: list[int]) -> None:
+    async with engine.begin() as conn:
+        await conn.execute(delete(Device).where(Device.id.in_(ids)))
+
+
+def test_create_device_until_quota(client):
+    target = _run(client, _smallest_quota_account)
+    if target is None:
+        pytest.skip("no subscribed account in database")
+    account_id, max_devices = target
+
+    prefix = f"test-quota-{uuid.uuid4().hex[:8]}"
+    created: list[int] = []
+    try:
+        # the account may already hold devices: stop at the first refusal
+        for i in range(max_devices + 1):
+            response = client.post(
+                "/devices",
+                json={"account_id": account_id, "name": f"{prefix}-{i}", "type": "tracker"},
+            )
+            if response.status_code != 201:
+                break
+            device = response.json()
+            assert device["created_at"] is not None
+            assert device["updated_at"] is not None
+            created.append(device["id"])
+
+            if i == 0:
+                # name clash is a 409, not a quota / generic error
+                duplicate = client.post(
+                    "/devices",
+                    json={"account_id": account_id, "name": f"{prefix}-0", "type": "tracker"},
+                )
+                assert duplicate.status_code in (403, 409), duplicate.text
+
+        assert response.status_code == 403, response.text
+        assert response.json()["detail"]["max_devices"] == max_devices
+    finally:
+        if created:
+            _run(client, _delete_devices, created)
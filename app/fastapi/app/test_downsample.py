@@ -0,0 +1,25 @@
+import pytest
+
+from .services.downsample import lttb
+
+
+def test_lttb_keeps_everything_under_threshold():
+    assert lttb([0, 1, 2], [0, 1, 0], 10) == [0, 1, 2]
+
+
+def test_lttb_keeps_endpoints_and_peak():
+    xs = list(range(100))
+    ys = [0.0] * 100
+    ys[37] = 50.0
+
+    kept = lttb(xs, ys, 10)
+
+    assert len(kept) == 10
+    assert kept[0] == 0 and kept[-1] == 99
+    assert kept == sorted(set(kept))
+    assert 37 in kept
+
+
+def test_lttb_rejects_mismatched_lengths():
+    with pytest.raises(ValueError):
+        lttb([0, 1], [0], 2)
@@ -0,0 +1,84 @@
+import math
+import random
+
+from .services.fleet_snapshot import FleetIndex
+
+
+def brute_force(points, x, y, k, radius=None, account_id=None):
+    hits = sorted(
+        (math.hypot(px - x, py - y), device_id)
+        for device_id, (account, px, py) in points.items()
+        if account_id is None or account == account_id
+    )
+    if radius is not None:
+        hits = [hit for hit in hits if hit[0] <= radius]
+    return hits[:k]
+
+
+def build(n=2000, cell_size=25.0, seed=7):
+    rng = random.Random(seed)
+    index = FleetIndex(cell_size=cell_size, max_devices=n)
+    points = {}
+    for device_id in range(1, n + 1):
+        point = (device_id % 5, rng.uniform(0, 1000), rng.uniform(0, 1000))
+        points[device_id] = point
+        index.upsert(device_id, point[0], point[1], point[2], recorded_at=0)
+    return index, points
+
+
+def ids(index, hits):
+    return [(round(d, 9), index.row(slot)["device_id"]) for d, slot in hits]
+
+
+def test_nearest_matches_brute_force():
+    index, points = build()
+    rng = random.Random(1)
+    for _ in range(50):
+        # include query points outside the occupied area
+        x, y = rng.uniform(-500, 1500), rng.uniform(-500, 1500)
+        k = rng.choice([1, 10, 50])
+        expected = [(round(d, 9), i) for d, i in brute_force(points, x, y, k)]
+        assert ids(index, index.nearest(x, y, k)) == expected
+
+
+def test_radius_and_account_filters():
+    index, points = build()
+    expected = brute_force(points, 500, 500, 1000, radius=60, account_id=3)
+    hits = index.nearest(500, 500, 1000, radius=60, account_id=3)
+
+    assert [(round(d, 9), i) for d, i in expected] == ids(index, hits)
+    assert all(d <= 60 for d, _ in hits)
+
+
+def test_upsert_moves_device_between_cells():
+    index = FleetIndex(cell_size=10, max_devices=10)
+    index.upsert(1, 1, 5, 5, recorded_at=100)
+    index.upsert(1, 1, 95, 95, recorded_at=200)
+    # an older position (overlap re-read) does not move it back
+    index.upsert(1, 1, 5, 5, recorded_at=150)
+
+    assert len(index) == 1
+    assert index.cell_count() == 1
+    (distance, slot), = index.nearest(100, 100, 5)
+    assert index.row(slot)["x_coord"] == 95
+    assert distance == math.hypot(5, 5)
+
+
+def test_max_age_filter():
+    index = FleetIndex(cell_size=10, max_devices=10)
+    index.upsert(1, 1, 0, 0, recorded_at=100)
+    index.upsert(2, 1, 1, 1, recorded_at=200)
+
+    hits = index.nearest(0, 0, 5, min_recorded_at=150)
+    assert [index.row(slot)["device_id"] for _, slot in hits] == [2]
+
+
+def test_capacity_bounded():
+    index = FleetIndex(cell_size=10, max_devices=2)
+    assert index.upsert(1, 1, 0, 0, recorded_at=0)
+    assert index.upsert(2, 1, 0, 0, recorded_at=0)
+    assert not index.upsert(3, 1, 0, 0, recorded_at=0)
+
+    assert len(index) == 2
+    assert index.overflow == 1
+    assert index.memory_bytes() > 0
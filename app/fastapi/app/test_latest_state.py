@@ -0,0 +1,103 @@
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .services import telemetry_ingest
+from .services.latest_state import LatestStateAggregator
+from .services.telemetry_ingest import TelemetryRow, ingest_rows, set_latest_sink
+
+T0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def offered():
+    received: list[TelemetryRow] = []
+    set_latest_sink(received.extend)
+    yield received
+    set_latest_sink(None)
+
+
+def _session() -> AsyncSession:
+    db = AsyncSession()
+    # sync SQLite bind: enough for a real transaction to commit or roll back
+    db.sync_session.bind = create_engine("sqlite://")
+    return db
+
+
+def test_failed_write_offers_nothing(offered, monkeypatch):
+    async def failing_write(db, rows):
+        db.sync_session.execute(text("SELECT 1"))     # transaction begun
+        raise RuntimeError("COPY failed")
+
+    monkeypatch.setattr(telemetry_ingest, "write_telemetry_rows", failing_write)
+    db = _session()
+    rows = [TelemetryRow(1, T0, 1.0, 2.0, None)]
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(ingest_rows(db, rows))
+    assert offered == []
+
+    db.sync_session.rollback()
+    db.sync_session.execute(text("SELECT 1"))
+    db.sync_session.commit()
+    assert offered == []
+
+
+def test_latest_offered_after_commit(offered, monkeypatch):
+    async def write(db, rows):
+        pass
+
+    monkeypatch.setattr(telemetry_ingest, "write_telemetry_rows", write)
+    db = _session()
+    rows = [TelemetryRow(1, T0, 1.0, 2.0, None)]
+
+    asyncio.run(ingest_rows(db, rows))
+    assert offered == []            # not before the commit
+
+    db.sync_session.execute(text("SELECT 1"))
+    db.sync_session.commit()
+    assert offered == rows
+
+
+class _FailingSession:
+    def __init__(self, exc: Exception) -> None:
+        self.exc = exc
+
+    async def __aenter__(self):
+        raise self.exc
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+def _aggregator(exc: Exception) -> LatestStateAggregator:
+    return LatestStateAggregator(
+        lambda: _FailingSession(exc),
+        flush_interval_seconds=1,
+        max_pending=100,
+        max_attempts=3,
+    )
+
+
+def test_permanent_flush_error_drops_batch():
+    aggregator = _aggregator(ValueError("bad row"))
+    aggregator.offer([TelemetryRow(1, T0, 1.0, 2.0, None)])
+
+    asyncio.run(aggregator.flush())
+    assert aggregator.pending == 0
+    assert (aggregator.failed_flushes, aggregator.dropped) == (1, 1)
+
+
+def test_transient_flush_error_retries_then_drops():
+    aggregator = _aggregator(ConnectionResetError("connection lost"))
+    aggregator.offer([TelemetryRow(1, T0, 1.0, 2.0, None)])
+
+    for _ in range(2):
+        asyncio.run(aggregator.flush())
+        assert aggregator.pending == 1          # merged back for a retry
+    asyncio.run(aggregator.flush())
+    assert aggregator.pending == 0
+    assert (aggregator.failed_flushes, aggregator.dropped) == (3, 1)
@@ -0,0 +1,78 @@
+import asyncio
+import json
+
+import pytest
+
+from .services.live import LiveHub, TooManySubscribers
+
+
+def point(device_id, account_id=1, x=0.0):
+    return json.dumps({"device_id": device_id, "account_id": account_id, "x_coord": x})
+
+
+def take(sub):
+    return asyncio.run(asyncio.wait_for(sub.next_batch(), timeout=1))
+
+
+def test_fan_out_by_device_and_account():
+    hub = LiveHub(max_subscribers=10, max_pending=10)
+    by_device = hub.subscribe(device_ids=[1])
+    by_account = hub.subscribe(account_id=2)
+
+    hub.on_notify(point(1, account_id=2))
+    hub.on_notify(point(3, account_id=2))
+    hub.on_notify(point(4, account_id=5))
+
+    assert [json.loads(p)["device_id"] for p in take(by_device)] == [1]
+    assert [json.loads(p)["device_id"] for p in take(by_account)] == [1, 3]
+
+
+def test_slow_consumer_conflates_and_drops():
+    hub = LiveHub(max_subscribers=10, max_pending=2)
+    sub = hub.subscribe(account_id=1)
+
+    hub.on_notify(point(1, x=1.0))
+    hub.on_notify(point(1, x=2.0))      # replaces the unsent point
+    hub.on_notify(point(2))
+    hub.on_notify(point(3))             # over max_pending devices
+
+    batch = [json.loads(p) for p in take(sub)]
+    assert [(p["device_id"], p["x_coord"]) for p in batch] == [(1, 2.0), (2, 0.0)]
+    assert (sub.conflated, sub.dropped, sub.delivered) == (1, 1, 2)
+
+
+def test_unsubscribe_and_limits():
+    hub = LiveHub(max_subscribers=1, max_pending=10)
+    sub = hub.subscribe(device_ids=[1], account_id=1)
+    with pytest.raises(TooManySubscribers):
+        hub.subscribe(device_ids=[2])
+
+    hub.unsubscribe(sub)
+    assert len(hub) == 0
+    hub.publish(1, 1, point(1))
+    assert not hub._by_device and not hub._by_account
+
+
+def test_malformed_payload_ignored():
+    hub = LiveHub(max_subscribers=10, max_pending=10)
+    hub.subscribe(device_ids=[1])
+    hub.on_notify("not json")
+    hub.on_notify('{"x": 1}')
+    assert hub.malformed == 2
+
+
+def test_live_point_matches_rest_shape():
+    from datetime import datetime, timedelta, timezone
+
+    from .services.telemetry_ingest import TelemetryRow, live_point
+
+    plus_two = timezone(timedelta(hours=2))
+    row = TelemetryRow(7, datetime(2025, 1, 1, 2, 0, tzinfo=plus_two), 9, 1.5, None)
+    assert json.loads(live_point(row)) == {
+        "device_id": 7,
+        "recorded_at": "2025-01-01T00:00:00Z",
+        "x_coord": 9.0,
+        "y_coord": 1.5,
+        "meta": None,
+    }
+    assert '"x_coord":9.0' in live_point(row)
@@ -9,7 +9,21 @@ def client():
     return TestClient(app)
 
 
-def test_read_main():
+def test_read_main(client):
     response = client.get("/")
     assert response.status_code == 200
-    # assert response.json() == {"msg": "Hello World"}
\ No newline at end of file
+    # assert response.json() == {"msg": "Hello World"}
+
+
+def test_read_main_etag(client):
+    first = client.get("/")
+    etag = first.headers["etag"]
+
+    second = client.get("/", headers={"If-None-Match": etag})
+    assert second.status_code == 304
+    assert second.headers["etag"] == etag
+    assert second.content == b""
+
+    stale = client.get("/", headers={"If-None-Match": '"stale"'})
+    assert stale.status_code == 200
+    assert stale.json() == first.json()
@@ -0,0 +1,100 @@
+from datetime import date
+
+from .services.partitions import (
+    Partition,
+    choose_granularity,
+    estimate_rows_per_day,
+    expired_partitions,
+    parse_partition,
+    plan_backfill,
+    plan_partitions,
+)
+
+
+def test_parse_partition_names():
+    assert parse_partition("device_telemetry_2026_02") == Partition(
+        "device_telemetry_2026_02", date(2026, 2, 1), date(2026, 3, 1)
+    )
+    assert parse_partition("device_telemetry_2026_12_31").end == date(2027, 1, 1)
+    assert parse_partition("device_telemetry_default") is None
+    assert parse_partition("device_telemetry_2026_13") is None
+
+
+def test_plan_monthly_continues_after_existing():
+    existing = [parse_partition("device_telemetry_2026_02")]
+    planned = plan_partitions(existing, date(2026, 2, 10), "monthly", premake=2)
+    assert [p.name for p in planned] == [
+        "device_telemetry_2026_03",
+        "device_telemetry_2026_04",
+    ]
+
+
+def test_plan_skips_past_gap_and_fills_days_to_month_boundary():
+    existing = [parse_partition("device_telemetry_2025_11")]
+    # daily partitions existed up to mid-month; monthly resumes on the 1st
+    existing.append(parse_partition("device_telemetry_2026_03_29"))
+    planned = plan_partitions(existing, date(2026, 3, 29), "monthly", premake=1)
+    assert [p.name for p in planned] == [
+        "device_telemetry_2026_03_30",
+        "device_telemetry_2026_03_31",
+        "device_telemetry_2026_04",
+    ]
+
+    planned = plan_partitions(
+        [parse_partition("device_telemetry_2025_11")], date(2026, 3, 5), "daily", premake=1
+    )
+    assert [p.name for p in planned] == [
+        "device_telemetry_2026_03_05",
+        "device_telemetry_2026_03_06",
+    ]
+
+
+def test_granularity_from_volume():
+    existing = [
+        parse_partition("device_telemetry_2026_01", rows=31 * 3_000_000),
+        parse_partition("device_telemetry_2026_02", rows=1_000),
+    ]
+    rate = estimate_rows_per_day(existing, date(2026, 2, 10))
+    assert rate == 3_000_000
+    assert choose_granularity("auto", rate, 2_000_000) == "daily"
+    assert choose_granularity("auto", rate, 5_000_000) == "monthly"
+    assert choose_granularity("monthly", rate, 1) == "monthly"
+
+
+def test_expired_partitions():
+    existing = [
+        parse_partition("device_telemetry_2025_11"),
+        parse_partition("device_telemetry_2025_12"),
+    ]
+    expired = expired_partitions(existing, date(2026, 1, 31), retention_days=60)
+    assert [p.name for p in expired] == ["device_telemetry_2025_11"]
+
+
+def test_backfill_covers_days_held_by_default():
+    # shipped partitions end at 2026-03; rows for Apr-Oct went to default
+    existing = [parse_partition("device_telemetry_2026_02")]
+    today = date(2026, 10, 17)
+    planned = plan_partitions(existing, today, "monthly", premake=1)
+    assert [p.name for p in planned] == [
+        "device_telemetry_2026_10",
+        "device_telemetry_2026_11",
+    ]
+
+    default_days = [date(2026, 4, 3), date(2026, 4, 20), date(2026, 9, 30), date(2026, 10, 2)]
+    backfill = plan_backfill(existing + planned, default_days, planned[0].start, "monthly")
+    # Oct rows move with the planned 2026_10 partition
+    assert [p.name for p in backfill] == [
+        "device_telemetry_2026_04",
+        "device_telemetry_2026_09",
+    ]
+
+
+def test_backfill_uses_days_next_to_existing_partitions():
+    existing = [parse_partition("device_telemetry_2026_03_01")]
+    backfill = plan_backfill(
+        existing,
+        [date(2026, 3, 1), date(2026, 3, 5)],   # 03_01 is covered already
+        date(2026, 4, 1),
+        "monthly",
+    )
+    assert [p.name for p in backfill] == ["device_telemetry_2026_03_05"]
@@ -0,0 +1,77 @@
+import logging
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from .db.stats import RequestDbStats, request_db_stats
+from .middleware.profiling import ProfilingMiddleware
+
+LAZY_LOAD = "SELECT plan.code FROM plan WHERE plan.code = $1::VARCHAR"
+
+
+def make_client(**kwargs) -> TestClient:
+    app = FastAPI()
+    app.add_middleware(ProfilingMiddleware, **kwargs)
+
+    @app.get("/items/{n}")
+    async def items(n: int):
+        # what the engine listeners would record for a list + n lazy loads
+        stats = request_db_stats.get()
+        stats.record("SELECT device.id FROM device", 0.002)
+        for _ in range(n):
+            stats.record(LAZY_LOAD, 0.001)
+        return {"n": n}
+
+    return TestClient(app)
+
+
+def test_record_profile():
+    stats = RequestDbStats(profile=True)
+    stats.record("a", 0.5)
+    stats.record("b", 0.1)
+    stats.record("b", 0.1)
+
+    assert stats.statements == 3
+    assert stats.slowest(1) == [("a", 1, 0.5)]
+    assert stats.repeated(2) == [("b", 2)]
+
+
+def test_record_without_profile_only_counts():
+    stats = RequestDbStats()
+    stats.record("a", 0.5)
+
+    assert stats.statements == 1
+    assert stats.seconds == 0.5
+    assert not stats.counts and not stats.timings
+
+
+def test_server_timing_header():
+    client = make_client(top_n=2)
+    response = client.get("/items/3")
+
+    timing = response.headers["server-timing"]
+    assert timing.startswith("app;dur=")
+    assert 'db;dur=5.0;desc="4 statements"' in timing
+    assert f'sql-1;dur=3.0;desc="3x {LAZY_LOAD}"' in timing
+    assert "sql-2;" in timing and "sql-3;" not in timing
+
+
+def test_sql_label_truncated():
+    client = make_client(sql_max_length=20)
+    timing = client.get("/items/1").headers["server-timing"]
+
+    assert 'desc="1x SELECT plan.code..."' in timing
+
+
+def test_n_plus_one_warning(caplog):
+    client = make_client(statement_budget=10, repeat_threshold=5)
+
+    with caplog.at_level(logging.WARNING, logger="app.middleware.profiling"):
+        client.get("/items/4")
+    assert not caplog.records
+
+    with caplog.at_level(logging.WARNING, logger="app.middleware.profiling"):
+        client.get("/items/12")
+    messages = [record.getMessage() for record in caplog.records]
+    assert "GET /items/{n}: 13 SQL statements (budget 10)" in messages[0]
+    assert "executed 12 times, possible N+1" in messages[1]
@@ -0,0 +1,198 @@
+# app/test_query_budget.py
+"""
+Query-budget regression benchmark.
+
+Counts SQL statements and fetched rows per request against a live database
+(settings.database); skipped when the database is not reachable.
+"""
+import pytest
+from fastapi.testclient import TestClient
+
+from .main import app
+from .db.database import engine
+from .db.stats import StatementCounter
+from .services.device_cache import device_cache
+
+
+@pytest.fixture(scope="module")
+def client():
+    """TestClient fixture (one event loop for the whole module)"""
+    with TestClient(app) as c:
+        if c.get("/health/db").status_code != 200:
+            pytest.skip("database not reachable")
+        yield c
+
+
+@pytest.fixture(scope="module")
+def device_id(client) -> int:
+    devices = client.get("/devices", params={"limit": 1}).json()
+    if not devices:
+        pytest.skip("no devices in database")
+    return devices[0]["id"]
+
+
+def test_create_telemetry_budget(client, device_id):
+    device_cache.invalidate(device_id)
+
+    with StatementCounter(engine) as counter:
+        response = client.post(
+            "/telemetry",
+            json={"device_id": device_id, "x_coord": 1.0, "y_coord": 2.0},
+        )
+
+    assert response.status_code == 201
+    # device lookup, insert ... returning, device_latest upsert, last_seen_at
+    assert counter.statements == 4, counter.sql
+    # device lookup row + returned id
+    assert counter.rows == 2, counter.sql
+
+
+def test_create_telemetry_cached_device_budget(client, device_id):
+    # warm the device cache
+    client.post(
+        "/telemetry",
+        json={"device_id": device_id, "x_coord": 1.0, "y_coord": 2.0},
+    )
+
+    with StatementCounter(engine) as counter:
+        response = client.post(
+            "/telemetry",
+            json={"device_id": device_id, "x_coord": 1.0, "y_coord": 2.0},
+        )
+
+    assert response.status_code == 201
+    # no device lookup: insert ... returning, device_latest upsert, last_seen_at
+    assert counter.statements == 3, counter.sql
+
+
+def test_create_telemetry_batch_budget(client, device_id):
+    points = [{"x_coord": float(i), "y_coord": float(i)} for i in range(100)]
+    device_cache.invalidate(device_id)
+
+    with StatementCounter(engine) as counter:
+        response = client.post(
+            "/telemetry/batch",
+            json={"device_id": device_id, "points": points},
+        )
+
+    assert response.status_code == 204
+    # device lookup, device_latest upsert, last_seen_at
+    # (+ unnest insert; COPY is not visible to engine events)
+    assert counter.statements <= 4, counter.sql
+    assert counter.rows == 1, counter.sql
+
+
+def test_create_telemetry_unknown_device(client):
+    payload = {"device_id": 2_147_483_647, "x_coord": 1.0, "y_coord": 2.0}
+    device_cache.invalidate(payload["device_id"])
+
+    with StatementCounter(engine) as counter:
+        first = client.post("/telemetry", json=payload)
+        # negative cache: no second lookup
+        second = client.post("/telemetry", json=payload)
+
+    assert first.status_code == second.status_code == 404
+    assert counter.statements == 1, counter.sql
+
+
+
+# Relationships are lazy="raise": each read endpoint loads what its response
+# schema needs in one statement, however many rows (and children) there are
+@pytest.mark.parametrize(
+    "path",
+    ["/accounts", "/subscriptions", "/users", "/api-keys", "/devices"],
+)
+def test_list_endpoint_budget(client, path):
+    with StatementCounter(engine) as counter:
+        response = client.get(path, params={"limit": 200})
+
+    assert response.status_code == 200
+    assert counter.statements == 1, counter.sql
+
+
+@pytest.mark.parametrize("path", ["/accounts", "/subscriptions", "/users", "/api-keys"])
+def test_get_endpoint_budget(client, path):
+    items = client.get(path, params={"limit": 1}).json()
+    if not items:
+        pytest.skip(f"no rows behind {path}")
+
+    with StatementCounter(engine) as counter:
+        response = client.get(f"{path}/{items[0]['id']}")
+
+    assert response.status_code == 200
+    assert counter.statements == 1, counter.sql
+
+
+@pytest.mark.parametrize("path", ["/plans", "/plans/starter"])
+def test_plan_budget(client, path):
+    with StatementCounter(engine) as counter:
+        response = client.get(path)
+
+    assert response.status_code in (200, 404)
+    assert counter.statements == 1, counter.sql
+
+
+@pytest.mark.parametrize("include_latest", [True, False])
+def test_get_device_budget(client, device_id, include_latest):
+    with StatementCounter(engine) as counter:
+        response = client.get(
+            f"/devices/{device_id}",
+            params={"include_latest": include_latest},
+        )
+
+    assert response.status_code == 200
+    # device_latest is joined into the device query, or not loaded at all
+    assert counter.statements == 1, counter.sql
+    if not include_latest:
+        assert response.json()["latest"] is None
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        {"min_x": -180, "min_y": -90, "max_x": 180, "max_y": 90},
+        {"x": 0, "y": 0, "radius": 50, "account_id": 1},
+    ],
+)
+def test_latest_within_budget(client, params):
+    with StatementCounter(engine) as counter:
+        response = client.get("/devices/latest/within", params={**params, "limit": 100})
+
+    assert response.status_code == 200
+    assert len(response.json()) <= 100
+    assert counter.statements == 1, counter.sql
+
+
+def test_device_batch_budget(client, device_id):
+    missing_id = 2_147_483_647
+    ids = [missing_id, device_id, device_id]
+
+    with StatementCounter(engine) as counter:
+        got = client.get("/devices/batch", params={"ids": ",".join(map(str, ids))})
+        posted = client.post("/devices/batch", json={"ids": ids})
+
+    assert got.status_code == posted.status_code == 200
+    # one id = ANY(...) query (device_latest joined) per request
+    assert counter.statements == 2, counter.sql
+    assert got.json() == posted.json()
+    assert [d["id"] for d in got.json()["items"]] == [device_id]
+    assert got.json()["missing"] == [missing_id]
+
+
+def test_device_search_and_info_budget(client, device_id):
+    device = client.get(f"/devices/{device_id}").json()
+
+    with StatementCounter(engine) as counter:
+        found = client.get("/devices/search", params={"q": device["name"][:3]})
+        info = client.get(
+            "/devices/info",
+            params={
+                "account_id": device["account_id"],
+                "name": device["name"],
+                "type": device["type"],
+            },
+        )
+
+    assert found.status_code == info.status_code == 200
+    assert counter.statements == 2, counter.sql
+    assert info.json()["id"] == device_id
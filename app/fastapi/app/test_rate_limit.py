@@ -0,0 +1,68 @@
+from datetime import datetime, timedelta, timezone
+
+from .schemas.device_telemetry import TelemetryBase
+from .services.rate_limit import SampleRateLimiter
+from .services.telemetry_ingest import TelemetryRow
+
+T0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def _row(device_id: int, seconds: float) -> TelemetryRow:
+    return TelemetryRow(device_id, T0 + timedelta(seconds=seconds), 0.0, 0.0, None)
+
+
+def test_allow_enforces_interval_per_device():
+    limiter = SampleRateLimiter(max_devices=10)
+    assert limiter.allow(1, T0, 10)
+    limiter.record([_row(1, 0)])
+    assert not limiter.allow(1, T0 + timedelta(seconds=5), 10)
+    assert limiter.allow(2, T0 + timedelta(seconds=5), 10)
+    assert limiter.allow(1, T0 + timedelta(seconds=10), 10)
+    assert limiter.dropped == 1
+
+
+def test_thin_keeps_spaced_points_of_a_fast_batch():
+    limiter = SampleRateLimiter(max_devices=10)
+    rows = [_row(1, s / 10) for s in range(100)]     # 10 Hz for 10 s
+    rows.append(_row(2, 0.5))                         # device without a limit
+
+    kept = limiter.thin(rows, {1: 2, 2: 0})
+
+    assert [r.recorded_at for r in kept if r.device_id == 1] == [
+        T0 + timedelta(seconds=s) for s in (0, 2, 4, 6, 8)
+    ]
+    assert any(r.device_id == 2 for r in kept)
+    assert limiter.dropped == 95
+
+
+def test_state_is_bounded():
+    limiter = SampleRateLimiter(max_devices=2)
+    limiter.record([_row(device_id, 0) for device_id in range(5)])
+    assert len(limiter) == 2
+
+
+def test_backdated_points_are_limited():
+    limiter = SampleRateLimiter(max_devices=10)
+    limiter.record([_row(1, 100)])
+
+    assert not limiter.allow(1, T0 + timedelta(seconds=50), 10)    # backdated
+    assert not limiter.allow(1, T0 + timedelta(seconds=105), 10)
+    assert limiter.allow(1, T0 + timedelta(seconds=110), 10)
+    assert limiter.thin([_row(1, 0), _row(1, 20)], {1: 10}) == []
+
+
+def test_not_recorded_until_stored():
+    limiter = SampleRateLimiter(max_devices=10)
+    assert limiter.allow(1, T0, 10)
+    # the write failed: nothing recorded, the next point is still allowed
+    assert limiter.allow(1, T0 + timedelta(seconds=1), 10)
+    assert len(limiter) == 0
+
+
+def test_naive_recorded_at_is_utc():
+    point = TelemetryBase(x_coord=0.0, y_coord=0.0, recorded_at="2026-01-01T00:00:05")
+    assert point.recorded_at == T0 + timedelta(seconds=5)
+
+    limiter = SampleRateLimiter(max_devices=10)
+    limiter.record([_row(1, 0)])
+    assert not limiter.allow(1, point.recorded_at, 10)
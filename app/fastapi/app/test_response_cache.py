@@ -0,0 +1,36 @@
+from .services.response_cache import ResponseCache
+
+
+def test_put_get():
+    cache = ResponseCache(ttl_seconds=60)
+    assert cache.get("plans") is None
+
+    entry = cache.put("plans", [{"code": "starter"}])
+    assert entry.body == b'[{"code":"starter"}]'
+    assert cache.get("plans") == entry
+    # same content, same ETag
+    assert cache.put("other", [{"code": "starter"}]).etag == entry.etag
+
+
+def test_expired():
+    cache = ResponseCache(ttl_seconds=0)
+    cache.put("plans", [])
+    assert cache.get("plans") is None
+
+
+def test_notify_clears():
+    cache = ResponseCache(ttl_seconds=60)
+    cache.put("plans", [])
+    cache.on_notify("")
+    assert cache.get("plans") is None
+
+
+def test_stale_build_not_stored():
+    cache = ResponseCache(ttl_seconds=60)
+    generation = cache.generation
+    # NOTIFY arrives while the rows are being loaded
+    cache.clear()
+
+    entry = cache.put("plans", [], generation)
+    assert entry.body == b"[]"
+    assert cache.get("plans") is None
@@ -7,6 +7,7 @@
 \echo 'Connected to app_db'
 
 CREATE EXTENSION IF NOT EXISTS citext WITH SCHEMA public;
+CREATE EXTENSION IF NOT EXISTS pg_trgm WITH SCHEMA public;
 CREATE EXTENSION IF NOT EXISTS pg_stat_statements;
 
 -- confirm installed extensions
@@ -18,3 +18,20 @@ CREATE TABLE IF NOT EXISTS db_schema.plan (
     retention_days                  INTEGER                 NOT NULL CHECK (retention_days >= 0),
     monthly_price_usd               NUMERIC(10,2)           NOT NULL CHECK (monthly_price_usd >= 0)
 );
+
+-- trigger: notify plan changes (API-side reference response cache)
+CREATE OR REPLACE FUNCTION db_schema.notify_plan_changed()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    PERFORM pg_notify('plan_changed', '');
+    RETURN NULL;
+END;
+$$;
+
+-- DROP TRIGGER IF EXISTS trg_plan_notify_changed ON db_schema.plan;
+CREATE TRIGGER trg_plan_notify_changed
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON db_schema.plan
+FOR EACH STATEMENT
+EXECUTE FUNCTION db_schema.notify_plan_changed();
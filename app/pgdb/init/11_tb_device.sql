@@ -38,9 +38,105 @@ CREATE INDEX IF NOT EXISTS idx_device_account_status_active
     ON db_schema.device (account_id, type, name)
     WHERE status = 'active';
 
+-- Index: name substring search (ILIKE '%...%', word_similarity ordering)
+CREATE INDEX IF NOT EXISTS idx_device_name_trgm
+    ON db_schema.device USING gin (name gin_trgm_ops);
+
 -- trigger: set updated_at
 -- DROP TRIGGER IF EXISTS trg_device_set_updated_at ON db_schema.device;
 CREATE TRIGGER trg_device_set_updated_at
 BEFORE UPDATE ON db_schema.device
 FOR EACH ROW
 EXECUTE FUNCTION db_schema.set_updated_at();
+
+-- trigger: notify device changes (API-side device cache invalidation)
+-- last_seen_at / updated_at churn from ingest does not notify
+CREATE OR REPLACE FUNCTION db_schema.notify_device_changed()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        PERFORM pg_notify('device_changed', OLD.id::text);
+        RETURN OLD;
+    END IF;
+    PERFORM pg_notify('device_changed', NEW.id::text);
+    RETURN NEW;
+END;
+$$;
+
+-- DROP TRIGGER IF EXISTS trg_device_notify_changed ON db_schema.device;
+CREATE TRIGGER trg_device_notify_changed
+AFTER INSERT OR DELETE OR UPDATE OF account_id, status ON db_schema.device
+FOR EACH ROW
+EXECUTE FUNCTION db_schema.notify_device_changed();
+
+-- ===========================
+-- Table: account_device_count
+-- per-account device counter, maintained by trigger, so quota checks
+-- never run count(*) over device
+-- ===========================
+CREATE TABLE IF NOT EXISTS db_schema.account_device_count (
+    account_id      BIGINT      PRIMARY KEY REFERENCES db_schema.account(id) ON DELETE CASCADE,
+    device_count    INTEGER     NOT NULL DEFAULT 0 CHECK (device_count >= 0)
+);
+
+-- trigger: keep account_device_count in step with device
+-- an insert / move that takes the account past its plan's max_devices fails
+-- (accounts without a subscription are not limited)
+CREATE OR REPLACE FUNCTION db_schema.count_account_devices()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_count     INTEGER;
+    v_max       INTEGER;
+BEGIN
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        UPDATE db_schema.account_device_count
+        SET device_count = device_count - 1
+        WHERE account_id = OLD.account_id;
+        PERFORM pg_notify('account_device_count', OLD.account_id::text);
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO db_schema.account_device_count AS c (account_id, device_count)
+        VALUES (NEW.account_id, 1)
+        ON CONFLICT (account_id)
+        DO UPDATE SET device_count = c.device_count + 1
+        RETURNING c.device_count INTO v_count;
+
+        SELECT p.max_devices INTO v_max
+        FROM db_schema.subscription s
+        JOIN db_schema.plan p ON p.code = s.plan_code
+        WHERE s.account_id = NEW.account_id;
+
+        IF v_max IS NOT NULL AND v_count > v_max THEN
+            RAISE EXCEPTION 'device quota exceeded for account %', NEW.account_id
+                USING ERRCODE = 'check_violation',
+                      CONSTRAINT = 'account_device_quota';
+        END IF;
+        PERFORM pg_notify('account_device_count', NEW.account_id::text);
+    END IF;
+
+    RETURN NULL;
+END;
+$$;
+
+-- DROP TRIGGER IF EXISTS trg_device_count_account ON db_schema.device;
+CREATE TRIGGER trg_device_count_account
+AFTER INSERT OR DELETE OR UPDATE OF account_id ON db_schema.device
+FOR EACH ROW
+EXECUTE FUNCTION db_schema.count_account_devices();
+
+-- one-time backfill: devices that existed before the trigger
+-- (idempotent; SHARE lock keeps device inserts out while it counts)
+BEGIN;
+LOCK TABLE db_schema.device IN SHARE MODE;
+INSERT INTO db_schema.account_device_count AS c (account_id, device_count)
+SELECT account_id, count(*)
+FROM db_schema.device
+GROUP BY account_id
+ON CONFLICT (account_id)
+DO UPDATE SET device_count = EXCLUDED.device_count;
+COMMIT;
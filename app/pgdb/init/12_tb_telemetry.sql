@@ -47,6 +47,120 @@ CREATE TABLE IF NOT EXISTS db_schema.device_telemetry_2026_02
     PARTITION OF db_schema.device_telemetry
     FOR VALUES FROM ('2026-02-01') TO ('2026-03-01');
 
+-- default partition: catches rows outside every range instead of failing the insert
+CREATE TABLE IF NOT EXISTS db_schema.device_telemetry_default
+    PARTITION OF db_schema.device_telemetry DEFAULT;
+
+-- ===========================
+-- Partition maintenance (API partition manager)
+-- app_user cannot CREATE/DROP; these run as app_owner (SECURITY DEFINER)
+-- Bounds are dates in America/Toronto, like the partitions above
+-- ===========================
+-- Rows the default partition already holds for the range are moved into
+-- the new partition (CREATE ... PARTITION OF would fail on them); returns
+-- the number of rows moved. The default partition is locked meanwhile, so
+-- only out-of-range inserts wait.
+DROP FUNCTION IF EXISTS db_schema.create_telemetry_partition(TEXT, DATE, DATE);
+CREATE FUNCTION db_schema.create_telemetry_partition(
+    p_name  TEXT,
+    p_from  DATE,
+    p_to    DATE
+)
+RETURNS BIGINT
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = db_schema, pg_temp
+SET timezone = 'America/Toronto'
+AS $$
+DECLARE
+    v_moved     BIGINT := 0;
+BEGIN
+    IF p_name !~ '^device_telemetry_[0-9]{4}_[0-9]{2}(_[0-9]{2})?$' THEN
+        RAISE EXCEPTION 'invalid telemetry partition name: %', p_name;
+    END IF;
+    IF p_from >= p_to THEN
+        RAISE EXCEPTION 'invalid telemetry partition range: % - %', p_from, p_to;
+    END IF;
+    IF to_regclass(format('db_schema.%I', p_name)) IS NOT NULL THEN
+        RETURN 0;
+    END IF;
+
+    LOCK TABLE db_schema.device_telemetry_default IN ACCESS EXCLUSIVE MODE;
+
+    IF NOT EXISTS (
+        SELECT 1 FROM db_schema.device_telemetry_default
+        WHERE recorded_at >= p_from::timestamptz AND recorded_at < p_to::timestamptz
+    ) THEN
+        EXECUTE format(
+            'CREATE TABLE db_schema.%I
+                PARTITION OF db_schema.device_telemetry
+                FOR VALUES FROM (%L) TO (%L)',
+            p_name, p_from::timestamptz, p_to::timestamptz
+        );
+        RETURN 0;
+    END IF;
+
+    -- default already holds rows for the range: build the partition
+    -- standalone, move the rows, then attach it
+    EXECUTE format(
+        'CREATE TABLE db_schema.%I
+            (LIKE db_schema.device_telemetry INCLUDING DEFAULTS INCLUDING CONSTRAINTS)',
+        p_name
+    );
+    EXECUTE format(
+        'WITH moved AS (
+            DELETE FROM db_schema.device_telemetry_default
+            WHERE recorded_at >= %L AND recorded_at < %L
+            RETURNING *
+        )
+        INSERT INTO db_schema.%I SELECT * FROM moved',
+        p_from::timestamptz, p_to::timestamptz, p_name
+    );
+    GET DIAGNOSTICS v_moved = ROW_COUNT;
+    EXECUTE format(
+        'ALTER TABLE db_schema.device_telemetry
+            ATTACH PARTITION db_schema.%I FOR VALUES FROM (%L) TO (%L)',
+        p_name, p_from::timestamptz, p_to::timestamptz
+    );
+    RETURN v_moved;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION db_schema.drop_telemetry_partition(
+    p_name  TEXT
+)
+RETURNS VOID
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = db_schema, pg_temp
+AS $$
+BEGIN
+    -- never the parent or the default partition
+    IF p_name !~ '^device_telemetry_[0-9]{4}_[0-9]{2}(_[0-9]{2})?$' THEN
+        RAISE EXCEPTION 'invalid telemetry partition name: %', p_name;
+    END IF;
+    IF NOT EXISTS (
+        SELECT 1
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE i.inhparent = 'db_schema.device_telemetry'::regclass
+          AND n.nspname = 'db_schema'
+          AND c.relname = p_name
+    ) THEN
+        RETURN;
+    END IF;
+
+    EXECUTE format('ALTER TABLE db_schema.device_telemetry DETACH PARTITION db_schema.%I', p_name);
+    EXECUTE format('DROP TABLE db_schema.%I', p_name);
+END;
+$$;
+
+REVOKE ALL ON FUNCTION db_schema.create_telemetry_partition(TEXT, DATE, DATE) FROM PUBLIC;
+REVOKE ALL ON FUNCTION db_schema.drop_telemetry_partition(TEXT) FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION db_schema.create_telemetry_partition(TEXT, DATE, DATE) TO app_user;
+GRANT EXECUTE ON FUNCTION db_schema.drop_telemetry_partition(TEXT) TO app_user;
+
 -- confirm
 SELECT
     table_schema,
@@ -22,6 +22,12 @@ CREATE TABLE IF NOT EXISTS db_schema.device_latest (
 CREATE INDEX IF NOT EXISTS idx_device_latest_recorded_at
     ON db_schema.device_latest (recorded_at);
 
+-- index: spatial lookups (GET /devices/latest/within)
+-- point(x, y) <@ box / circle and <-> nearest-first ordering use this index;
+-- queries must use the same point(x_coord, y_coord) expression
+CREATE INDEX IF NOT EXISTS idx_device_latest_point
+    ON db_schema.device_latest USING gist (point(x_coord, y_coord));
+
 -- confirm
 SELECT
     table_schema,
@@ -0,0 +1,15 @@
+#!/bin/sh
+# 15_replication.sh
+# Streaming-replication login for the optional read replica
+# (docker compose --profile replica up)
+set -e
+
+echo
+echo '######## Creating replication role ########'
+echo
+
+psql -v ON_ERROR_STOP=1 --username "$POSTGRES_USER" --dbname postgres <<-SQL
+    CREATE ROLE replicator WITH REPLICATION LOGIN PASSWORD 'postgres';
+SQL
+
+echo "host replication replicator all scram-sha-256" >> "$PGDATA/pg_hba.conf"
@@ -16,12 +16,16 @@ export const DEVICE_TYPE = __ENV.DEVICE_TYPE || "sensor";
 // device_id
 export const DEVICE_ID = __ENV.DEVICE_ID || "1";
 
+// name search term (3+ characters)
+export const SEARCH_TERM = __ENV.SEARCH_TERM || "device";
+
 /**
  * Run all GET endpoints:
  * - GET /
  * - GET /health
  * - GET /devices
- * - GET /devices/info?name=...&type=...
+ * - GET /devices/search?q=...
+ * - GET /devices/info?account_id=...&name=...&type=...
  * - GET /device/position/last/{device_id}
  * - GET /device/position/track/{device_id}?sec=10
  */
@@ -69,7 +73,22 @@ export function runGetApiTesting() {
     errorRate.add(1);
   }
 
-  const devices = listRes.json();
+  // ---- search devices by name (trigram index) ----
+  const searchResp = http.get(
+    `${BASE}/devices/search?q=${encodeURIComponent(SEARCH_TERM)}&limit=20`,
+    {
+      tags: { endpoint: "search_devices" },
+    }
+  );
+
+  const searchOk = check(searchResp, {
+    "search_devices 200": (r) => r.status === 200,
+  });
+  if (!searchOk) {
+    errorRate.add(1);
+  }
+
+  const devices = listOk ? listResp.json() : [];
   if (!devices || devices.length === 0) {
     console.log("No devices returned, skipping get_device_by_name_and_type");
     return;
@@ -77,18 +96,12 @@ export function runGetApiTesting() {
 
   const d = devices[0];
 
-  // ---- get device by name + type ----
-
-  // const deviceInfoUrl = `${BASE}/devices/info?name=${encodeURIComponent(
-  //   DEVICE_NAME
-  // )}&type=${encodeURIComponent(DEVICE_TYPE)}`;
-  const deviceInfoUrl = `${BASE}/devices/info`
+  // ---- get device by account + name + type (composite index) ----
+  const deviceInfoUrl =
+    `${BASE}/devices/info?account_id=${d.account_id}` +
+    `&name=${encodeURIComponent(d.name)}&type=${encodeURIComponent(d.type)}`;
 
   const deviceInfoResp = http.get(deviceInfoUrl, {
-    params: {
-      name: d.name,
-      type: d.type,
-    },
     tags: { endpoint: "get_device_by_name_type" },
   });
 